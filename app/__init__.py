@@ -14,9 +14,7 @@ from .middleware.auth_middleware import load_user
 db = SQLAlchemy()
 limiter = None  # Will be initialized in create_app
 
-# Initialize Flask-Migrate
-from flask_migrate import Migrate
-migrate = Migrate()
+# Flask-Migrate is set up by `flask db` itself (see app/cli.py), not on every boot
 
 def create_app(config_name=None):
     """
@@ -34,9 +32,13 @@ def create_app(config_name=None):
     config = get_config(config_name)
     app.config.from_object(config)
     
+    # Client address from the hops the trusted proxies appended (rate limits, logs)
+    if app.config.get('PROXY_FIX_X_FOR'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
     
     # Initialize rate limiting
     from .config.rate_limiting import create_rate_limiter
@@ -75,9 +77,37 @@ def create_app(config_name=None):
     # Register static file routes
     register_static_routes(app)
     
+    # Attach and validate the per-endpoint rate limits
+    from .config.rate_limiting import apply_route_limits
+    apply_route_limits(app, app.limiter)
+    
     # Import models to ensure they are registered with SQLAlchemy
     import_models()
     
+    # Configure the per-process user identity cache
+    from .middleware.identity import init_identity_cache
+    init_identity_cache(app)
+    
+    # Create/backfill the full-text search index
+    from .utils.search_index import init_search_index
+    init_search_index(app)
+    
+    # Configure the Track dashboard cache
+    from .services import init_track_dashboard_cache
+    init_track_dashboard_cache(app)
+    
+    # Opt-in per-request SQL instrumentation
+    from .middleware.query_instrumentation import init_query_instrumentation
+    init_query_instrumentation(app)
+    
+    # Configure the background statistics refresh queue
+    from .workers import statistics_queue
+    statistics_queue.init_app(app)
+    
+    # Register maintenance CLI commands
+    from .cli import register_cli_commands
+    register_cli_commands(app)
+    
     return app
 
 
@@ -282,4 +312,7 @@ def import_models():
     try:
         from .models.grade import GradeConfig, GradeCategory, GradeItem, GradeEntry, GradeSummary
     except ImportError:
-        pass  # Grade models may not exist yet
\ No newline at end of file
+        pass  # Grade models may not exist yet
+    
+    # Import Google Classroom sync state
+    from .models.classroom_sync import ClassroomSyncStateModel
\ No newline at end of file
@@ -0,0 +1,295 @@
+"""
+Flask CLI commands for maintenance tasks.
+Registered on the application in create_app (run with `flask <group> <command>`).
+"""
+
+from datetime import datetime
+
+import click
+from flask import g
+from flask.cli import AppGroup, ScriptInfo, with_appcontext
+
+
+class MigrateGroup(click.Group):
+    """
+    `flask db`, loading Flask-Migrate's commands on first use.
+
+    Flask-Migrate imports alembic (and with it mako and pygments), which is
+    about a fifth of create_app(); only the migration commands need it.
+    """
+
+    def _migrate_group(self, ctx):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as migrate_group
+        from app import db
+
+        app = ctx.ensure_object(ScriptInfo).load_app()
+        if 'migrate' not in app.extensions:
+            Migrate(app, db)
+        return migrate_group
+
+    def list_commands(self, ctx):
+        return self._migrate_group(ctx).list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._migrate_group(ctx).get_command(ctx, name)
+
+
+pomodoro_cli = AppGroup('pomodoro', help='Pomodoro statistics maintenance.')
+classroom_cli = AppGroup('classroom', help='Google Classroom synchronisation.')
+seed_cli = AppGroup('seed', help='Synthetic data for benchmarks and load tests.')
+search_cli = AppGroup('search', help='Full-text search index maintenance.')
+notes_cli = AppGroup('notes', help='Note attachment maintenance.')
+startup_cli = AppGroup('startup', help='Application startup diagnostics.')
+backup_cli = AppGroup('backup', help='Online SQLite backups.')
+
+
+@click.group('db', cls=MigrateGroup)
+@click.option('-d', '--directory', default=None, help='Migration script directory (default is "migrations")')
+@click.option('-x', '--x-arg', multiple=True, help='Additional arguments consumed by custom env.py scripts')
+@with_appcontext
+def db_cli(directory, x_arg):
+    """Perform database migrations."""
+    # Same as flask_migrate.cli.db; Migrate.get_config() reads these
+    g.directory = directory
+    g.x_arg = x_arg
+
+
+@pomodoro_cli.command('rebuild-stats')
+@click.option('--user-id', default=None, help='Only rebuild statistics for this user.')
+@click.option('--since', default=None, help='Only rebuild days on or after this date (YYYY-MM-DD).')
+def rebuild_stats(user_id, since):
+    """Fully recompute daily statistics and streaks from sessions and tasks."""
+    from app.services import PomodoroSessionService
+
+    since_date = datetime.strptime(since, '%Y-%m-%d').date() if since else None
+    rebuilt = PomodoroSessionService().backfill_daily_statistics(user_id=user_id, since=since_date)
+    click.echo(f"Rebuilt {rebuilt} daily statistics rows")
+
+
+@pomodoro_cli.command('flush-queue')
+def flush_queue():
+    """Process every pending statistics refresh job now."""
+    from app.workers import statistics_queue
+
+    statistics_queue.flush()
+    metrics = statistics_queue.metrics()
+    click.echo(f"Processed {metrics['processed']} jobs, {metrics['depth']} still queued")
+
+
+@classroom_cli.command('sync')
+@click.option('--lesson-id', default=None, help='Only sync this lesson.')
+@click.option('--user-id', default=None, help='Only sync lessons owned by this user.')
+def classroom_sync(lesson_id, user_id):
+    """
+    Delta-sync imported Google Classroom lessons.
+
+    Meant to run on a schedule, e.g. from cron every 15 minutes:
+    */15 * * * * cd /app && flask classroom sync
+    """
+    from app.models.lesson import LessonModel
+    from app.services import GoogleClassroomLessonService
+
+    query = LessonModel.query.filter_by(source_platform='google_classroom')
+    if lesson_id:
+        query = query.filter_by(id=lesson_id)
+    if user_id:
+        query = query.filter_by(user_id=user_id)
+
+    service = GoogleClassroomLessonService()
+    failed = 0
+    lessons = query.filter(LessonModel.external_id.isnot(None)).all()
+    for lesson in lessons:
+        result = service.sync_with_google_classroom(lesson.id)
+        if not result.get('success'):
+            failed += 1
+            click.echo(f"{lesson.id}: {result.get('error') or 'incomplete'}", err=True)
+
+    click.echo(f"Synced {len(lessons) - failed} of {len(lessons)} lessons")
+
+
+@seed_cli.command('synthetic')
+@click.option('--users', default=10, show_default=True, help='Users to create.')
+@click.option('--lessons', 'lessons_per_user', default=5, show_default=True, help='Lessons per user.')
+@click.option('--notes', 'notes_per_lesson', default=10, show_default=True, help='Notes per lesson.')
+@click.option('--tasks', 'tasks_per_user', default=20, show_default=True, help='Tasks per user.')
+@click.option('--months', default=6, show_default=True, help='Months of pomodoro history per user.')
+@click.option('--posts', 'posts_per_lesson', default=10, show_default=True, help='Stream posts per lesson.')
+@click.option('--comments', 'comments_per_post', default=3, show_default=True, help='Comments per post.')
+@click.option('--members', 'members_per_lesson', default=10, show_default=True, help='Members per lesson.')
+@click.option('--grade-items', 'items_per_lesson', default=12, show_default=True, help='Graded items per lesson.')
+@click.option('--batch-users', default=50, show_default=True, help='Users written per transaction.')
+@click.option('--prefix', default='synthetic', show_default=True, help='Username prefix.')
+@click.option('--seed', type=int, default=None, help='Random seed for repeatable data.')
+@click.option('--rebuild-stats', is_flag=True, help='Recompute pomodoro statistics for the new users.')
+def seed_synthetic(rebuild_stats, **options):
+    """Bulk-generate users with realistic lessons, notes, tasks, sessions, posts and grades."""
+    import time
+    from app.utils.synthetic_data import SYNTHETIC_PASSWORD, SyntheticDataGenerator
+
+    generator = SyntheticDataGenerator(**options)
+    started = time.perf_counter()
+    counts = generator.run()
+    elapsed = time.perf_counter() - started
+
+    for table, count in counts.items():
+        click.echo(f"{table:>18}: {count}")
+    click.echo(f"Wrote {sum(counts.values())} rows in {elapsed:.1f}s "
+               f"(password for every user: {SYNTHETIC_PASSWORD})")
+
+    if rebuild_stats:
+        from app.services import PomodoroSessionService
+
+        service = PomodoroSessionService()
+        days = sum(service.backfill_daily_statistics(user_id=user_id) for user_id in generator.user_ids)
+        click.echo(f"Rebuilt {days} daily statistics rows")
+    else:
+        click.echo("Pomodoro statistics not rebuilt; run `flask pomodoro rebuild-stats` if needed")
+
+
+@search_cli.command('rebuild')
+@click.option('--type', 'kinds', multiple=True, type=click.Choice(['note', 'lesson', 'task']),
+              help='Only rebuild these document types (repeatable).')
+def search_rebuild(kinds):
+    """Create the search index if needed and repopulate it from notes, lessons and tasks."""
+    from app import db
+    from app.utils.search_index import create_search_schema, rebuild_search_index
+
+    with db.engine.begin() as connection:
+        create_search_schema(connection)
+        counts = rebuild_search_index(connection, kinds or None)
+    click.echo(', '.join(f"{count} {kind}s" for kind, count in counts.items()) + " indexed")
+
+
+@notes_cli.command('reconcile-files')
+@click.option('--dry-run', is_flag=True, help='Report drift without changing note_file.')
+def reconcile_files(dry_run):
+    """Repair drift between note_file rows and files under static/uploads/notes."""
+    from app.services import NoteAttachmentService
+
+    report = NoteAttachmentService().reconcile(dry_run=dry_run)
+    click.echo(f"{'Would add' if dry_run else 'Added'} {report['added']}, "
+               f"{'remove' if dry_run else 'removed'} {report['removed']}, "
+               f"{'update' if dry_run else 'updated'} {report['updated']} attachment rows")
+    if report['orphaned']:
+        click.echo(f"{report['orphaned']} files belong to deleted notes and were left on disk", err=True)
+
+
+@startup_cli.command('importtime')
+@click.option('--config', 'config_name', default='development', show_default=True,
+              help='Configuration passed to create_app.')
+@click.option('--top', default=20, show_default=True, help='Number of modules and packages to list.')
+@click.option('--sort', 'sort_key', type=click.Choice(['self', 'cumulative']), default='cumulative',
+              show_default=True, help='Order modules by their own or their cumulative import time.')
+def startup_importtime(config_name, top, sort_key):
+    """Profile the imports of a cold create_app() (like `python -X importtime`)."""
+    from app.utils.import_profile import by_package, profile_startup
+
+    try:
+        profile = profile_startup(config_name)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+    entries = sorted(profile['imports'], key=lambda entry: entry[f'{sort_key}_us'], reverse=True)
+    click.echo(f"{'self ms':>9} {'cumul. ms':>10}  module")
+    for entry in entries[:top]:
+        click.echo(f"{entry['self_us'] / 1000:>9.1f} {entry['cumulative_us'] / 1000:>10.1f}  "
+                   f"{'  ' * entry['depth']}{entry['module']}")
+
+    click.echo(f"\n{'self ms':>9}  package")
+    packages = sorted(by_package(profile['imports']).items(), key=lambda item: item[1], reverse=True)
+    for package, self_us in packages[:top]:
+        click.echo(f"{self_us / 1000:>9.1f}  {package}")
+
+    click.echo(f"\n{len(profile['imports'])} modules imported in {profile['import_us'] / 1000:.0f} ms; "
+               f"create_app('{config_name}') took {(profile['create_app_us'] or 0) / 1000:.0f} ms")
+
+
+def _sqlite_database_path():
+    from app import db
+
+    url = db.engine.url
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        raise click.ClickException(f"Backups need a SQLite database file, not {url.render_as_string()}")
+    return url.database
+
+
+@backup_cli.command('create')
+@click.option('--output', type=click.Path(dir_okay=False), default=None,
+              help='Write the backup here instead of a rotating snapshot in the backup directory.')
+@click.option('--compress/--no-compress', default=None, help='gzip the backup (default: BACKUP_COMPRESS).')
+@click.option('--no-verify', is_flag=True, help='Skip PRAGMA integrity_check on the copy.')
+def backup_create(output, compress, no_verify):
+    """Copy the live database with the SQLite backup API and verify the copy."""
+    from flask import current_app
+    from app.utils.sqlite_backup import BackupError, backup_to, create_snapshot, prune_snapshots
+
+    config = current_app.config
+    source = _sqlite_database_path()
+    compress = config['BACKUP_COMPRESS'] if compress is None else compress
+    options = dict(compress=compress, verify=not no_verify,
+                   pages=config['BACKUP_PAGES_PER_STEP'], pause=config['BACKUP_STEP_PAUSE'])
+
+    started = datetime.now()
+    try:
+        if output:
+            path = backup_to(source, output, **options)
+        else:
+            path = create_snapshot(source, config['BACKUP_DIR'], **options)
+    except BackupError as e:
+        raise click.ClickException(str(e))
+    elapsed = (datetime.now() - started).total_seconds()
+    click.echo(f"Backed up {source} to {path} ({path.stat().st_size / 1024:.0f} KiB) in {elapsed:.1f}s"
+               f"{'' if no_verify else ', integrity check ok'}")
+
+    if not output:
+        removed = prune_snapshots(config['BACKUP_DIR'], config['BACKUP_RETENTION_DAYS'],
+                                  keep_min=config['BACKUP_KEEP_MIN'])
+        if removed:
+            click.echo(f"Removed {len(removed)} snapshots older than {config['BACKUP_RETENTION_DAYS']} days")
+
+
+@backup_cli.command('prune')
+@click.option('--dry-run', is_flag=True, help='List the snapshots that would be removed.')
+def backup_prune(dry_run):
+    """Remove snapshots older than BACKUP_RETENTION_DAYS (the newest BACKUP_KEEP_MIN are kept)."""
+    from flask import current_app
+    from app.utils.sqlite_backup import prune_snapshots
+
+    config = current_app.config
+    removed = prune_snapshots(config['BACKUP_DIR'], config['BACKUP_RETENTION_DAYS'],
+                              keep_min=config['BACKUP_KEEP_MIN'], dry_run=dry_run)
+    for path in removed:
+        click.echo(f"{'Would remove' if dry_run else 'Removed'} {path}")
+    click.echo(f"{len(removed)} snapshots {'would be ' if dry_run else ''}removed")
+
+
+@backup_cli.command('verify')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def backup_verify(path):
+    """Run PRAGMA integrity_check on a backup (.db or .db.gz)."""
+    from app.utils.sqlite_backup import check_integrity
+
+    problems = check_integrity(path)
+    if problems:
+        for problem in problems[:20]:
+            click.echo(problem, err=True)
+        raise click.ClickException(f"{path} failed the integrity check ({len(problems)} problems)")
+    click.echo(f"{path}: integrity check ok")
+
+
+def register_cli_commands(app):
+    """
+    Register CLI command groups.
+
+    Args:
+        app: Flask application instance
+    """
+    app.cli.add_command(pomodoro_cli)
+    app.cli.add_command(classroom_cli)
+    app.cli.add_command(seed_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(notes_cli)
+    app.cli.add_command(startup_cli)
+    app.cli.add_command(backup_cli)
+    app.cli.add_command(db_cli)
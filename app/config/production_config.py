@@ -53,6 +53,9 @@ class ProductionConfig(Config):
     PORT = int(os.environ.get('PORT', 8000))
     HOST = os.environ.get('HOST', '0.0.0.0')
     
+    # Render's load balancer appends the client address to X-Forwarded-For
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 1))
+    
     # Disable insecure transport for production
     OAUTHLIB_INSECURE_TRANSPORT = False
     
@@ -1,46 +1,103 @@
 """
 Rate Limiting Configuration for Smart Learning Hub
 Provides rate limiting for API endpoints and authentication
+
+Counters are kept where every worker process sees them (see get_storage_uri):
+Redis when REDIS_URL is set, otherwise a SQLite file in the instance folder.
+Every limit, the defaults included, is counted per signed-in user and per
+client IP only for signed-out requests (get_rate_limit_key), so a class
+behind one NAT does not share a single allowance.
+
+Per-endpoint limits are declared in ROUTE_LIMITS and attached by
+apply_route_limits once the blueprints are registered. Expensive endpoints
+draw from shared RATE_LIMIT_BUDGETS at a cost per request, so one full
+Classroom import spends as much as a hundred cheap calls.
 """
 
+import importlib.util
+import logging
+import os
+
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from flask import request
+from flask import request, session
+from limits import parse_many
+
+logger = logging.getLogger(__name__)
+
+
+def upload_cost():
+    """Cost of an upload request: one per attached file"""
+    return max(1, sum(1 for file in request.files.values() if file.filename))
+
+
+# Budgets shared by several endpoints, per signed-in user (or client IP)
+RATE_LIMIT_BUDGETS = {
+    'reports': "100 per minute; 1200 per hour",  # aggregate statistics and exports
+    'search': "120 per minute",
+    'imports': "600 per hour",  # Google Classroom / Teams calls and imports
+    'uploads': "200 per hour",  # files
+}
+
+# endpoint -> {'limit': own limit, 'budget': RATE_LIMIT_BUDGETS key,
+#              'cost': budget spent per request (int or callable, default 1),
+#              'methods': only these HTTP methods count (default: all)}
+ROUTE_LIMITS = {
+    # Authentication (per client IP for signed-out users)
+    'web_auth.login': {'limit': "5 per minute", 'methods': ['POST']},
+    'auth.login': {'limit': "5 per minute", 'methods': ['POST']},
+    'web_auth.register': {'limit': "3 per minute", 'methods': ['POST']},
+    'auth.register': {'limit': "3 per minute", 'methods': ['POST']},
+    'web_auth.forgot_password': {'limit': "3 per hour", 'methods': ['POST']},
+    'web_auth.reset_password': {'limit': "10 per hour", 'methods': ['POST']},
+    'google_auth.login': {'limit': "10 per hour"},
+    'user.change_password': {'limit': "3 per hour"},
+
+    # Statistics and reports computed over a user's history
+    'track_api.get_track_statistics': {'budget': 'reports', 'cost': 5},
+    'grades.get_grade_summary': {'budget': 'reports', 'cost': 5},
+    'grades.get_class_analytics': {'budget': 'reports', 'cost': 10},
+    'grades.calculate_what_if': {'budget': 'reports', 'cost': 2},
+    'grades.calculate_goal': {'budget': 'reports', 'cost': 2},
+    'pomodoro_statistics.export_data': {'budget': 'reports', 'cost': 20},
+    'pomodoro_statistics.get_productivity_report': {'budget': 'reports', 'cost': 10},
+    'pomodoro_statistics.get_session_history': {'budget': 'reports', 'cost': 2},
+    'lesson.get_lesson_statistics': {'budget': 'reports', 'cost': 2},
+    'note.get_note_statistics': {'budget': 'reports', 'cost': 2},
+    'task.get_task_statistics': {'budget': 'reports', 'cost': 2},
+    'user.get_user_statistics': {'budget': 'reports', 'cost': 2},
+
+    # Search (typed-ahead)
+    'api.search': {'budget': 'search'},
+    'note.search_notes': {'budget': 'search'},
+    'note.search_notes_by_tags': {'budget': 'search'},
+    'task.search_tasks': {'budget': 'search'},
+    'lesson.search_lessons': {'budget': 'search'},
+    'class.search_users': {'budget': 'search'},
+    'user.search_users': {'budget': 'search'},
+
+    # Third-party integrations: each call fans out to remote APIs and many writes
+    'google_classroom.import_course': {'budget': 'imports', 'cost': 100, 'limit': "10 per hour"},
+    'google_classroom_new.import_course': {'budget': 'imports', 'cost': 100, 'limit': "10 per hour"},
+    'microsoft_teams.import_team': {'budget': 'imports', 'cost': 100, 'limit': "10 per hour"},
+    'google_classroom.sync_course': {'budget': 'imports', 'cost': 25},
+    'google_classroom.fetch_courses': {'budget': 'imports', 'cost': 5},
+    'google_classroom_new.fetch_courses': {'budget': 'imports', 'cost': 5},
+    'google_classroom_new.fetch_course_details': {'budget': 'imports', 'cost': 5},
+    'google_classroom_new.test_connection': {'budget': 'imports', 'cost': 1},
+
+    # File uploads
+    'note_web.partial_note_add': {'budget': 'uploads', 'cost': upload_cost, 'methods': ['POST']},
+    'note_web.partial_note_edit': {'budget': 'uploads', 'cost': upload_cost, 'methods': ['POST']},
+    'classwork.create_material': {'budget': 'uploads', 'cost': upload_cost},
+
+    # Writes that start background statistics work
+    'pomodoro.start_pomodoro': {'limit': "200 per hour"},
+    'pomodoro_session.create_session': {'limit': "200 per hour"},
+}
+
+ROUTE_LIMIT_KEYS = {'limit', 'budget', 'cost', 'methods'}
 
-def init_rate_limiter(app):
-    """Initialize Flask-Limiter with the Flask app"""
-    
-    # Initialize limiter with app
-    limiter = Limiter(
-        app,
-        key_func=get_remote_address,
-        default_limits=["1000 per hour", "100 per minute"],
-        storage_uri="memory://",  # Use in-memory storage for development
-        enabled=app.config.get('RATE_LIMITING_ENABLED', True)
-    )
-    
-    # Authentication rate limits
-    limiter.limit("5 per minute")(app.view_functions.get('auth.login'))
-    limiter.limit("3 per minute")(app.view_functions.get('auth.register'))
-    limiter.limit("10 per hour")(app.view_functions.get('auth.google_login'))
-    
-    # Password change rate limits
-    limiter.limit("3 per hour")(app.view_functions.get('auth.change_password'))
-    
-    # API rate limits
-    limiter.limit("100 per hour")(app.view_functions.get('api.get_lessons'))
-    limiter.limit("100 per hour")(app.view_functions.get('api.get_notes'))
-    limiter.limit("50 per hour")(app.view_functions.get('api.create_lesson'))
-    limiter.limit("50 per hour")(app.view_functions.get('api.create_note'))
-    
-    # File upload rate limits
-    limiter.limit("20 per hour")(app.view_functions.get('api.upload_file'))
-    
-    # Pomodoro rate limits
-    limiter.limit("200 per hour")(app.view_functions.get('api.pomodoro_start'))
-    limiter.limit("200 per hour")(app.view_functions.get('api.pomodoro_stop'))
-    
-    return limiter
 
 def get_rate_limit_config():
     """Get rate limiting configuration based on environment"""
@@ -52,19 +109,8 @@ def get_rate_limit_config():
         },
         'production': {
             'enabled': True,
-            'storage': 'memory://',  # Could use Redis in production
-            'default_limits': ["1000 per hour", "100 per minute"],
-            'auth_limits': {
-                'login': "5 per minute",
-                'register': "3 per minute",
-                'password_reset': "3 per hour",
-                'google_oauth': "10 per hour"
-            },
-            'api_limits': {
-                'general': "100 per hour",
-                'create': "50 per hour",
-                'upload': "20 per hour"
-            }
+            'storage': None,  # shared by all workers, see get_storage_uri
+            'default_limits': ["1000 per hour", "100 per minute"]
         },
         'testing': {
             'enabled': False,
@@ -73,71 +119,149 @@ def get_rate_limit_config():
         }
     }
 
+
+def get_storage_uri(app, default=None):
+    """
+    Storage URI for the rate limit counters.
+
+    RATELIMIT_STORAGE_URI wins when configured. Otherwise REDIS_URL is used
+    (requires the `redis` package), falling back to a SQLite file in the
+    instance folder that the worker processes of this host share.
+    """
+    # Registers the sqlite:// scheme with the limits package
+    from app.utils import rate_limit_storage  # noqa: F401
+
+    configured = app.config.get('RATELIMIT_STORAGE_URI') or default
+    if configured:
+        return configured
+
+    redis_url = app.config.get('REDIS_URL')
+    if redis_url:
+        if importlib.util.find_spec('redis') is not None:
+            return redis_url
+        logger.warning("REDIS_URL is set but the redis package is not installed; "
+                       "rate limits use the local SQLite store")
+
+    return f"sqlite:///{os.path.join(app.instance_path, 'rate_limits.db')}"
+
+
 def create_rate_limiter(app):
     """Create and configure rate limiter for the app"""
     
     config = get_rate_limit_config()
-    env = app.config.get('FLASK_ENV', 'development')
+    env = app.config.get('FLASK_ENV') or (
+        'testing' if app.testing else 'development' if app.debug else 'production'
+    )
     rate_config = config.get(env, config['development'])
     
-    if not rate_config['enabled']:
+    enabled = app.config.get('RATE_LIMITING_ENABLED')
+    if not (rate_config['enabled'] if enabled is None else enabled):
         return None
     
     limiter = Limiter(
-        app,
-        key_func=get_remote_address,
+        get_rate_limit_key,
+        app=app,
         default_limits=rate_config['default_limits'],
-        storage_uri=rate_config['storage'],
-        enabled=rate_config['enabled']
+        storage_uri=get_storage_uri(app, rate_config['storage'])
     )
     
-    # Add custom rate limit decorators
-    add_custom_limits(limiter, rate_config)
-    
     return limiter
 
-def add_custom_limits(limiter, config):
-    """Add custom rate limits for specific endpoints"""
-    
-    # Authentication limits
-    auth_limits = config.get('auth_limits', {})
-    if auth_limits:
-        @limiter.limit(auth_limits.get('login', "5 per minute"))
-        def login_rate_limit():
-            pass
-            
-        @limiter.limit(auth_limits.get('register', "3 per minute"))
-        def register_rate_limit():
-            pass
-            
-        @limiter.limit(auth_limits.get('password_reset', "3 per hour"))
-        def password_reset_rate_limit():
-            pass
-            
-        @limiter.limit(auth_limits.get('google_oauth', "10 per hour"))
-        def google_oauth_rate_limit():
-            pass
-    
-    # API limits
-    api_limits = config.get('api_limits', {})
-    if api_limits:
-        @limiter.limit(api_limits.get('general', "100 per hour"))
-        def api_general_rate_limit():
-            pass
-            
-        @limiter.limit(api_limits.get('create', "50 per hour"))
-        def api_create_rate_limit():
-            pass
-            
-        @limiter.limit(api_limits.get('upload', "20 per hour"))
-        def api_upload_rate_limit():
-            pass
 
 def get_client_ip():
-    """Get client IP address for rate limiting"""
-    if request.headers.get('X-Forwarded-For'):
-        return request.headers.get('X-Forwarded-For').split(',')[0].strip()
-    elif request.headers.get('X-Real-IP'):
-        return request.headers.get('X-Real-IP')
-    else:
-        return get_remote_address()
+    """
+    Client IP address for rate limiting.
+
+    The socket peer, or behind a reverse proxy the address ProxyFix took from
+    the hop the proxy appended to X-Forwarded-For (PROXY_FIX_X_FOR, see
+    create_app). Headers the client sends itself are never trusted, so
+    rotating X-Forwarded-For does not reset a limit.
+    """
+    return get_remote_address()
+
+
+def get_rate_limit_key():
+    """Signed-in users are limited per account, everyone else per client IP"""
+    user_id = session.get('user_id')
+    return f"user:{user_id}" if user_id else get_client_ip()
+
+
+def validate_route_limits(app, route_limits=None, budgets=None):
+    """
+    Check the limit table against the registered endpoints.
+
+    Raises ValueError listing every endpoint that does not exist, every limit
+    that does not parse and every unknown budget, cost or method.
+    """
+    route_limits = ROUTE_LIMITS if route_limits is None else route_limits
+    budgets = RATE_LIMIT_BUDGETS if budgets is None else budgets
+
+    errors = _budget_errors(budgets)
+    for endpoint, spec in route_limits.items():
+        errors.extend(_route_limit_errors(app, endpoint, spec, budgets))
+
+    if errors:
+        raise ValueError("Invalid rate limit table:\n  " + "\n  ".join(errors))
+
+
+def _invalid_limit(value):
+    try:
+        parse_many(value)
+        return False
+    except ValueError:
+        return True
+
+
+def _budget_errors(budgets):
+    return [f"budget {name}: invalid limit {value!r}" for name, value in budgets.items() if _invalid_limit(value)]
+
+
+def _route_limit_errors(app, endpoint, spec, budgets):
+    """Problems with one ROUTE_LIMITS entry"""
+    if endpoint not in app.view_functions:
+        return [f"{endpoint}: no such endpoint"]
+
+    errors = []
+    unknown = set(spec) - ROUTE_LIMIT_KEYS
+    if unknown:
+        errors.append(f"{endpoint}: unknown keys {sorted(unknown)}")
+    if not spec.get('limit') and not spec.get('budget'):
+        errors.append(f"{endpoint}: needs a limit or a budget")
+    if spec.get('limit') and _invalid_limit(spec['limit']):
+        errors.append(f"{endpoint}: invalid limit {spec['limit']!r}")
+    if spec.get('budget') and spec['budget'] not in budgets:
+        errors.append(f"{endpoint}: unknown budget {spec['budget']!r}")
+    cost = spec.get('cost', 1)
+    if not callable(cost) and not (isinstance(cost, int) and cost > 0):
+        errors.append(f"{endpoint}: cost must be a positive int or a callable")
+
+    allowed = set()
+    for rule in app.url_map.iter_rules(endpoint):
+        allowed |= rule.methods
+    errors.extend(f"{endpoint}: does not accept {method}"
+                  for method in spec.get('methods') or [] if method.upper() not in allowed)
+    return errors
+
+
+def apply_route_limits(app, limiter):
+    """
+    Validate ROUTE_LIMITS and attach it to the registered view functions.
+
+    Runs after the blueprints are registered. The table is validated even
+    when rate limiting is disabled, so a renamed endpoint fails at startup in
+    development rather than silently losing its limit in production.
+    """
+    validate_route_limits(app)
+    if not isinstance(limiter, Limiter):
+        return
+
+    for endpoint, spec in ROUTE_LIMITS.items():
+        view = app.view_functions[endpoint]
+        options = dict(key_func=get_rate_limit_key, methods=spec.get('methods'), override_defaults=False)
+        if spec.get('limit'):
+            view = limiter.limit(spec['limit'], **options)(view)
+        if spec.get('budget'):
+            budget = spec['budget']
+            view = limiter.shared_limit(RATE_LIMIT_BUDGETS[budget], scope=budget,
+                                        cost=spec.get('cost', 1), **options)(view)
+        app.view_functions[endpoint] = view
@@ -41,6 +41,53 @@ class Config:
     
     # Server settings
     PORT = int(os.environ.get('PORT', 5004))
+    
+    # User identity cache (0 disables caching). Per worker: deactivation and password changes
+    # reach the other workers only when their entry expires, i.e. after up to USER_CACHE_TTL
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))  # seconds
+    EXPOSE_USER_LOOKUP_COUNT = os.environ.get('EXPOSE_USER_LOOKUP_COUNT', 'false').lower() == 'true'
+    
+    # Track page dashboard cache per user, invalidated on session/note/lesson writes (0 disables)
+    TRACK_DASHBOARD_CACHE_SIZE = int(os.environ.get('TRACK_DASHBOARD_CACHE_SIZE', 1024))
+    TRACK_DASHBOARD_CACHE_TTL = int(os.environ.get('TRACK_DASHBOARD_CACHE_TTL', 30))  # seconds
+    
+    # Pomodoro statistics refresh queue: 'sync', 'thread' or 'sqlite' (persistent, shared by workers)
+    STATISTICS_QUEUE_MODE = os.environ.get('STATISTICS_QUEUE_MODE', 'thread')
+    STATISTICS_QUEUE_PATH = os.environ.get('STATISTICS_QUEUE_PATH')  # defaults to instance/statistics_queue.db
+    STATISTICS_QUEUE_DEBOUNCE = float(os.environ.get('STATISTICS_QUEUE_DEBOUNCE', 2.0))  # seconds
+    STATISTICS_QUEUE_MAX_DELAY = float(os.environ.get('STATISTICS_QUEUE_MAX_DELAY', 10.0))  # seconds
+    
+    # Full-text search index (SQLite FTS5 / PostgreSQL tsvector), created on startup; false uses LIKE search
+    SEARCH_INDEX_ENABLED = os.environ.get('SEARCH_INDEX_ENABLED', 'true').lower() == 'true'
+    
+    # SQL instrumentation: Server-Timing header, slow-query log and N+1 detection per request
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'false').lower() == 'true'
+    SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', 200))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', 10))  # repeats of one statement shape
+    SQL_SLOWEST_STATEMENTS = int(os.environ.get('SQL_SLOWEST_STATEMENTS', 5))
+    SQL_DEBUG_ENDPOINT = os.environ.get('SQL_DEBUG_ENDPOINT', 'false').lower() == 'true'  # /_debug/queries (admins) outside debug mode
+    
+    # Rate limit counters shared by all workers: RATELIMIT_STORAGE_URI if set, else Redis when
+    # REDIS_URL is set, else sqlite:///<instance>/rate_limits.db (see app/config/rate_limiting.py)
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI')
+    # true/false; unset means on in production and off in development and testing
+    RATE_LIMITING_ENABLED = {'true': True, 'false': False}.get(os.environ.get('RATE_LIMITING_ENABLED', '').lower())
+    # Reverse proxies in front of the app that append the client to X-Forwarded-For (0: trust none)
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    RATELIMIT_STRATEGY = os.environ.get('RATELIMIT_STRATEGY', 'sliding-window-counter')
+    RATELIMIT_SWALLOW_ERRORS = True  # an unavailable counter store must not fail requests
+    REDIS_URL = os.environ.get('REDIS_URL')
+    
+    # Online SQLite backups (`flask backup`); rotating snapshots go to BACKUP_DIR
+    BACKUP_DIR = os.environ.get('BACKUP_DIR') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', '..', 'database', 'backups'
+    )
+    BACKUP_RETENTION_DAYS = int(os.environ.get('BACKUP_RETENTION_DAYS', 30))
+    BACKUP_KEEP_MIN = int(os.environ.get('BACKUP_KEEP_MIN', 3))  # newest snapshots kept regardless of age
+    BACKUP_COMPRESS = os.environ.get('BACKUP_COMPRESS', 'false').lower() == 'true'
+    BACKUP_PAGES_PER_STEP = int(os.environ.get('BACKUP_PAGES_PER_STEP', 256))  # rollback-journal databases
+    BACKUP_STEP_PAUSE = float(os.environ.get('BACKUP_STEP_PAUSE', 0.01))  # seconds between steps
 
 
 class DevelopmentConfig(Config):
@@ -70,6 +117,8 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    EXPOSE_USER_LOOKUP_COUNT = True
+    STATISTICS_QUEUE_MODE = 'sync'
     
     # Rate Limiting Configuration
     RATELIMIT_STORAGE_URL = "memory://"
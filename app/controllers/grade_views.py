@@ -406,7 +406,7 @@ class GradeController:
         db.session.commit()
         
         # Recalculate summary
-        GradeController.calculate_grade_summary(item.lesson_id, user_id)
+        GradeController.refresh_grade_summary(item.lesson_id, user_id)
         
         return entry
     
@@ -491,45 +491,74 @@ class GradeController:
     # ==========================================
     
     @staticmethod
-    def calculate_grade_summary(lesson_id: str, user_id: str):
+    def _load_grade_data(lesson_id: str, user_id: str):
         """
-        Calculate complete grade summary for a student
-        Returns summary with current grade, goals, and what-if data
+        Load everything a grade calculation needs in two queries
+
+        Returns:
+            (categories, entries) where categories is a list of
+            (category, [published items]) and entries maps grade_item_id
+            to the user's graded entry
         """
-        from app.models.grade import GradeConfig, GradeCategory, GradeItem, GradeEntry, GradeSummary
+        from app.models.grade import GradeEntry
         
-        # Get config
-        config = GradeConfig.query.filter_by(lesson_id=lesson_id).first()
-        if not config:
-            return {'error': 'Grade configuration not set'}
+        categories = GradeController._load_lesson_structure(lesson_id)
         
-        grading_scale = json.loads(config.grading_scale)
+        # The user's graded entries for the lesson; with duplicates per item the
+        # oldest one counts (calculate_class_analytics picks the same one)
+        entries = {}
+        for entry in GradeEntry.query.filter_by(
+            lesson_id=lesson_id,
+            user_id=user_id,
+            status='graded'
+        ).order_by(GradeEntry.created_at, GradeEntry.id).all():
+            entries.setdefault(entry.grade_item_id, entry)
         
-        # Get categories
-        categories = GradeCategory.query.filter_by(lesson_id=lesson_id).all()
+        return categories, entries
+    
+    @staticmethod
+    def _load_lesson_structure(lesson_id: str):
+        """Categories of a lesson with their published items, as [(category, [items])]"""
+        from app.models.grade import GradeCategory, GradeItem
+        from sqlalchemy import and_
+        
+        # Categories with their published items (outer join keeps empty categories)
+        rows = db.session.query(GradeCategory, GradeItem).outerjoin(
+            GradeItem,
+            and_(GradeItem.category_id == GradeCategory.id, GradeItem.is_published.is_(True))
+        ).filter(
+            GradeCategory.lesson_id == lesson_id
+        ).order_by(GradeCategory.order_index, GradeCategory.created_at).all()
+        
+        categories = []
+        items_by_category = {}
+        for category, item in rows:
+            if category.id not in items_by_category:
+                items_by_category[category.id] = []
+                categories.append((category, items_by_category[category.id]))
+            if item is not None:
+                items_by_category[category.id].append(item)
         
+        return categories
+    
+    @staticmethod
+    def _calculate_category_breakdown(categories, entries: Dict):
+        """
+        Weighted category math over preloaded items and entries (no queries)
+
+        Returns:
+            (total_weighted_score, category_breakdown)
+        """
         total_weighted_score = 0
         category_breakdown = {}
         
-        for category in categories:
-            # Get all items in this category
-            items = GradeItem.query.filter_by(
-                category_id=category.id,
-                is_published=True
-            ).all()
-            
-            # Get grades for these items
+        for category, items in categories:
             total_earned = 0
             total_possible = 0
             graded_count = 0
             
             for item in items:
-                entry = GradeEntry.query.filter_by(
-                    grade_item_id=item.id,
-                    user_id=user_id,
-                    status='graded'
-                ).first()
-                
+                entry = entries.get(item.id)
                 if entry and entry.score is not None:
                     total_earned += float(entry.score)
                     total_possible += float(entry.points_possible)
@@ -559,56 +588,71 @@ class GradeController:
                 'pending_items': len(items) - graded_count
             }
         
-        # Get letter grade
-        letter_grade = GradeController._get_letter_grade(total_weighted_score, grading_scale)
-        gpa = grading_scale[letter_grade]['gpa']
+        return total_weighted_score, category_breakdown
+    
+    @staticmethod
+    def get_grade_summary(lesson_id: str, user_id: str):
+        """
+        Get grade summary for a student, served from GradeSummary while fresh
+        Only recomputes (and writes) when a grade write has marked it stale
+        """
+        from app.models.grade import GradeSummary
         
-        # Calculate goals
-        goals = GradeController._calculate_goals(
-            lesson_id=lesson_id,
+        summary = GradeSummary.query.filter_by(
             user_id=user_id,
-            current_percentage=total_weighted_score,
-            grading_scale=grading_scale
-        )
+            lesson_id=lesson_id
+        ).first()
+        
+        if summary and not summary.is_stale and summary.summary_data:
+            return json.loads(summary.summary_data)
+        
+        return GradeController.refresh_grade_summary(lesson_id, user_id)
+    
+    @staticmethod
+    def refresh_grade_summary(lesson_id: str, user_id: str):
+        """Recompute a student's grade summary and store it in GradeSummary"""
+        from app.models.grade import GradeSummary
+        
+        result = GradeController.calculate_grade_summary(lesson_id, user_id)
+        if 'error' in result:
+            return result
+        
+        percentage = result['percentage']
         
-        # Save/update summary
         summary = GradeSummary.query.filter_by(
             user_id=user_id,
             lesson_id=lesson_id
         ).first()
         
-        if summary:
-            summary.current_score = total_weighted_score
-            summary.percentage = total_weighted_score
-            summary.letter_grade = letter_grade
-            summary.gpa = gpa
-            summary.is_passing = total_weighted_score >= float(config.passing_percentage)
-            summary.points_to_next_grade = json.dumps(goals.get('points_to_grades', {}))
-            summary.last_calculated = datetime.utcnow()
-        else:
-            summary = GradeSummary(
-                user_id=user_id,
-                lesson_id=lesson_id,
-                current_score=total_weighted_score,
-                percentage=total_weighted_score,
-                letter_grade=letter_grade,
-                gpa=gpa,
-                is_passing=total_weighted_score >= float(config.passing_percentage),
-                points_to_next_grade=json.dumps(goals.get('points_to_grades', {})),
-                last_calculated=datetime.utcnow()
-            )
+        if not summary:
+            summary = GradeSummary(user_id=user_id, lesson_id=lesson_id)
             db.session.add(summary)
         
+        summary.current_score = percentage
+        summary.percentage = percentage
+        summary.letter_grade = result['letter_grade']
+        summary.gpa = result['gpa']
+        summary.is_passing = result['is_passing']
+        summary.points_to_next_grade = json.dumps(result['goals'].get('points_to_grades', {}))
+        summary.summary_data = json.dumps(result)
+        summary.is_stale = False
+        summary.last_calculated = datetime.utcnow()
+        
         db.session.commit()
         
-        return {
-            'percentage': round(total_weighted_score, 2),
-            'letter_grade': letter_grade,
-            'gpa': gpa,
-            'is_passing': total_weighted_score >= float(config.passing_percentage),
-            'category_breakdown': category_breakdown,
-            'goals': goals
-        }
+        return result
+    
+    @staticmethod
+    def calculate_grade_summary(lesson_id: str, user_id: str):
+        """
+        Calculate complete grade summary for a student (read-only, no writes)
+        Returns summary with current grade, goals, and what-if data
+        """
+        snapshot = GradeSnapshot.load(lesson_id, user_id)
+        if snapshot is None:
+            return {'error': 'Grade configuration not set'}
+        
+        return snapshot.summary()
     
     @staticmethod
     def _get_letter_grade(percentage: float, grading_scale: Dict) -> str:
@@ -619,24 +663,13 @@ class GradeController:
         return 'F'
     
     @staticmethod
-    def _calculate_goals(lesson_id: str, user_id: str, current_percentage: float, grading_scale: Dict) -> Dict:
-        """Calculate points needed for each grade"""
-        from app.models.grade import GradeItem, GradeEntry
-        
-        # Get remaining items (not yet graded)
-        all_items = GradeItem.query.filter_by(
-            lesson_id=lesson_id,
-            is_published=True
-        ).all()
-        
-        graded_items = GradeEntry.query.filter_by(
-            lesson_id=lesson_id,
-            user_id=user_id,
-            status='graded'
-        ).all()
-        
-        graded_item_ids = {entry.grade_item_id for entry in graded_items}
-        remaining_items = [item for item in all_items if item.id not in graded_item_ids]
+    def _calculate_goals(categories, entries: Dict, current_percentage: float, grading_scale: Dict) -> Dict:
+        """Calculate points needed for each grade from preloaded items and entries"""
+        # Remaining items (not yet graded)
+        remaining_items = [
+            item for _, items in categories for item in items
+            if item.id not in entries
+        ]
         
         total_remaining_points = sum(float(item.points_possible) for item in remaining_items)
         
@@ -693,22 +726,11 @@ class GradeController:
     @staticmethod
     def calculate_goal(lesson_id: str, user_id: str, target_grade: str):
         """Calculate what score is needed to achieve target grade"""
-        summary = GradeController.calculate_grade_summary(lesson_id, user_id)
-        
-        if 'error' in summary:
-            return summary
-        
-        goals = summary['goals']['goals']
-        
-        if target_grade not in goals:
-            raise ValidationException(f"Invalid target grade: {target_grade}")
+        snapshot = GradeSnapshot.for_request(lesson_id, user_id)
+        if snapshot is None:
+            return {'error': 'Grade configuration not set'}
         
-        return {
-            'target_grade': target_grade,
-            'current_grade': summary['letter_grade'],
-            'current_percentage': summary['percentage'],
-            'goal_info': goals[target_grade]
-        }
+        return snapshot.goal(target_grade)
     
     # ==========================================
     # WHAT-IF CALCULATOR
@@ -724,70 +746,323 @@ class GradeController:
             user_id: User ID
             hypothetical_scores: Dict of {grade_item_id: hypothetical_score}
         """
-        from app.models.grade import GradeConfig, GradeCategory, GradeItem, GradeEntry
+        snapshot = GradeSnapshot.for_request(lesson_id, user_id)
+        if snapshot is None:
+            return {'error': 'Grade configuration not set'}
+        
+        return snapshot.what_if(hypothetical_scores)
+    
+    @staticmethod
+    def calculate_what_if_scenarios(lesson_id: str, user_id: str, scenarios: List[Dict]):
+        """
+        Calculate several what-if scenarios against one snapshot
+        
+        Args:
+            lesson_id: Lesson ID
+            user_id: User ID
+            scenarios: List of {grade_item_id: hypothetical_score} dicts
+        """
+        snapshot = GradeSnapshot.for_request(lesson_id, user_id)
+        if snapshot is None:
+            return {'error': 'Grade configuration not set'}
         
-        # Get current summary first
-        current_summary = GradeController.calculate_grade_summary(lesson_id, user_id)
+        return {
+            'current_percentage': snapshot.summary()['percentage'],
+            'scenarios': [snapshot.what_if(scores) for scores in scenarios]
+        }
+    
+    # ==========================================
+    # CLASS ANALYTICS
+    # ==========================================
+    
+    @staticmethod
+    def calculate_class_analytics(lesson_id: str):
+        """
+        Grade summaries for every class member, computed in bulk
         
-        if 'error' in current_summary:
-            return current_summary
+        Uses one grouped aggregate over grade_entry for all members instead of
+        a summary per member. Returns a columnar payload (parallel lists).
+        Members without graded work have no percentage or grade; they are
+        counted in ungraded_count instead of the distribution.
+        """
+        from app.models.grade import GradeConfig
+        from sqlalchemy import text
         
-        # Get config
         config = GradeConfig.query.filter_by(lesson_id=lesson_id).first()
+        if not config:
+            return {'error': 'Grade configuration not set'}
+        
         grading_scale = json.loads(config.grading_scale)
+        passing_percentage = float(config.passing_percentage)
         
-        # Get categories
-        categories = GradeCategory.query.filter_by(lesson_id=lesson_id).all()
+        categories = [category for category, _ in GradeController._load_lesson_structure(lesson_id)]
+        category_index = {category.id: index for index, category in enumerate(categories)}
+        weights = [float(category.weight) for category in categories]
         
-        total_weighted_score = 0
+        members = db.session.execute(
+            text("""
+                SELECT m.user_id, u.username, u.first_name, u.last_name, m.role
+                FROM member m
+                JOIN user u ON u.id = m.user_id
+                WHERE m.lesson_id = :lesson_id
+                ORDER BY u.username
+            """),
+            {'lesson_id': lesson_id}
+        ).fetchall()
+        member_index = {row[0]: index for index, row in enumerate(members)}
         
-        for category in categories:
-            items = GradeItem.query.filter_by(
-                category_id=category.id,
-                is_published=True
-            ).all()
-            
-            if not items:
+        # Earned/possible/graded count per (member, category) in one pass. Only the
+        # oldest graded entry per (user, item) counts, as in _load_grade_data
+        totals = db.session.execute(
+            text("""
+                WITH graded_entry AS (
+                    SELECT ge.user_id, ge.grade_item_id, ge.score, ge.points_possible,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY ge.user_id, ge.grade_item_id
+                               ORDER BY ge.created_at, ge.id
+                           ) AS position
+                    FROM grade_entry ge
+                    WHERE ge.lesson_id = :lesson_id
+                    AND ge.status = 'graded'
+                )
+                SELECT ge.user_id, gi.category_id,
+                       SUM(ge.score) AS earned,
+                       SUM(ge.points_possible) AS possible,
+                       COUNT(*) AS graded
+                FROM graded_entry ge
+                JOIN grade_item gi ON gi.id = ge.grade_item_id
+                JOIN member m ON m.user_id = ge.user_id AND m.lesson_id = :lesson_id
+                WHERE ge.position = 1
+                AND ge.score IS NOT NULL
+                AND gi.is_published = 1
+                GROUP BY ge.user_id, gi.category_id
+            """),
+            {'lesson_id': lesson_id}
+        ).fetchall()
+        
+        earned = [[0.0] * len(categories) for _ in members]
+        possible = [[0.0] * len(categories) for _ in members]
+        graded = [0] * len(members)
+        for user_id, category_id, row_earned, row_possible, row_graded in totals:
+            if user_id not in member_index or category_id not in category_index:
                 continue
-            
-            total_earned = 0
-            total_possible = 0
-            
+            member, category = member_index[user_id], category_index[category_id]
+            earned[member][category] = float(row_earned or 0)
+            possible[member][category] = float(row_possible or 0)
+            graded[member] += row_graded
+        
+        percentages = []
+        letter_grades = []
+        distribution = {grade: 0 for grade in grading_scale}
+        for member in range(len(members)):
+            if not graded[member]:
+                percentages.append(None)
+                letter_grades.append(None)
+                continue
+            percentage = sum(
+                (earned[member][index] / possible[member][index]) * 100 * (weights[index] / 100)
+                for index in range(len(categories))
+                if possible[member][index] > 0
+            )
+            letter_grade = GradeController._get_letter_grade(percentage, grading_scale)
+            percentages.append(round(percentage, 2))
+            letter_grades.append(letter_grade)
+            distribution[letter_grade] = distribution.get(letter_grade, 0) + 1
+        
+        # Averages only count members with graded work
+        category_averages = []
+        for index in range(len(categories)):
+            scores = [
+                earned[member][index] / possible[member][index] * 100
+                for member in range(len(members))
+                if possible[member][index] > 0
+            ]
+            category_averages.append(round(sum(scores) / len(scores), 2) if scores else None)
+        
+        graded_percentages = [percentage for percentage in percentages if percentage is not None]
+        class_average = round(sum(graded_percentages) / len(graded_percentages), 2) if graded_percentages else None
+        
+        return {
+            'lesson_id': lesson_id,
+            'member_count': len(members),
+            'class_average': class_average,
+            'class_average_grade': (
+                GradeController._get_letter_grade(class_average, grading_scale)
+                if class_average is not None else None
+            ),
+            'show_class_average': bool(config.show_class_average),
+            'distribution': distribution,
+            'ungraded_count': len(members) - len(graded_percentages),
+            'categories': {
+                'id': [category.id for category in categories],
+                'name': [category.name for category in categories],
+                'weight': weights,
+                'average': category_averages
+            },
+            'members': {
+                'user_id': [row[0] for row in members],
+                'username': [row[1] for row in members],
+                'name': [' '.join(part for part in (row[2], row[3]) if part) or row[1] for row in members],
+                'role': [row[4] for row in members],
+                'percentage': percentages,
+                'letter_grade': letter_grades,
+                'gpa': [grading_scale[grade]['gpa'] if grade else None for grade in letter_grades],
+                'is_passing': [
+                    percentage >= passing_percentage if percentage is not None else None
+                    for percentage in percentages
+                ],
+                'graded_items': graded
+            }
+        }
+
+
+class GradeSnapshot:
+    """
+    In-memory grade data for one student in one lesson
+    
+    Loaded with three queries; per-category score/points arrays let what-if
+    and goal calculations run without further database round trips. A
+    scenario only adjusts the categories of the items it overrides.
+    """
+    
+    def __init__(self, grading_scale: Dict, passing_percentage: float, categories, entries: Dict):
+        self.grading_scale = grading_scale
+        self.passing_percentage = passing_percentage
+        self.categories = categories
+        self.entries = entries
+        
+        # Per-category arrays (index = category position)
+        self.weights = [float(category.weight) for category, _ in categories]
+        self.earned = [0.0] * len(categories)
+        self.possible = [0.0] * len(categories)
+        
+        # item_id -> (category index, item points, graded score or None, graded points)
+        self.items = {}
+        for index, (_, items) in enumerate(categories):
             for item in items:
-                # Use hypothetical score if provided
-                if item.id in hypothetical_scores:
-                    score = hypothetical_scores[item.id]
-                    total_earned += score
-                    total_possible += float(item.points_possible)
-                else:
-                    # Use actual grade
-                    entry = GradeEntry.query.filter_by(
-                        grade_item_id=item.id,
-                        user_id=user_id,
-                        status='graded'
-                    ).first()
-                    
-                    if entry and entry.score is not None:
-                        total_earned += float(entry.score)
-                        total_possible += float(entry.points_possible)
+                entry = entries.get(item.id)
+                score = None
+                points = 0.0
+                if entry and entry.score is not None:
+                    score = float(entry.score)
+                    points = float(entry.points_possible)
+                    self.earned[index] += score
+                    self.possible[index] += points
+                self.items[item.id] = (index, float(item.points_possible), score, points)
+        
+        self.percentage = self._weighted_percentage(self.earned, self.possible)
+        self._summary = None
+    
+    @classmethod
+    def load(cls, lesson_id: str, user_id: str) -> Optional['GradeSnapshot']:
+        """Load a snapshot, or None when the lesson has no grade configuration"""
+        from app.models.grade import GradeConfig
+        
+        config = GradeConfig.query.filter_by(lesson_id=lesson_id).first()
+        if not config:
+            return None
+        
+        categories, entries = GradeController._load_grade_data(lesson_id, user_id)
+        return cls(
+            grading_scale=json.loads(config.grading_scale),
+            passing_percentage=float(config.passing_percentage),
+            categories=categories,
+            entries=entries
+        )
+    
+    @classmethod
+    def for_request(cls, lesson_id: str, user_id: str) -> Optional['GradeSnapshot']:
+        """Load a snapshot at most once per request"""
+        from flask import g, has_request_context
+        
+        if not has_request_context():
+            return cls.load(lesson_id, user_id)
+        
+        snapshots = g.setdefault('_grade_snapshots', {})
+        key = (lesson_id, user_id)
+        if key not in snapshots:
+            snapshots[key] = cls.load(lesson_id, user_id)
+        return snapshots[key]
+    
+    def summary(self) -> Dict:
+        """Full grade summary (same shape as GradeController.calculate_grade_summary)"""
+        if self._summary is None:
+            _, category_breakdown = GradeController._calculate_category_breakdown(self.categories, self.entries)
+            letter_grade = self.letter_grade(self.percentage)
+            self._summary = {
+                'percentage': round(self.percentage, 2),
+                'letter_grade': letter_grade,
+                'gpa': self.grading_scale[letter_grade]['gpa'],
+                'is_passing': self.percentage >= self.passing_percentage,
+                'category_breakdown': category_breakdown,
+                'goals': GradeController._calculate_goals(
+                    categories=self.categories,
+                    entries=self.entries,
+                    current_percentage=self.percentage,
+                    grading_scale=self.grading_scale
+                )
+            }
+        return self._summary
+    
+    def letter_grade(self, percentage: float) -> str:
+        return GradeController._get_letter_grade(percentage, self.grading_scale)
+    
+    def what_if(self, hypothetical_scores: Dict) -> Dict:
+        """Evaluate one what-if scenario; unknown item ids are ignored"""
+        if hypothetical_scores is not None and not isinstance(hypothetical_scores, dict):
+            raise ValidationException("Hypothetical scores must be an object of {item_id: score}")
+        
+        earned = list(self.earned)
+        possible = list(self.possible)
+        
+        for item_id, hypothetical in (hypothetical_scores or {}).items():
+            item = self.items.get(item_id)
+            if item is None:
+                continue
+            try:
+                hypothetical = float(hypothetical)
+            except (TypeError, ValueError):
+                raise ValidationException(f"Invalid hypothetical score for item {item_id}")
             
-            # Calculate category percentage
-            if total_possible > 0:
-                category_percentage = (total_earned / total_possible) * 100
-                weighted_score = category_percentage * (float(category.weight) / 100)
-                total_weighted_score += weighted_score
+            index, item_points, score, points = item
+            if score is not None:
+                earned[index] -= score
+                possible[index] -= points
+            earned[index] += hypothetical
+            possible[index] += item_points
         
-        # Get hypothetical letter grade
-        hypothetical_grade = GradeController._get_letter_grade(total_weighted_score, grading_scale)
-        hypothetical_gpa = grading_scale[hypothetical_grade]['gpa']
+        percentage = self._weighted_percentage(earned, possible)
+        current_grade = self.letter_grade(self.percentage)
+        hypothetical_grade = self.letter_grade(percentage)
         
         return {
-            'current_percentage': current_summary['percentage'],
-            'current_grade': current_summary['letter_grade'],
-            'current_gpa': current_summary['gpa'],
-            'hypothetical_percentage': round(total_weighted_score, 2),
+            'current_percentage': round(self.percentage, 2),
+            'current_grade': current_grade,
+            'current_gpa': self.grading_scale[current_grade]['gpa'],
+            'hypothetical_percentage': round(percentage, 2),
             'hypothetical_grade': hypothetical_grade,
-            'hypothetical_gpa': hypothetical_gpa,
-            'difference': round(total_weighted_score - current_summary['percentage'], 2)
+            'hypothetical_gpa': self.grading_scale[hypothetical_grade]['gpa'],
+            'difference': round(percentage - round(self.percentage, 2), 2)
         }
-
+    
+    def goal(self, target_grade: str) -> Dict:
+        """Points needed on remaining work to reach target_grade"""
+        summary = self.summary()
+        goals = summary['goals']['goals']
+        
+        if target_grade not in goals:
+            raise ValidationException(f"Invalid target grade: {target_grade}")
+        
+        return {
+            'target_grade': target_grade,
+            'current_grade': summary['letter_grade'],
+            'current_percentage': summary['percentage'],
+            'goal_info': goals[target_grade]
+        }
+    
+    def _weighted_percentage(self, earned: List[float], possible: List[float]) -> float:
+        return sum(
+            (earned[index] / possible[index]) * 100 * (self.weights[index] / 100)
+            for index in range(len(self.weights))
+            if possible[index] > 0
+        )
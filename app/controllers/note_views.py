@@ -427,7 +427,7 @@ class NoteController:
                 }), 400
             
             limit = request.args.get('limit', type=int)
-            notes = self._note_service.search_notes_by_tags(current_user.id, tags, limit=limit)
+            notes = self._note_service.search_notes_by_tags(tags, user_id=current_user.id, limit=limit)
             
             return jsonify({
                 'success': True,
@@ -723,8 +723,13 @@ class NoteController:
         """
         Get all unique tags for current user.
         
+        Query params:
+            q: Only tags starting with this prefix (autocomplete)
+            limit: Maximum number of tags
+            counts: When true, return [{tag, count}] instead of tag names
+        
         Returns:
-            JSON response with tags list
+            JSON response with tags list, most used first
         """
         try:
             current_user = g.user
@@ -734,7 +739,12 @@ class NoteController:
                     'message': 'User not authenticated'
                 }), 401
             
-            tags = self._note_service.get_all_user_tags(current_user.id)
+            prefix = request.args.get('q', '').strip() or None
+            limit = request.args.get('limit', type=int)
+            if request.args.get('counts', 'false').lower() == 'true':
+                tags = self._note_service.get_tag_counts(current_user.id, prefix=prefix, limit=limit)
+            else:
+                tags = self._note_service.get_all_user_tags(current_user.id, prefix=prefix, limit=limit)
             
             return jsonify({
                 'success': True,
@@ -30,6 +30,19 @@ class PomodoroStatisticsViews:
         except Exception as e:
             return jsonify({'error': 'Internal server error'}), 500
 
+    def get_queue_metrics(self) -> Dict[str, Any]:
+        """Get depth, lag and throughput of the statistics refresh queue."""
+        try:
+            from app.workers import statistics_queue
+
+            return jsonify({
+                'success': True,
+                'queue': statistics_queue.metrics()
+            }), 200
+
+        except Exception as e:
+            return jsonify({'error': 'Internal server error'}), 500
+
     def get_daily_progress(self) -> Dict[str, Any]:
         """Get user's progress towards daily target."""
         try:
@@ -2,3 +2,4 @@
 Middleware package for request/response processing.
 """
 from .auth_middleware import load_user, login_required
+from .identity import resolve_current_user, invalidate_user, init_identity_cache
@@ -2,10 +2,8 @@
 Authentication middleware for MVC architecture.
 """
 from functools import wraps
-from flask import request, jsonify, session, g
-from typing import Optional
-from app.services import UserService
-from app.utils.exceptions import AuthenticationException, AuthorizationException
+from flask import request, jsonify, g
+from .identity import resolve_current_user
 
 
 def login_required(f):
@@ -138,18 +136,4 @@ def load_user():
     Load user into g for easy access.
     This function is called before each request.
     """
-    user_id = session.get('user_id')
-    if user_id:
-        try:
-            user_service = UserService()
-            user = user_service.get_user_by_id(user_id)
-            if user and user.is_active:
-                g.user = user
-            else:
-                g.user = None
-                session.pop('user_id', None)
-        except Exception:
-            g.user = None
-            session.pop('user_id', None)
-    else:
-        g.user = None
+    resolve_current_user()
@@ -0,0 +1,202 @@
+"""
+Request-scoped identity resolution.
+
+The current user is resolved at most once per request and memoized on ``g``.
+Active users are additionally kept in a small process-level TTL/LRU cache so
+that most authenticated requests issue no user query at all.
+
+The cache is per process. A write invalidates the entry only in the worker
+that handled it; the other gunicorn workers keep serving the old snapshot
+(including is_active) until USER_CACHE_TTL expires. A deactivated user can
+therefore stay signed in on other workers for up to USER_CACHE_TTL seconds;
+lower it (or set it to 0) where that window matters.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from flask import g, has_app_context, session
+
+
+class UserIdentityCache:
+    """
+    Thread-safe TTL/LRU cache of user column snapshots keyed by user ID.
+
+    Snapshots (plain dicts) are stored instead of ORM instances because
+    instances are bound to the request's session and are detached or expired
+    once that session is removed.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def configure(self, max_size: int, ttl: float) -> None:
+        with self._lock:
+            self.max_size = max_size
+            self.ttl = ttl
+            self._entries.clear()
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, snapshot = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return snapshot
+
+    def set(self, user_id: str, snapshot: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Process-level cache shared by all requests served by this worker
+user_cache = UserIdentityCache()
+
+_listeners_registered = False
+
+
+def record_user_lookup() -> None:
+    """Count a user lookup query against the current request."""
+    if has_app_context():
+        g.user_lookup_queries = getattr(g, 'user_lookup_queries', 0) + 1
+
+
+def invalidate_user(user_id: Optional[str]) -> None:
+    """Drop a user from the identity cache after profile/password/status changes."""
+    if user_id:
+        user_cache.invalidate(user_id)
+
+
+def _snapshot_user(user) -> Dict[str, Any]:
+    from sqlalchemy import inspect
+
+    mapper = inspect(type(user))
+    return {attr.key: getattr(user, attr.key) for attr in mapper.column_attrs}
+
+
+def _restore_user(snapshot: Dict[str, Any]):
+    """Rebuild a session-bound UserModel from a snapshot without querying."""
+    from sqlalchemy.orm import make_transient_to_detached
+    from app import db
+    from app.models.user import UserModel
+
+    user = UserModel(**snapshot)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def resolve_current_user():
+    """
+    Resolve the logged-in user for this request.
+
+    The first call per request consults the identity cache and falls back to
+    ``UserService.get_user_by_id``; later calls return the memoized ``g.user``.
+    Inactive or missing users are logged out.
+
+    Returns:
+        UserModel or None
+    """
+    if getattr(g, '_identity_resolved', False):
+        return g.user
+
+    g._identity_resolved = True
+    g.user = None
+
+    user_id = session.get('user_id')
+    if not user_id:
+        return None
+
+    try:
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            g.user = _restore_user(snapshot)
+            return g.user
+
+        from app.services import UserService
+        user = UserService().get_user_by_id(user_id)
+        if user and user.is_active:
+            user_cache.set(user_id, _snapshot_user(user))
+            g.user = user
+        else:
+            session.pop('user_id', None)
+    except Exception:
+        g.user = None
+        session.pop('user_id', None)
+
+    return g.user
+
+
+def _on_user_changed(mapper, connection, target):
+    invalidate_user(getattr(target, 'id', None))
+
+
+def init_identity_cache(app) -> None:
+    """
+    Configure the identity cache from app config and register invalidation hooks.
+
+    Args:
+        app: Flask application instance
+    """
+    global _listeners_registered
+
+    user_cache.configure(
+        max_size=int(app.config.get('USER_CACHE_SIZE', 1024)),
+        ttl=float(app.config.get('USER_CACHE_TTL', 60))
+    )
+
+    if not _listeners_registered:
+        from sqlalchemy import event
+        from app.models.user import UserModel
+
+        # Catch writes that bypass UserService (e.g. OAuth credential updates)
+        event.listen(UserModel, 'after_update', _on_user_changed)
+        event.listen(UserModel, 'after_delete', _on_user_changed)
+        _listeners_registered = True
+
+    if app.config.get('EXPOSE_USER_LOOKUP_COUNT'):
+        @app.after_request
+        def add_user_lookup_header(response):
+            response.headers['X-User-Lookup-Queries'] = str(getattr(g, 'user_lookup_queries', 0))
+            return response
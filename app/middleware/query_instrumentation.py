@@ -0,0 +1,274 @@
+"""
+Per-request SQL instrumentation.
+
+Opt-in (``SQL_INSTRUMENTATION=true``). Engine events on ``app.db`` and on
+``database.manager.DatabaseManager`` engines record every statement against
+the collector of the current request: statement count, total time, the
+slowest statements and how often each statement shape repeats. Results are
+exposed as a ``Server-Timing`` header and, for recent requests, through the
+``/_debug/queries`` JSON endpoint (admins only). Statements slower than
+``SQL_SLOW_QUERY_MS`` go to the ``app.sql`` logger as one JSON object per
+line, and a shape repeating more than ``SQL_N_PLUS_ONE_THRESHOLD`` times in
+one request is flagged as a likely N+1.
+"""
+import heapq
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from flask import g, jsonify, request
+
+logger = logging.getLogger('app.sql')
+
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_current: ContextVar[Optional['QueryCollector']] = ContextVar('sql_query_collector', default=None)
+_instrumented_engines = set()
+
+# Process-wide settings, overwritten by init_query_instrumentation()
+settings = {
+    'slow_ms': 200.0,
+    'n_plus_one_threshold': 10,
+    'slowest': 5
+}
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a statement so repeats with different parameters compare equal.
+
+    Literals become ``?`` and ``IN (?, ?, ...)`` lists collapse to ``IN (?)``.
+    """
+    shape = _STRING.sub('?', statement)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryCollector:
+    """Statements recorded for one request (or any block of work)."""
+
+    def __init__(self, label: str = ''):
+        self.label = label
+        self.count = 0
+        self.total_ms = 0.0
+        self._slowest: List[tuple] = []  # min-heap of (ms, seq, statement, engine)
+        self._shapes: Counter = Counter()
+        self._seq = 0
+
+    def record(self, statement: str, duration_ms: float, engine: str) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self._shapes[statement_shape(statement)] += 1
+
+        self._seq += 1
+        entry = (duration_ms, self._seq, statement, engine)
+        if len(self._slowest) < settings['slowest']:
+            heapq.heappush(self._slowest, entry)
+        elif duration_ms > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def n_plus_one(self) -> List[Dict[str, Any]]:
+        """Statement shapes repeated more than the configured threshold"""
+        threshold = settings['n_plus_one_threshold']
+        return [
+            {'shape': shape, 'count': count}
+            for shape, count in self._shapes.most_common()
+            if count > threshold
+        ]
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'label': self.label,
+            'count': self.count,
+            'total_ms': round(self.total_ms, 2),
+            'slowest': [
+                {'ms': round(ms, 2), 'engine': engine, 'statement': statement}
+                for ms, _, statement, engine in sorted(self._slowest, reverse=True)
+            ],
+            'n_plus_one': self.n_plus_one()
+        }
+
+
+def current_collector() -> Optional[QueryCollector]:
+    return _current.get()
+
+
+class collect_queries:
+    """
+    Context manager that records statements issued inside the block.
+
+    Usable outside requests too, e.g. in scripts driving DatabaseManager::
+
+        with collect_queries('backfill') as collector:
+            ...
+        print(collector.report())
+    """
+
+    def __init__(self, label: str = ''):
+        self.collector = QueryCollector(label)
+        self._token = None
+
+    def __enter__(self) -> QueryCollector:
+        self._token = _current.set(self.collector)
+        return self.collector
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _make_after_cursor_execute(engine_label: str):
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('query_start_time')
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+
+        collector = _current.get()
+        if collector is not None:
+            collector.record(statement, duration_ms, engine_label)
+
+        if duration_ms >= settings['slow_ms']:
+            logger.warning(json.dumps({
+                'event': 'slow_query',
+                'engine': engine_label,
+                'duration_ms': round(duration_ms, 2),
+                'statement': _WHITESPACE.sub(' ', statement).strip(),
+                'executemany': executemany,
+                'request': collector.label if collector is not None else None
+            }))
+
+    return _after_cursor_execute
+
+
+def instrument_engine(engine, label: str = 'app') -> None:
+    """Attach the timing listeners to an engine (idempotent)."""
+    from sqlalchemy import event
+
+    if id(engine) in _instrumented_engines:
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _make_after_cursor_execute(label))
+    _instrumented_engines.add(id(engine))
+
+
+class RecentRequests:
+    """Bounded, thread-safe history of request reports for the debug endpoint."""
+
+    def __init__(self, max_size: int = 50):
+        self._entries = deque(maxlen=max_size)
+        self._lock = threading.Lock()
+
+    def add(self, report: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries.append(report)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+recent_requests = RecentRequests()
+
+
+def _server_timing(collector: QueryCollector) -> str:
+    metrics = [f'db;dur={collector.total_ms:.2f};desc="queries: {collector.count}"']
+    n_plus_one = collector.n_plus_one()
+    if n_plus_one:
+        metrics.append(f'db-repeat;desc="N+1 suspected ({n_plus_one[0]["count"]}x)"')
+    return ', '.join(metrics)
+
+
+def _start_query_collector():
+    g._query_collector_token = _current.set(QueryCollector(f'{request.method} {request.path}'))
+
+
+def _add_server_timing_header(response):
+    collector = _current.get()
+    if collector is not None:
+        response.headers.add('Server-Timing', _server_timing(collector))
+    return response
+
+
+def _finish_query_collector(exc=None):
+    token = g.pop('_query_collector_token', None)
+    collector = _current.get()
+    if token is None or collector is None:
+        return
+    _current.reset(token)
+    if request.path == '/_debug/queries':
+        return
+
+    report = collector.report()
+    recent_requests.add(report)
+    if report['n_plus_one']:
+        logger.warning(json.dumps({
+            'event': 'n_plus_one',
+            'request': collector.label,
+            'count': report['count'],
+            'repeated': report['n_plus_one']
+        }))
+
+
+def debug_queries():
+    """Query reports for the most recent requests, newest first"""
+    return jsonify({
+        'settings': dict(settings),
+        'requests': recent_requests.snapshot()
+    })
+
+
+def init_query_instrumentation(app) -> None:
+    """
+    Register engine listeners, request hooks and the debug endpoint.
+
+    Does nothing unless ``SQL_INSTRUMENTATION`` is enabled. The debug
+    endpoint shows every user's statements, so it is limited to admins.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get('SQL_INSTRUMENTATION'):
+        return
+
+    settings.update(
+        slow_ms=float(app.config.get('SQL_SLOW_QUERY_MS', 200)),
+        n_plus_one_threshold=int(app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 10)),
+        slowest=int(app.config.get('SQL_SLOWEST_STATEMENTS', 5))
+    )
+
+    from app import db
+
+    with app.app_context():
+        instrument_engine(db.engine, label='app')
+
+    # DatabaseManager instruments its own engine on creation; catch one made before us
+    database_manager = sys.modules.get('database.manager')
+    if database_manager is not None and database_manager.db_manager is not None:
+        instrument_engine(database_manager.db_manager.engine, label='manager')
+
+    # First in line so the user lookup in load_user is counted too
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_query_collector)
+    app.after_request(_add_server_timing_header)
+    app.teardown_request(_finish_query_collector)
+
+    if app.debug or app.config.get('SQL_DEBUG_ENDPOINT'):
+        from .auth_middleware import admin_required
+        app.add_url_rule('/_debug/queries', 'debug_queries', admin_required(debug_queries))
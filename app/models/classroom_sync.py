@@ -0,0 +1,56 @@
+"""
+Google Classroom Sync State SQLAlchemy model for database persistence.
+Infrastructure layer implementation.
+"""
+
+from app import db
+from datetime import datetime
+import uuid
+
+
+class ClassroomSyncStateModel(db.Model):
+    """
+    Import/sync progress of one Google Classroom resource list for a lesson.
+    Holds the page token to resume an interrupted import from and, once the
+    import has completed, the updateTime watermark delta syncs continue from.
+    """
+    __tablename__ = 'classroom_sync_state'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    lesson_id = db.Column(db.String(36), db.ForeignKey('lesson.id'), nullable=False, index=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
+    course_id = db.Column(db.String(100), nullable=False)
+    resource = db.Column(db.String(50), nullable=False)  # courseWork, courseWorkMaterials, announcements
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending, in_progress, completed, failed
+    page_token = db.Column(db.String(500))  # Next page to fetch; NULL once the list is exhausted
+    pages_done = db.Column(db.Integer, default=0, nullable=False)
+    items_imported = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text)
+    watermark = db.Column(db.DateTime)  # Items updated before this are already mirrored
+    last_synced_at = db.Column(db.DateTime)
+    items_deleted = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('lesson_id', 'resource', name='uix_classroom_sync_lesson_resource'),
+    )
+
+    def __repr__(self):
+        return f'<ClassroomSyncStateModel {self.lesson_id} {self.resource} {self.status}>'
+
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'lesson_id': self.lesson_id,
+            'course_id': self.course_id,
+            'resource': self.resource,
+            'status': self.status,
+            'pages_done': self.pages_done,
+            'items_imported': self.items_imported,
+            'items_deleted': self.items_deleted,
+            'last_error': self.last_error,
+            'watermark': self.watermark.isoformat() if self.watermark else None,
+            'last_synced_at': self.last_synced_at.isoformat() if self.last_synced_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -4,6 +4,7 @@ Following MVC pattern: Models handle data persistence
 """
 
 from app import db
+from sqlalchemy import event
 from datetime import datetime
 import uuid
 import json
@@ -157,6 +158,7 @@ class GradeEntry(db.Model):
 class GradeSummary(db.Model):
     """
     Cached grade summary for each student in each lesson
+    Materialized on read; grade writes mark affected rows stale (see listeners below)
     """
     __tablename__ = 'grade_summary'
     
@@ -178,6 +180,10 @@ class GradeSummary(db.Model):
     points_to_pass = db.Column(db.Numeric(10, 2))
     points_to_next_grade = db.Column(db.Text)  # JSON string
     
+    # Cached payload served by read paths until a grade write marks it stale
+    summary_data = db.Column(db.Text)  # JSON string
+    is_stale = db.Column(db.Boolean, default=True, nullable=False)
+    
     # Metadata
     last_calculated = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -193,3 +199,35 @@ class GradeSummary(db.Model):
     def __repr__(self):
         return f'<GradeSummary user={self.user_id} lesson={self.lesson_id} grade={self.letter_grade}>'
 
+
+# ==========================================
+# SUMMARY INVALIDATION
+# ==========================================
+
+def mark_summaries_stale(connection, lesson_id, user_id=None):
+    """Mark cached summaries of a lesson (or one student in it) as stale"""
+    if not lesson_id:
+        return
+    
+    table = GradeSummary.__table__
+    statement = table.update().where(table.c.lesson_id == lesson_id)
+    if user_id:
+        statement = statement.where(table.c.user_id == user_id)
+    connection.execute(statement.values(is_stale=True))
+
+
+def _invalidate_lesson(mapper, connection, target):
+    mark_summaries_stale(connection, target.lesson_id)
+
+
+def _invalidate_student(mapper, connection, target):
+    mark_summaries_stale(connection, target.lesson_id, target.user_id)
+
+
+# Config, category and item changes affect every student; entries only their owner
+for _model in (GradeConfig, GradeCategory, GradeItem):
+    for _event in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _event, _invalidate_lesson)
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(GradeEntry, _event, _invalidate_student)
@@ -5,6 +5,7 @@ Infrastructure layer implementation.
 
 from app import db
 from datetime import datetime
+from sqlalchemy import event
 import uuid
 import json
 
@@ -77,3 +78,123 @@ class NoteModel(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+
+class NoteTagModel(db.Model):
+    """
+    One row per (note, tag): an index over NoteModel.tags.
+
+    NoteModel.tags (JSON text) stays the source of truth; these rows are
+    rewritten whenever it changes so tag search, tag lists and tag counts
+    are indexed lookups instead of parsing every note's JSON.
+    """
+    __tablename__ = 'note_tag'
+
+    note_id = db.Column(db.String(36), db.ForeignKey('note.id', ondelete='CASCADE'), primary_key=True)
+    tag = db.Column(db.String(100), primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_note_tag_user_tag', 'user_id', 'tag'),
+    )
+
+    def __repr__(self):
+        return f'<NoteTagModel {self.note_id} {self.tag}>'
+
+
+class NoteFileModel(db.Model):
+    """
+    Metadata of a file attached to a note.
+
+    The file itself lives under static/uploads/notes/<note_id>/; this row is
+    written when it is uploaded so note lists never touch the file system.
+    `flask notes reconcile-files` repairs drift between the two.
+    """
+    __tablename__ = 'note_file'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    note_id = db.Column(db.String(36), db.ForeignKey('note.id', ondelete='CASCADE'), nullable=False, index=True)
+    file_path = db.Column(db.String(500), nullable=False)  # relative to the static folder
+    file_type = db.Column(db.String(20))  # image, pdf, document
+    filename = db.Column(db.String(255))
+    size = db.Column(db.Integer)  # bytes
+    mime_type = db.Column(db.String(100))
+    sha256 = db.Column(db.String(64))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<NoteFileModel {self.file_path}>'
+
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'id': self.id,
+            'note_id': self.note_id,
+            'file_path': self.file_path,
+            'file_type': self.file_type,
+            'filename': self.filename,
+            'size': self.size,
+            'mime_type': self.mime_type,
+            'sha256': self.sha256,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+# ==========================================
+# TAG INDEX MAINTENANCE
+# ==========================================
+
+def parse_tags(value):
+    """
+    Tags of a note as a list: accepts the stored JSON text or a list.
+
+    Blank tags are dropped and duplicates removed, keeping the first spelling.
+    Unparseable text yields an empty list.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return []
+    if not isinstance(value, list):
+        return []
+
+    tags = []
+    for tag in value:
+        tag = str(tag).strip()
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def replace_note_tags(connection, note_id, user_id, tags):
+    """Rewrite the index rows of one note"""
+    table = NoteTagModel.__table__
+    connection.execute(table.delete().where(table.c.note_id == note_id))
+    rows = [{'note_id': note_id, 'tag': tag, 'user_id': user_id} for tag in parse_tags(tags)]
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+def _index_inserted_note(mapper, connection, target):
+    if target.tags:
+        replace_note_tags(connection, target.id, target.user_id, target.tags)
+
+
+def _index_updated_note(mapper, connection, target):
+    state = db.inspect(target)
+    if state.attrs.tags.history.has_changes() or state.attrs.user_id.history.has_changes():
+        replace_note_tags(connection, target.id, target.user_id, target.tags)
+
+
+def _unindex_deleted_note(mapper, connection, target):
+    # SQLite only cascades with PRAGMA foreign_keys=ON
+    for table in (NoteTagModel.__table__, NoteFileModel.__table__):
+        connection.execute(table.delete().where(table.c.note_id == target.id))
+
+
+event.listen(NoteModel, 'after_insert', _index_inserted_note)
+event.listen(NoteModel, 'after_update', _index_updated_note)
+event.listen(NoteModel, 'after_delete', _unindex_deleted_note)
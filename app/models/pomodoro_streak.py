@@ -0,0 +1,37 @@
+"""
+Pomodoro Streak SQLAlchemy model for database persistence.
+Infrastructure layer implementation.
+"""
+
+from app import db
+from datetime import datetime
+import uuid
+
+
+class PomodoroStreakModel(db.Model):
+    """
+    Per-user streak summary maintained incrementally from daily statistics.
+    One row per user so reading a streak is a single primary-key style lookup.
+    """
+    __tablename__ = 'pomodoro_streak'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False, unique=True, index=True)
+    current_streak = db.Column(db.Integer, default=0, nullable=False)
+    longest_streak = db.Column(db.Integer, default=0, nullable=False)
+    last_active_date = db.Column(db.Date)  # Latest day with at least one completed session
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<PomodoroStreakModel {self.user_id} current={self.current_streak}>'
+
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'user_id': self.user_id,
+            'current_streak': self.current_streak,
+            'longest_streak': self.longest_streak,
+            'last_active_date': self.last_active_date.isoformat() if self.last_active_date else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
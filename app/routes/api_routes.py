@@ -3,26 +3,42 @@ API Routes
 General API endpoints for data retrieval
 """
 
-from flask import Blueprint, session, g, jsonify
-from ..services import LessonService, NoteService, TaskService
+from flask import Blueprint, session, g, jsonify, request
+from ..services import LessonService, NoteService, TaskService, SearchService
+from ..utils.exceptions import ValidationException
 
 # Create blueprint
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 
-@api_bp.before_request
-def load_logged_in_user():
-    """Load logged in user for API routes"""
-    from ..services import UserService
-    user_id = session.get('user_id')
-    if user_id:
-        try:
-            user_service = UserService()
-            g.user = user_service.get_user_by_id(user_id)
-        except:
-            g.user = None
-    else:
-        g.user = None
+# ============================================
+# SEARCH API
+# ============================================
+
+@api_bp.route('/search')
+def search():
+    """
+    Full-text search across the user's notes, lessons and tasks
+    
+    Query params: q, type (comma-separated: note,lesson,task), page, per_page
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    try:
+        types = [t.strip() for t in request.args.get('type', '').split(',') if t.strip()] or None
+        result = SearchService().search(
+            g.user.id,
+            request.args.get('q', ''),
+            types=types,
+            page=request.args.get('page', 1, type=int),
+            per_page=request.args.get('per_page', 20, type=int)
+        )
+        return jsonify({'success': True, **result})
+    except ValidationException as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 
 # ============================================
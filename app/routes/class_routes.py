@@ -14,21 +14,6 @@ from sqlalchemy import text
 class_bp = Blueprint('class', __name__)
 
 
-@class_bp.before_request
-def load_logged_in_user():
-    """Load logged in user for class routes"""
-    from ..services import UserService
-    user_id = session.get('user_id')
-    if user_id:
-        try:
-            user_service = UserService()
-            g.user = user_service.get_user_by_id(user_id)
-        except:
-            g.user = None
-    else:
-        g.user = None
-
-
 def login_required_web(f):
     """Decorator to require login for web routes"""
     @wraps(f)
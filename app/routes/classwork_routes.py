@@ -15,21 +15,6 @@ from app import db
 classwork_bp = Blueprint('classwork', __name__, url_prefix='/classwork')
 
 
-@classwork_bp.before_request
-def load_logged_in_user():
-    """Load logged in user for classwork routes"""
-    from ..services import UserService
-    user_id = session.get('user_id')
-    if user_id:
-        try:
-            user_service = UserService()
-            g.user = user_service.get_user_by_id(user_id)
-        except:
-            g.user = None
-    else:
-        g.user = None
-
-
 def check_class_permission(lesson_id, user_id, require_owner=False):
     """
     Check if user has permission to access/modify class
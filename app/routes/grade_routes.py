@@ -50,25 +50,6 @@ def check_class_permission(lesson_id, user_id, require_owner=False):
     return has_permission, is_owner
 
 
-@grade_bp.before_request
-def load_logged_in_user():
-    """Load logged in user for grade routes"""
-    from ..services import UserService
-    user_id = session.get('user_id')
-    if user_id:
-        try:
-            user_service = UserService()
-            g.user = user_service.get_user_by_id(user_id)
-        except:
-            g.user = None
-    else:
-        g.user = None
-    
-    # Ensure g.user is always defined
-    if not hasattr(g, 'user'):
-        g.user = None
-
-
 # ==========================================
 # GRADE CONFIGURATION
 # ==========================================
@@ -478,7 +459,7 @@ def get_grade_summary(lesson_id):
         if not has_permission:
             return jsonify({'error': 'No permission'}), 403
         
-        summary = GradeController.calculate_grade_summary(lesson_id, user.id)
+        summary = GradeController.get_grade_summary(lesson_id, user.id)
         
         if 'error' in summary:
             return jsonify(summary), 404
@@ -585,7 +566,7 @@ def calculate_what_if(lesson_id):
     try:
         data = request.get_json()
         
-        if not data or 'hypothetical_scores' not in data:
+        if not data or ('hypothetical_scores' not in data and 'scenarios' not in data):
             return jsonify({'error': 'Hypothetical scores are required'}), 400
         
         # Check if g.user is available
@@ -593,11 +574,21 @@ def calculate_what_if(lesson_id):
         if error_response:
             return error_response, status_code
         
-        result = GradeController.calculate_what_if(
-            lesson_id=lesson_id,
-            user_id=user.id,
-            hypothetical_scores=data['hypothetical_scores']
-        )
+        # Several slider states can be evaluated against one snapshot
+        if 'scenarios' in data:
+            if not isinstance(data['scenarios'], list):
+                return jsonify({'error': 'Scenarios must be a list'}), 400
+            result = GradeController.calculate_what_if_scenarios(
+                lesson_id=lesson_id,
+                user_id=user.id,
+                scenarios=data['scenarios']
+            )
+        else:
+            result = GradeController.calculate_what_if(
+                lesson_id=lesson_id,
+                user_id=user.id,
+                hypothetical_scores=data['hypothetical_scores']
+            )
         
         if 'error' in result:
             return jsonify(result), 404
@@ -606,6 +597,48 @@ def calculate_what_if(lesson_id):
             'success': True,
             'data': result
         })
+    except ValidationException as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@grade_bp.route('/lessons/<lesson_id>/analytics', methods=['GET'])
+def get_class_analytics(lesson_id):
+    """Class-wide grade analytics for every member (owner), or the class average (members)"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    # Check if g.user is available
+    user, error_response, status_code = check_g_user()
+    if error_response:
+        return error_response, status_code
+    
+    try:
+        has_permission, is_owner = check_class_permission(lesson_id, user.id)
+        if not has_permission:
+            return jsonify({'error': 'No permission'}), 403
+        
+        analytics = GradeController.calculate_class_analytics(lesson_id)
+        
+        if 'error' in analytics:
+            return jsonify(analytics), 404
+        
+        if not is_owner:
+            # Members only see aggregates, and only when the class enables it
+            if not analytics['show_class_average']:
+                return jsonify({'error': 'No permission'}), 403
+            analytics = {
+                'lesson_id': lesson_id,
+                'member_count': analytics['member_count'],
+                'class_average': analytics['class_average'],
+                'class_average_grade': analytics['class_average_grade']
+            }
+        
+        return jsonify({
+            'success': True,
+            'data': analytics
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
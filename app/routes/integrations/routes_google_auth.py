@@ -1,7 +1,5 @@
 # app/routes/google_auth.py
 from flask import Blueprint, current_app, session, redirect, url_for, request, flash
-from google_auth_oauthlib.flow import Flow
-import requests
 import uuid
 from app import db
 from app.models.user import UserModel
@@ -27,6 +25,9 @@ def get_google_flow(state=None, base_url=None):
     # สร้าง Path ไปยังไฟล์ client_secrets.json โดยอ้างอิงจากตำแหน่งของแอป (app/)
     # แล้วถอยกลับไปหนึ่งระดับ ซึ่งจะทำให้หาไฟล์เจอได้แน่นอนกว่า
     # ตราบใดที่ไฟล์ client_secrets.json อยู่ใน root ของโปรเจกต์
+    # Imported here: google_auth_oauthlib is slow to import and only needed for sign-in
+    from google_auth_oauthlib.flow import Flow
+
     try:
         # current_app.root_path จะชี้ไปที่โฟลเดอร์ 'app'
         project_root = Path(current_app.root_path).parent
@@ -157,6 +158,8 @@ def callback():
         return redirect(url_for("main_routes.index"))
 
     # ดึงข้อมูลผู้ใช้จาก Google
+    import requests
+
     credentials = flow.credentials
     userinfo_response = requests.get(
         "https://www.googleapis.com/oauth2/v2/userinfo",
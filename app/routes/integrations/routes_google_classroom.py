@@ -3,14 +3,16 @@ Google Classroom API Integration Routes
 Separate blueprint for Google Classroom functionality
 """
 
+import os
+import sys
 from flask import Blueprint, render_template, request, redirect, url_for, session, g, flash, jsonify, current_app
 from functools import wraps
-from google_auth_oauthlib.flow import Flow
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 from app import db
 
+# Same top-level module (and cache instance) that google_classroom_service imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'services'))
+from google_client_cache import client_cache
+
 # Create Google Classroom blueprint
 google_classroom_bp = Blueprint('google_classroom', __name__, url_prefix='/google_classroom')
 
@@ -29,6 +31,10 @@ SCOPES = [
     'https://www.googleapis.com/auth/drive.readonly'
 ]
 
+def _forget_cached_credentials(user_id):
+    """Drop cached credentials/clients after the stored credentials change"""
+    client_cache.invalidate(user_id)
+
 # Decorator for login required
 def login_required(f):
     @wraps(f)
@@ -39,21 +45,6 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-@google_classroom_bp.before_request
-def load_logged_in_user():
-    """Load logged in user for Google Classroom routes"""
-    user_id = session.get('user_id')
-    if user_id:
-        try:
-            # Use MVC Service pattern
-            from app.services import UserService
-            user_service = UserService()
-            g.user = user_service.get_user_by_id(user_id)
-        except:
-            g.user = None
-    else:
-        g.user = None
-
 @google_classroom_bp.route('/authorize')
 def authorize():
     """Authorize Google Classroom API access"""
@@ -71,6 +62,7 @@ def authorize():
         return redirect(url_for('main_routes.index'))
 
     try:
+        from google_auth_oauthlib.flow import Flow
         flow = Flow.from_client_config(
             client_config={
                 "web": {
@@ -168,6 +160,7 @@ def oauth2callback():
 
     port = current_app.config.get('PORT', 8000)
     
+    from google_auth_oauthlib.flow import Flow
     flow = Flow.from_client_config(
         client_config={
             "web": {
@@ -206,7 +199,8 @@ def oauth2callback():
             'token_uri': credentials.token_uri,
             'client_id': credentials.client_id,
             'client_secret': credentials.client_secret,
-            'scopes': credentials.scopes
+            'scopes': credentials.scopes,
+            'expiry': credentials.expiry.isoformat() if credentials.expiry else None
         }
         session['temp_google_credentials'] = json.dumps(creds_data)
         print(f"DEBUG: Stored credentials in session for later use")
@@ -242,11 +236,13 @@ def oauth2callback():
                 'token_uri': credentials.token_uri,
                 'client_id': credentials.client_id,
                 'client_secret': credentials.client_secret,
-                'scopes': credentials.scopes
+                'scopes': credentials.scopes,
+                'expiry': credentials.expiry.isoformat() if credentials.expiry else None
             }
             
             user_model.google_credentials = json.dumps(creds_data)
             db.session.commit()
+            _forget_cached_credentials(user_id)
             
             print(f"DEBUG: Stored credentials for user {user_id}")
             print(f"  Token: {credentials.token[:20]}...")
@@ -297,34 +293,21 @@ def fetch_courses():
             print("DEBUG fetch_courses: No user_id in session - user not authenticated")
             return jsonify({'success': False, 'error': 'User not authenticated'}), 401
         
-        # Check if user has Google credentials in database or session
+        # Credentials from the OAuth callback may still be waiting in the session
         from app.models.user import UserModel
         user = UserModel.query.filter_by(id=user_id).first()
+        if user and not user.google_credentials and session.get('temp_google_credentials'):
+            user.google_credentials = session.pop('temp_google_credentials')
+            db.session.commit()
+            _forget_cached_credentials(user_id)
+            print(f"DEBUG: Saved credentials to database for user {user_id}")
         
-        # Try to get credentials from database first
-        credentials_data = None
-        if user and user.google_credentials:
-            import json
-            credentials_data = json.loads(user.google_credentials)
-            print(f"DEBUG: Found credentials in database for user {user_id}")
-        # If not in database, check session
-        elif session.get('temp_google_credentials'):
-            import json
-            credentials_data = json.loads(session['temp_google_credentials'])
-            print(f"DEBUG: Found credentials in session for user {user_id}")
-            # Save to database if user is logged in
-            if user and credentials_data:
-                user.google_credentials = json.dumps(credentials_data)
-                db.session.commit()
-                session.pop('temp_google_credentials', None)
-                print(f"DEBUG: Saved credentials to database for user {user_id}")
-        else:
+        # Cached credentials (refreshed once when expired) and a cached client
+        from google_classroom_service import GoogleClassroomService
+        google_service = GoogleClassroomService()
+        credentials = google_service.get_credentials(user_id)
+        if not credentials:
             print(f"DEBUG: No credentials found for user {user_id}")
-            print(f"DEBUG: User exists: {user is not None}")
-            print(f"DEBUG: User has google_credentials: {user.google_credentials if user else 'N/A'}")
-            print(f"DEBUG: Session has temp_google_credentials: {session.get('temp_google_credentials') is not None}")
-        
-        if not credentials_data:
             return jsonify({
                 'success': False,
                 'error': 'No Google credentials found. Please authorize first.',
@@ -332,20 +315,7 @@ def fetch_courses():
                 'redirect_url': '/google_classroom/authorize?return_to_import=true'
             }), 401
         
-        # Create credentials object from stored data
-        from google.oauth2.credentials import Credentials
-        credentials = Credentials(
-            token=credentials_data['token'],
-            refresh_token=credentials_data.get('refresh_token'),
-            token_uri=credentials_data['token_uri'],
-            client_id=credentials_data['client_id'],
-            client_secret=credentials_data['client_secret'],
-            scopes=credentials_data['scopes']
-        )
-        
-        # Build Google Classroom API service
-        from googleapiclient.discovery import build
-        service = build('classroom', 'v1', credentials=credentials)
+        service = google_service.build_service(credentials, user_id)
         
         # Fetch courses from Google Classroom
         results = service.courses().list(courseStates=['ACTIVE']).execute()
@@ -439,3 +409,28 @@ def import_course():
             'error': f'Failed to import course: {str(e)}'
         }), 500
 
+
+@google_classroom_bp.route('/sync/<lesson_id>', methods=['POST'])
+def sync_course(lesson_id):
+    """Pull changes made in Google Classroom since the last sync into a lesson"""
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+        
+        from app.models.lesson import LessonModel
+        lesson = LessonModel.query.filter_by(id=lesson_id, user_id=user_id).first()
+        if not lesson or lesson.source_platform != 'google_classroom':
+            return jsonify({'success': False, 'error': 'Google Classroom lesson not found'}), 404
+        
+        from app.services import GoogleClassroomLessonService
+        result = GoogleClassroomLessonService().sync_with_google_classroom(lesson_id)
+        
+        return jsonify(result), (200 if result.get('success') else 502)
+            
+    except Exception as e:
+        print(f"Error syncing Google Classroom course: {e}")
+        return jsonify({
+            'success': False,
+            'error': f'Failed to sync course: {str(e)}'
+        }), 500
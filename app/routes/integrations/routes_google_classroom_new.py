@@ -5,19 +5,15 @@ Google Classroom API Integration Routes - New Complete Implementation
 
 from flask import Blueprint, render_template, request, redirect, url_for, session, g, flash, jsonify, current_app
 from functools import wraps
-from google_auth_oauthlib.flow import Flow
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 from app import db
 import json
 import secrets
 import os
 import sys
 
-# Add services to path
+# Add services to path; GoogleClassroomService and the Google client libraries
+# are imported inside the views so app startup does not load them
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'services'))
-from google_classroom_new import GoogleClassroomService
 
 # Create Google Classroom blueprint
 google_classroom_bp = Blueprint('google_classroom_new', __name__, url_prefix='/google_classroom')
@@ -55,6 +51,7 @@ def get_google_flow(port=None, state=None):
             except:
                 port = 8000
         
+        from google_auth_oauthlib.flow import Flow
         flow = Flow.from_client_config(
             client_config={
                 "web": {
@@ -216,6 +213,9 @@ def test_connection():
                 'redirect_url': '/google_classroom/authorize?return_to_import=true'
             }), 401
         
+        from google.oauth2.credentials import Credentials
+        from google_classroom_new import GoogleClassroomService
+
         # สร้าง credentials object
         creds_dict = json.loads(creds_data)
         credentials = Credentials(
@@ -258,6 +258,9 @@ def fetch_courses():
                 'redirect_url': '/google_classroom/authorize?return_to_import=true'
             }), 401
         
+        from google.oauth2.credentials import Credentials
+        from google_classroom_new import GoogleClassroomService
+
         # สร้าง credentials object
         creds_dict = json.loads(creds_data)
         credentials = Credentials(
@@ -304,6 +307,9 @@ def fetch_course_details(course_id):
                 'redirect_url': '/google_classroom/authorize?return_to_import=true'
             }), 401
         
+        from google.oauth2.credentials import Credentials
+        from google_classroom_new import GoogleClassroomService
+
         # สร้าง credentials object
         creds_dict = json.loads(creds_data)
         credentials = Credentials(
@@ -360,6 +366,9 @@ def import_course():
                 'redirect_url': '/google_classroom/authorize?return_to_import=true'
             }), 401
         
+        from google.oauth2.credentials import Credentials
+        from google_classroom_new import GoogleClassroomService
+
         # สร้าง credentials object
         creds_dict = json.loads(creds_data)
         credentials = Credentials(
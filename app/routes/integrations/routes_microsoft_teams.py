@@ -164,31 +164,56 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-def create_mockup_data_for_imported_team(lesson_id, team, settings, user_id):
-    """Create mockup data for Stream, Classwork, People, and Grades after importing a team"""
+
+# Extra synthetic rows per table, for generating large classes (load testing)
+MOCKUP_SIZE_KEYS = ('posts', 'assignments', 'members', 'gradeItems')
+
+
+def parse_mockup_size(size):
+    """Normalise an import size: an int applies to every table, a dict sets tables individually"""
+    if not size:
+        return {key: 0 for key in MOCKUP_SIZE_KEYS}
+    if isinstance(size, dict):
+        return {key: max(0, int(size.get(key) or 0)) for key in MOCKUP_SIZE_KEYS}
+    return {key: max(0, int(size)) for key in MOCKUP_SIZE_KEYS}
+
+def bulk_insert(statement, rows):
+    """Write a batch of rows with one executemany and commit it as one transaction"""
+    from app import db
+    
+    if not rows:
+        return 0
+    db.session.execute(statement, rows)
+    db.session.commit()
+    return len(rows)
+
+def create_mockup_data_for_imported_team(lesson_id, team, settings, user_id, size=None):
+    """
+    Create mockup data for Stream, Classwork, People, and Grades after importing a team
+    
+    Each generator builds its rows up front and writes them in one batch per table.
+    `size` adds synthetic rows on top of the sample data (see parse_mockup_size).
+    """
     try:
-        from app import db
-        from app.models.task import TaskModel
-        from app.models.note import NoteModel
-        from app.models.grade import GradeItem
+        size = parse_mockup_size(size)
         
         print(f"🎯 Creating mockup data for lesson {lesson_id} from team {team['name']} for user {user_id}")
         
         # 1. Create Stream mockup data (Notes/Announcements)
         if settings.get('importChannels', True):
-            create_stream_mockup(lesson_id, team, user_id)
+            create_stream_mockup(lesson_id, team, user_id, extra_posts=size['posts'])
         
         # 2. Create Classwork mockup data (Tasks)
         if settings.get('importAssignments', True):
-            create_classwork_mockup(lesson_id, team, user_id)
+            create_classwork_mockup(lesson_id, team, user_id, extra_assignments=size['assignments'])
         
         # 3. Create People mockup data (Notes for member management)
         if settings.get('importMembers', True):
-            create_people_mockup(lesson_id, team, user_id)
+            create_people_mockup(lesson_id, team, user_id, member_count=size['members'] or None)
         
         # 4. Create Grades mockup data (Grade items)
         if settings.get('importFiles', True):  # Using files setting for grades
-            create_grades_mockup(lesson_id, team, user_id)
+            create_grades_mockup(lesson_id, team, user_id, extra_items=size['gradeItems'])
         
         print(f"✅ Mockup data created successfully for lesson {lesson_id}")
         
@@ -197,26 +222,32 @@ def create_mockup_data_for_imported_team(lesson_id, team, settings, user_id):
         import traceback
         traceback.print_exc()
 
-def create_stream_mockup(lesson_id, team, user_id):
+def create_stream_mockup(lesson_id, team, user_id, extra_posts=0):
     """Create Stream mockup data from team channels and messages"""
     try:
         from app.models.stream import StreamPost
-        from app import db
-        from datetime import datetime, timedelta
         
         print(f"🎯 Creating Stream mockup for lesson {lesson_id} with user {user_id}")
         
-        # Create announcement posts
-        stream_posts = []
+        now = datetime.now()
+        
+        def post_row(title, content, created_at, is_pinned=False):
+            return {
+                'id': str(uuid.uuid4()),
+                'lesson_id': lesson_id,
+                'user_id': user_id,
+                'type': 'announcement',
+                'title': title,
+                'content': content,
+                'is_pinned': is_pinned,
+                'allow_comments': True,
+                'created_at': created_at
+            }
         
         # Welcome announcement
-        welcome_post = StreamPost(
-            id=str(uuid.uuid4()),
-            lesson_id=lesson_id,
-            user_id=user_id,
-            type='announcement',
-            title=f"Welcome to {team['name']}!",
-            content=f"""🎉 Welcome to {team['name']}!
+        stream_posts = [post_row(
+            f"Welcome to {team['name']}!",
+            f"""🎉 Welcome to {team['name']}!
 
 This class has been imported from Microsoft Teams with {team.get('memberCount', 0)} members and {len(team.get('channels', []))} channels.
 
@@ -227,20 +258,14 @@ This class has been imported from Microsoft Teams with {team.get('memberCount',
 - 📝 {team.get('description', 'No description available')}
 
 Feel free to explore the different channels and start collaborating!""",
-            is_pinned=True,
-            allow_comments=True,
-            created_at=datetime.now()
-        )
-        stream_posts.append(welcome_post)
+            now,
+            is_pinned=True
+        )]
         
         # Channel updates
-        channel_update_post = StreamPost(
-            id=str(uuid.uuid4()),
-            lesson_id=lesson_id,
-            user_id=user_id,
-            type='announcement',
-            title='Channel Information',
-            content=f"""📢 **Channel Updates**
+        stream_posts.append(post_row(
+            'Channel Information',
+            f"""📢 **Channel Updates**
 
 Here's an overview of the channels that were imported:
 
@@ -263,31 +288,32 @@ Here's an overview of the channels that were imported:
 - ❓ Questions and answers
 - 🤝 Peer support and collaboration
 - 💬 Quick discussions""",
-            is_pinned=False,
-            allow_comments=True,
-            created_at=datetime.now() + timedelta(minutes=5)
-        )
-        stream_posts.append(channel_update_post)
-        
-        # Add to database
-        for post in stream_posts:
-            db.session.add(post)
-        
-        db.session.commit()
+            now + timedelta(minutes=5)
+        ))
+        
+        # Synthetic channel activity, older than the announcements above
+        channels = team.get('channels') or [{'id': None, 'name': 'General'}]
+        for i in range(extra_posts):
+            channel = channels[i % len(channels)]
+            messages = MOCK_MESSAGES.get(channel['id']) or [{'content': f"Discussion in #{channel['name']}"}]
+            message = messages[i % len(messages)]
+            stream_posts.append(post_row(
+                f"#{channel['name']} · post {i + 1}",
+                message['content'],
+                now - timedelta(minutes=i + 1)
+            ))
+        
+        bulk_insert(StreamPost.__table__.insert(), stream_posts)
         print(f"📢 Created {len(stream_posts)} stream posts")
-        print(f"📢 Stream posts: {[post.title for post in stream_posts]}")
         
     except Exception as e:
         print(f"❌ Error creating stream mockup: {e}")
         import traceback
         traceback.print_exc()
 
-def create_classwork_mockup(lesson_id, team, user_id):
+def create_classwork_mockup(lesson_id, team, user_id, extra_assignments=0):
     """Create Classwork mockup data from team assignments"""
     try:
-        from app import db
-        from datetime import datetime, timedelta
-        
         # Sample assignments based on team type
         if 'Computer Science' in team['name']:
             assignments = [
@@ -375,49 +401,65 @@ def create_classwork_mockup(lesson_id, team, user_id):
                 }
             ]
         
-        # Create tasks using raw SQL to avoid model mismatch
-        for assignment in assignments:
-            task_id = str(uuid.uuid4())
-            db.session.execute(
-                text("""INSERT INTO task (id, user_id, title, description, status, priority, due_date, created_at, updated_at) 
-                   VALUES (:task_id, :user_id, :title, :description, :status, :priority, :due_date, :created_at, :updated_at)"""),
-                {
-                    'task_id': task_id,
-                    'user_id': user_id,
-                    'title': assignment['title'],
-                    'description': assignment['description'],
-                    'status': 'active',
-                    'priority': 'medium',
-                    'due_date': assignment['due_date'],
-                    'created_at': datetime.now(),
-                    'updated_at': datetime.now()
-                }
-            )
-            print(f"📚 Created task: {assignment['title']}")
+        # Synthetic practice work, spread over the coming weeks
+        for i in range(extra_assignments):
+            assignments.append({
+                'title': f'Practice Assignment {i + 1}',
+                'description': f'Additional practice for {team["name"]}.',
+                'due_date': datetime.now() + timedelta(days=i % 60 + 1),
+                'points': 10
+            })
         
-        db.session.commit()
+        # Create tasks using raw SQL to avoid model mismatch
+        now = datetime.now()
+        task_rows = [
+            {
+                'task_id': str(uuid.uuid4()),
+                'user_id': user_id,
+                'title': assignment['title'],
+                'description': assignment['description'],
+                'status': 'active',
+                'priority': 'medium',
+                'due_date': assignment['due_date'],
+                'created_at': now,
+                'updated_at': now
+            }
+            for assignment in assignments
+        ]
+        bulk_insert(
+            text("""INSERT INTO task (id, user_id, title, description, status, priority, due_date, created_at, updated_at) 
+               VALUES (:task_id, :user_id, :title, :description, :status, :priority, :due_date, :created_at, :updated_at)"""),
+            task_rows
+        )
         print(f"📚 Created {len(assignments)} classwork assignments")
         
     except Exception as e:
         print(f"❌ Error creating classwork mockup: {e}")
 
-def create_people_mockup(lesson_id, team, user_id):
+def create_people_mockup(lesson_id, team, user_id, member_count=None):
     """Create People mockup data from team members"""
     try:
         from app.models.note import NoteModel
-        from app import db
-        from datetime import datetime
         
-        # Create member management notes
-        people_notes = []
+        now = datetime.now()
+        
+        def note_row(title, content, note_type):
+            return {
+                'id': str(uuid.uuid4()),
+                'user_id': user_id,
+                'lesson_id': lesson_id,
+                'title': title,
+                'content': content,
+                'note_type': note_type,
+                'created_at': now,
+                'updated_at': now
+            }
         
         # Member list note
-        member_count = team.get('memberCount', 0)
-        member_note = NoteModel(
-            user_id=user_id,
-            lesson_id=lesson_id,
-            title=f"Class Members ({member_count} total)",
-            content=f"""
+        member_count = member_count or team.get('memberCount', 0)
+        people_notes = [note_row(
+            f"Class Members ({member_count} total)",
+            f"""
             <div class="members-overview">
                 <h5>👥 Class Members</h5>
                 <p>This class has {member_count} members imported from Microsoft Teams.</p>
@@ -441,17 +483,13 @@ def create_people_mockup(lesson_id, team, user_id):
                 </div>
             </div>
             """,
-            note_type='member_management',
-            created_at=datetime.now()
-        )
-        people_notes.append(member_note)
+            'member_management'
+        )]
         
         # Role management note
-        role_note = NoteModel(
-            user_id=user_id,
-            lesson_id=lesson_id,
-            title="Member Roles & Permissions",
-            content=f"""
+        people_notes.append(note_row(
+            "Member Roles & Permissions",
+            f"""
             <div class="roles-management">
                 <h5>🔐 Member Roles</h5>
                 <div class="role-list">
@@ -467,30 +505,24 @@ def create_people_mockup(lesson_id, team, user_id):
                 <p class="text-muted">Roles have been imported from Microsoft Teams and can be managed here.</p>
             </div>
             """,
-            note_type='role_management',
-            created_at=datetime.now()
-        )
-        people_notes.append(role_note)
+            'role_management'
+        ))
         
-        # Add to database
-        for note in people_notes:
-            db.session.add(note)
-        
-        db.session.commit()
+        bulk_insert(NoteModel.__table__.insert(), people_notes)
         print(f"👥 Created {len(people_notes)} people management notes")
         
     except Exception as e:
         print(f"❌ Error creating people mockup: {e}")
 
-def create_grades_mockup(lesson_id, team, user_id):
+def create_grades_mockup(lesson_id, team, user_id, extra_items=0):
     """Create Grades mockup data from team assignments"""
     try:
-        from app.models.grade import GradeCategory, GradeItem
+        from app.models.grade import GradeCategory, GradeItem, mark_summaries_stale
         from app import db
-        from datetime import datetime, timedelta
+        
+        now = datetime.now()
         
         # Create grade categories first
-        categories = []
         category_data = [
             {'name': 'Assignments', 'weight': 40.0, 'color': '#1976D2', 'total_points': 300.0},
             {'name': 'Projects', 'weight': 30.0, 'color': '#48BB78', 'total_points': 200.0},
@@ -498,25 +530,27 @@ def create_grades_mockup(lesson_id, team, user_id):
             {'name': 'Participation', 'weight': 10.0, 'color': '#9F7AEA', 'total_points': 50.0}
         ]
         
-        for i, cat_data in enumerate(category_data):
-            category = GradeCategory(
-                lesson_id=lesson_id,
-                name=cat_data['name'],
-                description=f"{cat_data['name']} component for {team['name']}",
-                weight=cat_data['weight'],
-                total_points=cat_data['total_points'],
-                color=cat_data['color'],
-                icon='bi-clipboard',
-                order_index=i,
-                created_at=datetime.now()
-            )
-            categories.append(category)
-            db.session.add(category)
-        
-        db.session.flush()  # Get category IDs
+        categories = [
+            {
+                'id': str(uuid.uuid4()),
+                'lesson_id': lesson_id,
+                'name': cat_data['name'],
+                'description': f"{cat_data['name']} component for {team['name']}",
+                'weight': cat_data['weight'],
+                'total_points': cat_data['total_points'],
+                'color': cat_data['color'],
+                'icon': 'bi-clipboard',
+                'order_index': i,
+                'created_at': now
+            }
+            for i, cat_data in enumerate(category_data)
+        ]
+        # Bulk inserts bypass the ORM listeners that invalidate cached summaries
+        db.session.execute(GradeCategory.__table__.insert(), categories)
+        mark_summaries_stale(db.session.connection(), lesson_id)
+        db.session.commit()
         
         # Create grade items
-        grade_items = []
         item_data = [
             {'name': 'Programming Assignment 1', 'points': 100.0, 'due_days': 7, 'category_idx': 0},
             {'name': 'Programming Assignment 2', 'points': 100.0, 'due_days': 14, 'category_idx': 0},
@@ -525,20 +559,32 @@ def create_grades_mockup(lesson_id, team, user_id):
             {'name': 'Class Participation', 'points': 50.0, 'due_days': 30, 'category_idx': 3}
         ]
         
-        for item_info in item_data:
-            grade_item = GradeItem(
-                lesson_id=lesson_id,
-                category_id=categories[item_info['category_idx']].id,
-                name=item_info['name'],
-                description=f"{item_info['name']} for {team['name']}",
-                points_possible=item_info['points'],
-                due_date=datetime.now() + timedelta(days=item_info['due_days']),
-                published_date=datetime.now(),
-                is_published=True
-            )
-            grade_items.append(grade_item)
-            db.session.add(grade_item)
+        # Synthetic practice items, spread over the categories
+        for i in range(extra_items):
+            item_data.append({
+                'name': f'Practice Item {i + 1}',
+                'points': 10.0,
+                'due_days': i % 60 + 1,
+                'category_idx': i % len(categories)
+            })
+        
+        grade_items = [
+            {
+                'id': str(uuid.uuid4()),
+                'lesson_id': lesson_id,
+                'category_id': categories[item_info['category_idx']]['id'],
+                'name': item_info['name'],
+                'description': f"{item_info['name']} for {team['name']}",
+                'points_possible': item_info['points'],
+                'due_date': now + timedelta(days=item_info['due_days']),
+                'published_date': now,
+                'is_published': True
+            }
+            for item_info in item_data
+        ]
         
+        db.session.execute(GradeItem.__table__.insert(), grade_items)
+        mark_summaries_stale(db.session.connection(), lesson_id)
         db.session.commit()
         print(f"📊 Created {len(categories)} grade categories and {len(grade_items)} grade items")
         
@@ -547,20 +593,6 @@ def create_grades_mockup(lesson_id, team, user_id):
         import traceback
         traceback.print_exc()
 
-@microsoft_teams_bp.before_request
-def load_logged_in_user():
-    """Load logged in user for Microsoft Teams routes"""
-    user_id = session.get('user_id')
-    if user_id:
-        try:
-            from app.services import UserService
-            user_service = UserService()
-            g.user = user_service.get_user_by_id(user_id)
-        except:
-            g.user = None
-    else:
-        g.user = None
-
 @microsoft_teams_bp.route('/authorize')
 @login_required
 def authorize():
@@ -671,6 +703,7 @@ def import_team():
         data = request.get_json()
         team_id = data.get('teamId')
         settings = data.get('settings', {})
+        size = data.get('size')  # optional synthetic class size (int or per-table dict)
         
         if not team_id:
             return jsonify({'success': False, 'error': 'Team ID is required'}), 400
@@ -709,7 +742,7 @@ def import_team():
         # Create mockup data for Stream, Classwork, People, and Grades
         try:
             print(f"🎯 Starting mockup creation for lesson {lesson.id}")
-            create_mockup_data_for_imported_team(lesson.id, team, settings, session['user_id'])
+            create_mockup_data_for_imported_team(lesson.id, team, settings, session['user_id'], size=size)
             print(f"✅ Mockup creation completed for lesson {lesson.id}")
         except Exception as e:
             print(f"❌ Error in mockup creation: {e}")
@@ -823,8 +856,10 @@ def create_mockup_for_lesson(lesson_id):
             'importFiles': True
         }
         
+        size = request.args.get('size', type=int)
+        
         print(f"🎯 Creating mockup for lesson {lesson_id}")
-        create_mockup_data_for_imported_team(lesson_id, sample_team, settings, session['user_id'])
+        create_mockup_data_for_imported_team(lesson_id, sample_team, settings, session['user_id'], size=size)
         
         return jsonify({
             'success': True,
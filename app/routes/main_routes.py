@@ -6,7 +6,7 @@ General routes for dashboard, index, and common fragments
 from flask import Blueprint, render_template, request, redirect, url_for, session, g, jsonify
 from functools import wraps
 from ..middleware.auth_middleware import login_required
-from ..services import UserService
+from ..middleware.identity import resolve_current_user
 
 # Create blueprint
 main_routes_bp = Blueprint('main_routes', __name__)
@@ -22,20 +22,6 @@ def login_required_web(f):
     return decorated_function
 
 
-@main_routes_bp.before_request
-def load_logged_in_user():
-    """Load logged in user for web routes"""
-    user_id = session.get('user_id')
-    if user_id:
-        try:
-            user_service = UserService()
-            g.user = user_service.get_user_by_id(user_id)
-        except:
-            g.user = None
-    else:
-        g.user = None
-
-
 # ============================================
 # INDEX & DASHBOARD
 # ============================================
@@ -57,16 +43,10 @@ def dashboard():
     if 'user_id' not in session:
         return redirect(url_for('auth.login'))
     
-    user_id = session.get('user_id')
-    if user_id:
-        try:
-            user_service = UserService()
-            user = user_service.get_user_by_id(user_id)
-            return render_template('base.html', user=user)
-        except Exception:
-            return redirect(url_for('auth.login'))
-    else:
+    user = resolve_current_user()
+    if not user:
         return redirect(url_for('auth.login'))
+    return render_template('base.html', user=user)
 
 
 @main_routes_bp.route('/partial/dashboard')
@@ -3,34 +3,16 @@ Note Web Routes
 Web routes for note fragments and pages (non-API)
 """
 # app/routes/note_web_routes.py
-from flask import Blueprint, render_template, request, redirect, url_for, session, g, jsonify, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, session, g, jsonify
 from functools import wraps
-from ..services import NoteService
-from werkzeug.utils import secure_filename
+from ..services import NoteService, NoteAttachmentService
 from app import db
 # from app import limiter  # Rate limiting handled in app initialization
-import os
-import time
 
 # Create blueprint
 note_web_bp = Blueprint('note_web', __name__)
 
 
-@note_web_bp.before_request
-def load_logged_in_user():
-    """Load logged in user for note web routes"""
-    from ..services import UserService
-    user_id = session.get('user_id')
-    if user_id:
-        try:
-            user_service = UserService()
-            g.user = user_service.get_user_by_id(user_id)
-        except:
-            g.user = None
-    else:
-        g.user = None
-
-
 def login_required_web(f):
     """Decorator to require login for web routes"""
     @wraps(f)
@@ -110,9 +92,7 @@ def _register_routes(note_web_bp):
         try:
             note_service = NoteService()
             notes = note_service.get_user_notes(g.user.id)
-            print(f"DEBUG: Found {len(notes)} notes for user {g.user.id}")
             notes = _enrich_notes_with_status_and_files(notes)
-            print(f"DEBUG: After enrichment, {len(notes)} notes")
             
             return render_template('notes/note_add_fragment.html', notes=notes, user=g.user)
         except Exception as e:
@@ -389,18 +369,7 @@ def _register_routes(note_web_bp):
                 except (json.JSONDecodeError, TypeError):
                     tags = []
 
-            # Get files from file system
-            note_files = _get_note_files_from_fs(note.id)
-            
-            # Convert file objects to dictionaries for JSON serialization
-            files_data = []
-            for file_obj in note_files:
-                files_data.append({
-                    'file_path': file_obj.file_path,
-                    'filename': file_obj.filename,
-                    'file_type': file_obj.file_type,
-                    'size': file_obj.size
-                })
+            files_data = [note_file.to_dict() for note_file in NoteAttachmentService().get_note_files(note.id)]
             
             data = {
                 'id': note.id,
@@ -451,8 +420,8 @@ def _enrich_notes_with_status_and_files(notes):
             , params
         ).fetchall()
         meta_by_id = {row[0]: {'status': row[1], 'external_link': row[2]} for row in rows}
+        files_by_id = NoteAttachmentService().get_files_for_notes(note_ids)
 
-        # Get files for each note from file system
         for n in notes:
             meta = meta_by_id.get(getattr(n, 'id', None))
             if meta is not None:
@@ -479,113 +448,21 @@ def _enrich_notes_with_status_and_files(notes):
                         setattr(n, 'tags', [])
             else:
                 setattr(n, 'tags', [])
-            
-            # Get files for this note from file system
-            note_files = _get_note_files_from_fs(n.id)
-            print(f"DEBUG: Note {n.id} enriched with {len(note_files)} files")
-            setattr(n, 'files', note_files)
+
+            setattr(n, 'files', files_by_id.get(n.id, []))
         return notes
     except Exception:
         return notes
 
 
-def _get_note_files_from_fs(note_id):
-    """Get files for a note from file system"""
-    try:
-        files = []
-        static_dir = current_app.static_folder
-        if not static_dir:
-            print(f"Static folder not found for note {note_id}")
-            return []
-            
-        uploads_dir = os.path.join(static_dir, 'uploads', 'notes')
-        
-        # Look for note-specific directory
-        note_dir = os.path.join(uploads_dir, str(note_id))
-        if not os.path.exists(note_dir):
-            print(f"Note directory not found: {note_dir}")
-            return []
-        
-        print(f"DEBUG: Found note directory: {note_dir}")
-            
-        for filename in os.listdir(note_dir):
-            file_path = os.path.join(note_dir, filename)
-            if os.path.isfile(file_path):
-                try:
-                    # Determine file type from extension
-                    ext = os.path.splitext(filename)[1].lower()
-                    file_type = 'document'
-                    
-                    if ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']:
-                        file_type = 'image'
-                    elif ext in ['.pdf']:
-                        file_type = 'pdf'
-                    elif ext in ['.doc', '.docx', '.txt', '.rtf']:
-                        file_type = 'document'
-                    
-                    # Create file object
-                    file_obj = type('File', (), {})()
-                    file_obj.file_path = f"uploads/notes/{note_id}/{filename}"
-                    file_obj.filename = filename
-                    file_obj.file_type = file_type
-                    file_obj.size = os.path.getsize(file_path)
-                    
-                    files.append(file_obj)
-                    print(f"DEBUG: Added file {filename} as {file_type}")
-                except Exception as file_error:
-                    print(f"Error processing file {filename} for note {note_id}: {file_error}")
-                    continue
-        
-        print(f"DEBUG: Returning {len(files)} files for note {note_id}")
-        return files
-    except Exception as e:
-        print(f"Error getting files for note {note_id}: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
-
-
 def _save_single_file(note_id, file, user_id):
-    """Save a single uploaded file to static/uploads"""
-    if not file or not getattr(file, 'filename', ''):
-        return False
-        
-    static_dir = current_app.static_folder
-    subdir = os.path.join('uploads', 'notes', str(note_id))  # Use note_id instead of user_id
-    target_dir = os.path.join(static_dir, subdir)
-    os.makedirs(target_dir, exist_ok=True)
-
-    filename = secure_filename(file.filename)
-    name, ext = os.path.splitext(filename)
-    unique_name = f"{int(time.time())}_{secure_filename(name)}{ext}"
-    abs_path = os.path.join(target_dir, unique_name)
-    file.save(abs_path)
-    
-    db.session.commit()
-    return True
+    """Save a single uploaded file to static/uploads and record its metadata"""
+    return NoteAttachmentService().save_upload(note_id, file) is not None
 
 
 def _save_note_uploads(note_id, image_file, other_file, user_id):
     """Save uploaded files to static/uploads (legacy function)"""
-    saved_any = False
-    static_dir = current_app.static_folder
-    subdir = os.path.join('uploads', 'notes', str(note_id))  # Use note_id instead of user_id
-    target_dir = os.path.join(static_dir, subdir)
-    os.makedirs(target_dir, exist_ok=True)
-
-    def _save(fs, file_type_hint):
-        nonlocal saved_any
-        if not fs or not getattr(fs, 'filename', ''):
-            return
-        filename = secure_filename(fs.filename)
-        name, ext = os.path.splitext(filename)
-        unique_name = f"{int(time.time())}_{secure_filename(name)}{ext}"
-        abs_path = os.path.join(target_dir, unique_name)
-        fs.save(abs_path)
-        saved_any = True
-
-    _save(image_file, 'image')
-    _save(other_file, 'document')
-    if saved_any:
+    service = NoteAttachmentService()
+    saved = [service.save_upload(note_id, fs, commit=False) for fs in (image_file, other_file)]
+    if any(saved):
         db.session.commit()
-
@@ -2,7 +2,7 @@
 
 from flask import Blueprint
 from app.controllers.pomodoro_statistics_views import PomodoroStatisticsViews
-from app.middleware.auth_middleware import login_required
+from app.middleware.auth_middleware import admin_required, login_required
 pomodoro_stats_bp = Blueprint('pomodoro_statistics', __name__, url_prefix='/api/pomodoro/statistics')
 
 stats_views = PomodoroStatisticsViews()
@@ -22,6 +22,13 @@ def get_timer_stats():
     return stats_views.get_timer_stats()
 
 
+@pomodoro_stats_bp.route('/queue', methods=['GET'])
+@admin_required
+def get_queue_metrics():
+    """Return statistics refresh queue depth and lag (process-wide, so admins only)."""
+    return stats_views.get_queue_metrics()
+
+
 @pomodoro_stats_bp.route('/daily-progress', methods=['GET'])
 @login_required
 def get_daily_progress():
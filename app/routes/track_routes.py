@@ -1,32 +1,22 @@
 # app/routes/track_routes.py (ไฟล์ใหม่)
 
-from flask import Blueprint, jsonify, session, g
+from flask import Blueprint, jsonify, request, g
 from app.middleware.auth_middleware import login_required
-from app.services import NoteService, PomodoroService, LessonService, UserService
+from app.services import TrackDashboardService
+from app.utils.exceptions import ValidationException
 
 # สร้าง blueprint
 track_bp = Blueprint('track_api', __name__, url_prefix='/api/track')
 
-@track_bp.before_request
-def load_user():
-    """โหลด user object ก่อนทุก request ใน blueprint นี้"""
-    if 'user_id' in session:
-        user_service = UserService()
-        try:
-            # ใช้ g object ของ Flask เพื่อเก็บข้อมูล user ไว้ใช้ตลอด request
-            g.user = user_service.get_user_by_id(session['user_id'])
-        except Exception:
-            g.user = None
-    else:
-        g.user = None
-
-
 @track_bp.route('/statistics', methods=['GET'])
 @login_required
 def get_track_statistics():
     """
     API สำหรับดึงข้อมูลสถิติทั้งหมดในหน้า Track
 
+    Query params:
+        days: ความยาวของกราฟรายวัน (7 หรือ 30, ค่าเริ่มต้น 7)
+
     Returns:
         JSON object ที่มีข้อมูล today, total, และ weekly
     """
@@ -34,45 +24,15 @@ def get_track_statistics():
         if not g.user:
             return jsonify({"success": False, "error": "User not found"}), 404
 
-        user_id = g.user.id
-        
-        # สร้าง service instances
-        note_service = NoteService()
-        pomodoro_service = PomodoroService()
-        lesson_service = LessonService()
-        
-        # --- ดึงข้อมูลสำหรับ "Today's Progress" ---
-        today_pomodoros = pomodoro_service.get_pomodoros_count_today(user_id)
-        today_study_time = pomodoro_service.get_study_time_today(user_id)
-        today_notes = note_service.get_notes_count_today(user_id)
-        today_lessons = lesson_service.get_lessons_completed_today(user_id)
-        
-        # --- ดึงข้อมูลสำหรับ "Statistics Summary" (ข้อมูลรวม) ---
-        total_pomodoros = pomodoro_service.get_total_pomodoros_count(user_id)
-        total_lessons = lesson_service.get_lessons_count(user_id)
-        total_notes = note_service.get_total_notes_count(user_id)
-        total_study_time_minutes = total_pomodoros * 25 # สมมติว่า 1 pomodoro = 25 นาที
+        days = request.args.get('days', 7, type=int)
+
+        # today, total และ weekly มาจาก grouped query ชุดเดียว (cache ต่อผู้ใช้แบบ TTL สั้น)
+        dashboard = TrackDashboardService().get_dashboard(g.user.id, days=days)
+
+        return jsonify({"success": True, **dashboard}), 200
 
-        # สร้างโครงสร้างข้อมูลที่จะส่งกลับไป
-        data = {
-            "success": True,
-            "today": {
-                "pomodoros": {"current": today_pomodoros, "goal": 8},
-                "study_time": {"current": today_study_time, "goal": 240}, # 4 ชั่วโมง
-                "lessons": {"current": today_lessons, "goal": 3},
-                "notes": {"current": today_notes, "goal": 5}
-            },
-            "total": {
-                "pomodoros": total_pomodoros,
-                "study_time": total_study_time_minutes,
-                "lessons": total_lessons,
-                "notes": total_notes
-            },
-            "weekly": []  # ส่วนนี้จะทำในขั้นต่อไป (ตอนนี้ใส่เป็นค่าว่างไปก่อน)
-        }
-        
-        return jsonify(data), 200
-        
+    except ValidationException as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         # ถ้ามีข้อผิดพลาด ให้ส่ง error message กลับไป
-        return jsonify({"success": False, "error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"success": False, "error": str(e)}), 500
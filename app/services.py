@@ -6,14 +6,24 @@ Contains business logic for the application.
 # app/services.py
 
 import json
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, date, timedelta
-from sqlalchemy import func, or_
+from sqlalchemy import func, text
 from app.utils.exceptions import (
     ValidationException,
     NotFoundException,
+    AuthorizationException,
     BusinessLogicException
 )
+from app.utils.ttl_cache import TTLCache
+
+
+def _in_rank_order(model_class, ids: List[str]):
+    """Load rows by id, keeping the order of ids (search rank)"""
+    if not ids:
+        return []
+    rows = {row.id: row for row in model_class.query.filter(model_class.id.in_(ids)).all()}
+    return [rows[entity_id] for entity_id in ids if entity_id in rows]
 
 
 class UserService:
@@ -60,7 +70,9 @@ class UserService:
     def get_user_by_id(self, user_id: str):
         """Get user by ID."""
         from app.models.user import UserModel
+        from app.middleware.identity import record_user_lookup
         
+        record_user_lookup()
         user = UserModel.query.filter_by(id=user_id).first()
         if not user:
             return None  # Return None instead of raising exception
@@ -90,6 +102,8 @@ class UserService:
         from app.models.user import UserModel
         from app import db
         
+        from app.middleware.identity import invalidate_user
+        
         # Get user
         user = UserModel.query.get(user_id)
         if not user:
@@ -114,11 +128,59 @@ class UserService:
         
         try:
             db.session.commit()
+            invalidate_user(user_id)
             return user
         except Exception as e:
             db.session.rollback()
             raise BusinessLogicException(f"Failed to update profile: {str(e)}")
 
+    def change_user_password(self, user_id: str, old_password: str, new_password: str):
+        """
+        Change user password after verifying the current one.
+
+        Only this worker's identity cache is invalidated; other workers pick
+        up the change within USER_CACHE_TTL seconds.
+        """
+        from app.models.user import UserModel
+        from app import db
+        from werkzeug.security import check_password_hash, generate_password_hash
+        from app.middleware.identity import invalidate_user
+        
+        user = UserModel.query.get(user_id)
+        if not user:
+            raise NotFoundException("User", user_id)
+        
+        if not check_password_hash(user.password_hash, old_password):
+            raise ValidationException("รหัสผ่านไม่ถูกต้อง")
+        
+        if len(new_password) < 8:
+            raise ValidationException("Password must be at least 8 characters long")
+        
+        user.password_hash = generate_password_hash(new_password)
+        db.session.commit()
+        invalidate_user(user_id)
+        return user
+
+    def deactivate_user(self, user_id: str):
+        """
+        Deactivate a user account.
+
+        The user is logged out on their next request to this worker; other
+        workers drop their cached identity within USER_CACHE_TTL seconds.
+        """
+        from app.models.user import UserModel
+        from app import db
+        from app.middleware.identity import invalidate_user
+        
+        user = UserModel.query.get(user_id)
+        if not user:
+            raise NotFoundException("User", user_id)
+        
+        user.is_active = False
+        db.session.commit()
+        invalidate_user(user_id)
+        return user
+
 
 class BaseLessonService:
     def __init__(self):
@@ -210,6 +272,13 @@ class LessonService(BaseLessonService):
         
         return lesson
     
+    def search_lessons(self, user_id: str, query: str, limit: int = None):
+        if not self._validate_user_id(user_id):
+            raise ValueError("Invalid user ID")
+        
+        ids = SearchService().search_ids(user_id, query, 'lesson', limit=limit)
+        return _in_rank_order(self._model_class, ids)
+    
     def get_lessons_by_user(self, user_id: str):
         if not self._validate_user_id(user_id):
             raise ValueError("Invalid user ID")
@@ -367,8 +436,15 @@ class GoogleClassroomLessonService(LessonService):
         
         if lesson.source_platform != self._source_platform:
             raise ValueError("Lesson is not a Google Classroom lesson")
+        if not lesson.external_id:
+            raise ValueError("Lesson has no Google Classroom course ID")
         
-        return lesson
+        import sys
+        import os
+        sys.path.append(os.path.join(os.path.dirname(__file__), 'services'))
+        from google_classroom_service import GoogleClassroomService
+        
+        return GoogleClassroomService().sync_lesson(lesson)
 
 
 class MicrosoftTeamsLessonService(LessonService):
@@ -567,30 +643,98 @@ class NoteService:
         # For now, return empty list as section integration is not implemented
         return []
     
-    def search_notes_by_tags(self, tags: list, user_id: str = None):
-        """Search notes by tags."""
+    def search_notes(self, user_id: str, query: str, limit: int = None):
+        """Full-text search of a user's notes (title and content), best match first."""
         from app.models.note import NoteModel
-        import json
         
-        # Build query
-        query = NoteModel.query
+        ids = SearchService().search_ids(user_id, query, 'note', limit=limit)
+        return _in_rank_order(NoteModel, ids)
+    
+    def search_notes_by_tags(self, tags: list, user_id: str = None, limit: int = None):
+        """Search notes having any of the tags (newest first), via the note_tag index."""
+        from app.models.note import NoteModel, NoteTagModel
+        from app import db
+        
+        tags = [tag.strip() for tag in tags if tag and tag.strip()]
+        if not tags:
+            return []
+        
+        matching_ids = db.session.query(NoteTagModel.note_id).filter(NoteTagModel.tag.in_(tags))
         if user_id:
-            query = query.filter_by(user_id=user_id)
+            matching_ids = matching_ids.filter(NoteTagModel.user_id == user_id)
         
-        # Search for notes containing any of the tags
-        notes = []
-        for note in query.all():
-            if note.tags:
-                try:
-                    note_tags = json.loads(note.tags) if isinstance(note.tags, str) else note.tags
-                    if any(tag in note_tags for tag in tags):
-                        notes.append(note)
-                except (json.JSONDecodeError, TypeError):
-                    # Handle malformed JSON
-                    if any(tag in str(note.tags) for tag in tags):
-                        notes.append(note)
-        
-        return notes
+        query = NoteModel.query.filter(NoteModel.id.in_(matching_ids)).order_by(NoteModel.created_at.desc())
+        if limit:
+            query = query.limit(limit)
+        
+        return query.all()
+    
+    def add_tag(self, note_id: str, user_id: str, tag: str):
+        """Add a tag to a note owned by the user."""
+        from app import db
+        import json
+        
+        tag = (tag or '').strip() if isinstance(tag, str) else ''
+        if not tag:
+            raise ValidationException("Tag cannot be empty")
+        if len(tag) > 100:
+            raise ValidationException("Tag cannot exceed 100 characters")
+        
+        note = self._get_owned_note(note_id, user_id)
+        tags = self._parse_tags(note.tags)
+        if tag not in tags:
+            note.tags = json.dumps(tags + [tag])
+            db.session.commit()
+        return note
+    
+    def remove_tag(self, note_id: str, user_id: str, tag: str):
+        """Remove a tag from a note owned by the user."""
+        from app import db
+        import json
+        
+        note = self._get_owned_note(note_id, user_id)
+        tags = self._parse_tags(note.tags)
+        tag = tag.strip() if isinstance(tag, str) else tag
+        if tag in tags:
+            tags.remove(tag)
+            note.tags = json.dumps(tags)
+            db.session.commit()
+        return note
+    
+    def get_all_user_tags(self, user_id: str, prefix: str = None, limit: int = None):
+        """Distinct tags of a user's notes, most used first (prefix for autocomplete)."""
+        return [row['tag'] for row in self.get_tag_counts(user_id, prefix=prefix, limit=limit)]
+    
+    def get_tag_counts(self, user_id: str, prefix: str = None, limit: int = None):
+        """Number of notes per tag for a user, most used first."""
+        from app.models.note import NoteTagModel
+        from app import db
+        
+        note_count = func.count(NoteTagModel.note_id)
+        query = db.session.query(NoteTagModel.tag, note_count).filter(NoteTagModel.user_id == user_id)
+        if prefix:
+            escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query = query.filter(NoteTagModel.tag.like(f"{escaped}%", escape='\\'))
+        query = query.group_by(NoteTagModel.tag).order_by(note_count.desc(), NoteTagModel.tag)
+        if limit:
+            query = query.limit(limit)
+        
+        return [{'tag': tag, 'count': count} for tag, count in query.all()]
+    
+    def _get_owned_note(self, note_id: str, user_id: str):
+        from app.models.note import NoteModel
+        
+        note = NoteModel.query.filter_by(id=note_id).first()
+        if not note:
+            raise NotFoundException("Note", note_id)
+        if note.user_id != user_id:
+            raise AuthorizationException("You do not have permission to modify this note")
+        return note
+    
+    @staticmethod
+    def _parse_tags(value):
+        from app.models.note import parse_tags
+        return parse_tags(value)
     
     def get_note_statistics(self, user_id: str = None):
         """Get note statistics."""
@@ -646,6 +790,170 @@ class NoteService:
     # --- จบโค้ดที่เพิ่ม ---
 
 
+class NoteAttachmentService:
+    """
+    Files attached to notes.
+
+    Uploads are stored under static/uploads/notes/<note_id>/ and their
+    metadata (name, size, mime type, sha256) recorded in note_file, so
+    listing attachments is one query instead of a directory scan per note.
+    """
+
+    UPLOAD_DIR = ('uploads', 'notes')
+    FILE_TYPES = {
+        '.jpg': 'image', '.jpeg': 'image', '.png': 'image', '.gif': 'image', '.bmp': 'image', '.webp': 'image',
+        '.pdf': 'pdf'
+    }
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    @classmethod
+    def file_type_for(cls, filename: str) -> str:
+        import os
+        return cls.FILE_TYPES.get(os.path.splitext(filename)[1].lower(), 'document')
+
+    @classmethod
+    def file_digest(cls, path: str) -> str:
+        import hashlib
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(cls.HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _uploads_root(self) -> str:
+        import os
+        from flask import current_app
+        return os.path.join(current_app.static_folder, *self.UPLOAD_DIR)
+
+    def _build_file(self, note_id: str, filename: str, abs_path: str, mime_type: Optional[str] = None):
+        import mimetypes
+        import os
+        from app.models.note import NoteFileModel
+
+        return NoteFileModel(
+            note_id=note_id,
+            file_path='/'.join(self.UPLOAD_DIR + (str(note_id), filename)),
+            file_type=self.file_type_for(filename),
+            filename=filename,
+            size=os.path.getsize(abs_path),
+            mime_type=mimetypes.guess_type(filename)[0] or mime_type or 'application/octet-stream',
+            sha256=self.file_digest(abs_path)
+        )
+
+    def save_upload(self, note_id: str, file_storage, commit: bool = True):
+        """Write an uploaded file to the note's directory and record it. Returns None for an empty upload."""
+        import os
+        import time
+        import uuid
+        from werkzeug.utils import secure_filename
+        from app import db
+
+        if not file_storage or not getattr(file_storage, 'filename', ''):
+            return None
+
+        target_dir = os.path.join(self._uploads_root(), str(note_id))
+        os.makedirs(target_dir, exist_ok=True)
+
+        name, ext = os.path.splitext(secure_filename(file_storage.filename))
+        # The random part keeps two same-named uploads in one second from sharing a file
+        unique_name = f"{int(time.time())}_{uuid.uuid4().hex[:8]}_{secure_filename(name)}{ext}"
+        abs_path = os.path.join(target_dir, unique_name)
+        file_storage.save(abs_path)
+
+        note_file = self._build_file(note_id, unique_name, abs_path, getattr(file_storage, 'mimetype', None))
+        db.session.add(note_file)
+        if commit:
+            db.session.commit()
+        return note_file
+
+    def get_files_for_notes(self, note_ids: List[str]) -> Dict[str, List[Any]]:
+        """Attachments of several notes in one query: {note_id: [NoteFileModel, ...]}"""
+        from app.models.note import NoteFileModel
+
+        files = {note_id: [] for note_id in note_ids}
+        if not note_ids:
+            return files
+        rows = (NoteFileModel.query
+                .filter(NoteFileModel.note_id.in_(note_ids))
+                .order_by(NoteFileModel.created_at, NoteFileModel.filename)
+                .all())
+        for row in rows:
+            files[row.note_id].append(row)
+        return files
+
+    def get_note_files(self, note_id: str) -> List[Any]:
+        return self.get_files_for_notes([note_id])[note_id]
+
+    def _scan_upload_dirs(self) -> Dict[str, tuple]:
+        """Files under the upload root: {file_path: (note_id, filename, abs_path)}"""
+        import os
+
+        root = self._uploads_root()
+        on_disk = {}
+        if not os.path.isdir(root):
+            return on_disk
+        for note_id in os.listdir(root):
+            note_dir = os.path.join(root, note_id)
+            if not os.path.isdir(note_dir):
+                continue
+            for filename in os.listdir(note_dir):
+                abs_path = os.path.join(note_dir, filename)
+                if os.path.isfile(abs_path):
+                    on_disk['/'.join(self.UPLOAD_DIR + (note_id, filename))] = (note_id, filename, abs_path)
+        return on_disk
+
+    def reconcile(self, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Repair drift between note_file and the upload directories.
+
+        Rows whose file is gone are deleted, files without a row are recorded
+        (if their note still exists) and rows whose size changed or that have
+        no hash are re-measured. Files of deleted notes are only counted as
+        orphaned; nothing is removed from disk.
+        """
+        import os
+        from app import db
+        from app.models.note import NoteFileModel, NoteModel
+
+        on_disk = self._scan_upload_dirs()
+        report = {'added': 0, 'removed': 0, 'updated': 0, 'orphaned': 0}
+        recorded = set()
+        for row in NoteFileModel.query.all():
+            found = on_disk.get(row.file_path)
+            if found is None:
+                db.session.delete(row)
+                report['removed'] += 1
+                continue
+            recorded.add(row.file_path)
+            size = os.path.getsize(found[2])
+            if row.size != size or not row.sha256:
+                row.size = size
+                row.sha256 = self.file_digest(found[2])
+                row.filename = row.filename or found[1]
+                report['updated'] += 1
+
+        missing = {path: found for path, found in on_disk.items() if path not in recorded}
+        note_ids = list({note_id for note_id, _, _ in missing.values()})
+        existing_notes = set()
+        for start in range(0, len(note_ids), 500):
+            chunk = note_ids[start:start + 500]
+            existing_notes.update(row.id for row in NoteModel.query.with_entities(NoteModel.id)
+                                  .filter(NoteModel.id.in_(chunk)))
+        for note_id, filename, abs_path in missing.values():
+            if note_id in existing_notes:
+                db.session.add(self._build_file(note_id, filename, abs_path))
+                report['added'] += 1
+            else:
+                report['orphaned'] += 1
+
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+        return report
+
+
 class TaskService:
     """Business logic for task management and Pomodoro integrations."""
 
@@ -710,7 +1018,7 @@ class TaskService:
         db.session.add(task)
         db.session.commit()
 
-        self._refresh_pomodoro_statistics(user_id, task.created_at.date() if task.created_at else date.today())
+        self._refresh_pomodoro_statistics(user_id, None, self._task_snapshot(task))
         return task
     
     def get_user_tasks_count(self, user_id: str):
@@ -810,7 +1118,6 @@ class TaskService:
             task.reminder_time = self._coerce_int(reminder_time)
 
         db.session.commit()
-        self._refresh_pomodoro_statistics(user_id, date.today())
         return task
 
     def delete_task(self, task_id: str, user_id: str) -> bool:
@@ -819,19 +1126,12 @@ class TaskService:
         from app import db
 
         task = self.get_task_by_id(task_id, user_id)
-
-        created_date = task.created_at.date() if task.created_at else None
-        completed_date = task.completed_at.date() if task.completed_at else None
+        before = self._task_snapshot(task)
 
         db.session.delete(task)
         db.session.commit()
 
-        if created_date:
-            self._refresh_pomodoro_statistics(user_id, created_date)
-        if completed_date and completed_date != created_date:
-            self._refresh_pomodoro_statistics(user_id, completed_date)
-        if not created_date and not completed_date:
-            self._refresh_pomodoro_statistics(user_id, date.today())
+        self._refresh_pomodoro_statistics(user_id, before, None)
         return True
 
     # ------------------------------------------------------------------
@@ -844,7 +1144,7 @@ class TaskService:
         task = self.get_task_by_id(task_id, user_id)
         normalized_status = self._normalize_status(status)
         previous_status = task.status
-        previous_completed_date = task.completed_at.date() if task.completed_at else None
+        before = self._task_snapshot(task)
 
         task.status = normalized_status
         if normalized_status == "completed":
@@ -858,14 +1158,7 @@ class TaskService:
 
         db.session.commit()
 
-        new_completed_date = task.completed_at.date() if task.completed_at else None
-
-        if previous_completed_date and previous_completed_date != new_completed_date:
-            self._refresh_pomodoro_statistics(user_id, previous_completed_date)
-        if new_completed_date:
-            self._refresh_pomodoro_statistics(user_id, new_completed_date)
-        if not previous_completed_date and not new_completed_date:
-            self._refresh_pomodoro_statistics(user_id, date.today())
+        self._refresh_pomodoro_statistics(user_id, before, self._task_snapshot(task))
         return task
 
     def update_task_progress(self, task_id: str, user_id: str, percentage: int):
@@ -881,7 +1174,7 @@ class TaskService:
         clamped_percentage = max(0, min(int(percentage), 100))
 
         task = self.get_task_by_id(task_id, user_id)
-        previous_completed_date = task.completed_at.date() if task.completed_at else None
+        before = self._task_snapshot(task)
         task.progress_percentage = clamped_percentage
 
         if clamped_percentage >= 100:
@@ -893,14 +1186,7 @@ class TaskService:
 
         db.session.commit()
 
-        new_completed_date = task.completed_at.date() if task.completed_at else None
-
-        if previous_completed_date and previous_completed_date != new_completed_date:
-            self._refresh_pomodoro_statistics(user_id, previous_completed_date)
-        if new_completed_date:
-            self._refresh_pomodoro_statistics(user_id, new_completed_date)
-        if not previous_completed_date and not new_completed_date:
-            self._refresh_pomodoro_statistics(user_id, date.today())
+        self._refresh_pomodoro_statistics(user_id, before, self._task_snapshot(task))
         return task
 
     def add_time_spent(self, task_id: str, user_id: str, minutes: int):
@@ -970,24 +1256,14 @@ class TaskService:
         return query.all()
 
     def search_tasks(self, user_id: str, query_string: str, limit: Optional[int] = None):
-        """Search tasks by title or description substring."""
+        """Search tasks by title or description, best match first."""
         from app.models.task import TaskModel
 
         if not query_string:
             raise ValidationException("Search query is required")
 
-        like_query = f"%{query_string.strip()}%"
-        query = TaskModel.query.filter(
-            TaskModel.user_id == user_id,
-            or_(
-                TaskModel.title.ilike(like_query),
-                TaskModel.description.ilike(like_query)
-            )
-        ).order_by(TaskModel.created_at.desc())
-
-        if limit:
-            query = query.limit(limit)
-        return query.all()
+        ids = SearchService().search_ids(user_id, query_string, 'task', limit=limit)
+        return _in_rank_order(TaskModel, ids)
 
     def get_task_statistics(self, user_id: str) -> Dict[str, Any]:
         """Aggregate task statistics for dashboards."""
@@ -1093,11 +1369,22 @@ class TaskService:
         except (TypeError, ValueError):
             raise ValidationException("Value must be an integer")
 
-    def _refresh_pomodoro_statistics(self, user_id: str, target_date: Optional[date] = None):
-        """Trigger Pomodoro statistics recalculation when task data changes."""
+    def _task_snapshot(self, task) -> Dict[str, Optional[date]]:
+        """Capture the task fields that feed daily Pomodoro statistics."""
+        is_completed = task.status == "completed" and task.completed_at is not None
+        return {
+            'created_date': task.created_at.date() if task.created_at else None,
+            'completed_date': task.completed_at.date() if is_completed else None
+        }
+
+    def _refresh_pomodoro_statistics(self, user_id: str, before: Optional[Dict[str, Any]],
+                                     after: Optional[Dict[str, Any]]):
+        """Queue the statistics delta of a single task change."""
+        from app.workers import statistics_queue
+
         try:
             session_service = PomodoroSessionService()
-            session_service.recalculate_daily_statistics(user_id, target_date)
+            statistics_queue.submit(session_service.task_change_deltas(user_id, before, after))
         except Exception as exc:
             # Avoid breaking the main task flow if statistics update fails
             print(f"[TaskService] Failed to refresh Pomodoro statistics: {exc}")
@@ -1160,8 +1447,7 @@ class PomodoroSessionService:
             db.session.add(session)
             db.session.commit()
 
-            session_date = session.start_time.date() if session.start_time else date.today()
-            self._update_daily_statistics(user_id, session_date)
+            self._update_daily_statistics(None, self._session_snapshot(session))
 
             return session
         except Exception as e:
@@ -1187,6 +1473,7 @@ class PomodoroSessionService:
         session = self.get_session(session_id)
         if not session:
             return None
+        before = self._session_snapshot(session)
 
         # Update timing fields
         if 'actual_duration' in data:
@@ -1265,8 +1552,7 @@ class PomodoroSessionService:
 
         db.session.commit()
 
-        session_date_source = session.end_time or session.start_time or datetime.utcnow()
-        self._update_daily_statistics(session.user_id, session_date_source.date())
+        self._update_daily_statistics(before, self._session_snapshot(session))
 
         return session
 
@@ -1278,6 +1564,7 @@ class PomodoroSessionService:
         session = self.get_session(session_id)
         if not session:
             return None
+        before = self._session_snapshot(session)
 
         session.end_time = datetime.utcnow()
         session.status = status
@@ -1295,8 +1582,7 @@ class PomodoroSessionService:
 
         db.session.commit()
 
-        session_date_source = session.end_time or session.start_time or datetime.utcnow()
-        self._update_daily_statistics(session.user_id, session_date_source.date())
+        self._update_daily_statistics(before, self._session_snapshot(session))
         return session
 
     def get_active_session(self, user_id: str):
@@ -1312,6 +1598,7 @@ class PomodoroSessionService:
         session = self.get_session(session_id)
         if not session:
             return None
+        before = self._session_snapshot(session)
 
         session.status = 'interrupted'
         session.is_interrupted = True
@@ -1325,8 +1612,7 @@ class PomodoroSessionService:
         db.session.commit()
 
         # Keep interruption statistics in sync
-        session_date_source = session.end_time or session.start_time or datetime.utcnow()
-        self._update_daily_statistics(session.user_id, session_date_source.date())
+        self._update_daily_statistics(before, self._session_snapshot(session))
         return session
 
     def delete_session(self, session_id: str) -> bool:
@@ -1337,22 +1623,22 @@ class PomodoroSessionService:
         session = self.get_session(session_id)
         if not session:
             return False
-
-        session_date_source = (
-            session.end_time
-            or session.start_time
-            or getattr(session, 'created_at', None)
-            or datetime.utcnow()
-        )
+        before = self._session_snapshot(session)
 
         db.session.delete(session)
         db.session.commit()
 
-        self._update_daily_statistics(session.user_id, session_date_source.date())
+        self._update_daily_statistics(before, None)
         return True
 
     def recalculate_daily_statistics(self, user_id: str, target_date: Optional[date] = None):
-        """Aggregate and persist Pomodoro statistics for the provided date."""
+        """
+        Fully recompute and persist Pomodoro statistics for the provided date.
+
+        Writes go through the incremental apply_* methods; this full scan is kept
+        for repair/backfill (see backfill_daily_statistics) and for seeding a
+        day that has no statistics row yet.
+        """
         from app import db
         from app.models.pomodoro_session import PomodoroSessionModel
         from app.models.pomodoro_statistics import PomodoroStatisticsModel
@@ -1373,6 +1659,8 @@ class PomodoroSessionService:
                 )
                 db.session.add(stats)
 
+            was_active = (stats.total_completed_sessions or 0) > 0
+
             day_sessions = PomodoroSessionModel.query.filter(
                 PomodoroSessionModel.user_id == user_id,
                 db.func.date(PomodoroSessionModel.created_at) == target
@@ -1452,6 +1740,8 @@ class PomodoroSessionService:
                 if completed_sessions else 0.0
             )
 
+            self._apply_streak_transition(user_id, target, was_active, bool(completed_sessions))
+
             db.session.commit()
             return stats
         except Exception as exc:
@@ -1459,10 +1749,274 @@ class PomodoroSessionService:
             print(f"[PomodoroSessionService] Error recalculating statistics: {exc}")
             raise
 
-    def _update_daily_statistics(self, user_id: str, target_date: Optional[date] = None) -> None:
-        """Aggregate and persist Pomodoro statistics for the provided date."""
+    def rebuild_streak(self, user_id: str, commit: bool = True):
+        """Recompute current and longest streak from one ordered scan of active days."""
+        from app import db
+        from app.models.pomodoro_statistics import PomodoroStatisticsModel
+        from app.models.pomodoro_streak import PomodoroStreakModel
+
+        active_days = db.session.query(PomodoroStatisticsModel.date).filter(
+            PomodoroStatisticsModel.user_id == user_id,
+            PomodoroStatisticsModel.total_completed_sessions > 0
+        ).order_by(PomodoroStatisticsModel.date.asc())
+
+        # Gaps-and-islands over the ordered dates: each gap starts a new island
+        current = longest = 0
+        last_active: Optional[date] = None
+        for (active_day,) in active_days:
+            if last_active is not None and active_day == last_active + timedelta(days=1):
+                current += 1
+            else:
+                current = 1
+            longest = max(longest, current)
+            last_active = active_day
+
+        streak = PomodoroStreakModel.query.filter_by(user_id=user_id).first()
+        if not streak:
+            streak = PomodoroStreakModel(user_id=user_id)
+            db.session.add(streak)
+
+        streak.current_streak = current
+        streak.longest_streak = longest
+        streak.last_active_date = last_active
+
+        if commit:
+            db.session.commit()
+        return streak
+
+    def _apply_streak_transition(self, user_id: str, day: date, was_active: bool, is_active: bool) -> None:
+        """Update the streak summary when a day flips between active and inactive."""
+        from app.models.pomodoro_streak import PomodoroStreakModel
+
+        if was_active == is_active:
+            return
+
+        streak = PomodoroStreakModel.query.filter_by(user_id=user_id).first()
+        last_active = streak.last_active_date if streak else None
+
+        # Only a new latest active day can be applied as a delta; backfills and
+        # days losing their completed sessions can merge or split islands.
+        if not streak or not is_active or (last_active is not None and day <= last_active):
+            self.rebuild_streak(user_id, commit=False)
+            return
+
+        if last_active is not None and day == last_active + timedelta(days=1):
+            streak.current_streak = (streak.current_streak or 0) + 1
+        else:
+            streak.current_streak = 1
+        streak.longest_streak = max(streak.longest_streak or 0, streak.current_streak)
+        streak.last_active_date = day
+
+    def backfill_daily_statistics(self, user_id: Optional[str] = None, since: Optional[date] = None) -> int:
+        """Recompute every (user, day) that has sessions or tasks; returns days rebuilt."""
+        from app import db
+        from app.models.pomodoro_session import PomodoroSessionModel
+        from app.models.task import TaskModel
+
+        def day_keys(user_column, timestamp_column, *criteria):
+            query = db.session.query(user_column, func.date(timestamp_column)).filter(
+                timestamp_column.isnot(None), *criteria
+            )
+            if user_id:
+                query = query.filter(user_column == user_id)
+            if since:
+                query = query.filter(timestamp_column >= datetime.combine(since, datetime.min.time()))
+            return set(query.distinct().all())
+
+        keys = day_keys(PomodoroSessionModel.user_id, PomodoroSessionModel.created_at)
+        keys |= day_keys(TaskModel.user_id, TaskModel.created_at)
+        keys |= day_keys(TaskModel.user_id, TaskModel.completed_at, TaskModel.status == 'completed')
+
+        for key_user_id, day in sorted(keys):
+            if isinstance(day, str):
+                day = datetime.strptime(day, '%Y-%m-%d').date()
+            self.recalculate_daily_statistics(key_user_id, day)
+
+        for key_user_id in {key_user_id for key_user_id, _ in keys}:
+            self.rebuild_streak(key_user_id)
+
+        return len(keys)
+
+    # ------------------------------------------------------------------
+    # INCREMENTAL STATISTICS
+    # ------------------------------------------------------------------
+    def _session_snapshot(self, session) -> Dict[str, Any]:
+        """Capture the session fields that feed daily statistics."""
+        created_at = session.created_at or datetime.utcnow()
+        return {
+            'user_id': session.user_id,
+            'date': created_at.date(),
+            'session_type': session.session_type,
+            'duration': int(session.duration or 0),
+            'minutes': int(session.actual_duration or session.duration or 0),
+            'is_completed': bool(session.is_completed),
+            'is_interrupted': bool(session.is_interrupted) or session.status == 'interrupted',
+            'productivity_score': session.productivity_score or 0
+        }
+
+    def _session_counters(self, snapshot: Optional[Dict[str, Any]]) -> Dict[str, int]:
+        """Counter contribution of one session to its day's statistics row."""
+        if not snapshot:
+            return {}
+
+        session_type = snapshot['session_type']
+        minutes = snapshot['minutes']
+        completed = snapshot['is_completed']
+        interrupted = snapshot['is_interrupted']
+        is_focus = session_type == 'focus'
+        is_short = session_type == 'short_break'
+        is_long = session_type == 'long_break'
+
+        return {
+            'total_sessions': 1,
+            'total_completed_sessions': int(completed),
+            'total_interrupted_sessions': int(interrupted),
+            'total_abandoned_sessions': int(interrupted),
+            'total_focus_sessions': int(is_focus),
+            'total_short_break_sessions': int(is_short),
+            'total_long_break_sessions': int(is_long),
+            'total_focus_time': minutes if is_focus else 0,
+            'total_break_time': minutes if is_short else 0,
+            'total_long_break_time': minutes if is_long else 0,
+            'total_time_spent': minutes if (is_focus or is_short or is_long) else 0,
+            'total_effective_time': minutes if is_focus else 0,
+            'total_ineffective_time': minutes if (is_short or is_long) else 0,
+            'total_productivity_score': snapshot['productivity_score'],
+            'total_on_time_sessions': int(completed and minutes >= snapshot['duration']),
+            'total_late_sessions': int(completed and 0 < snapshot['duration'] and minutes < snapshot['duration'])
+        }
+
+    def _task_counters(self, snapshot: Optional[Dict[str, Any]]) -> Dict[date, Dict[str, int]]:
+        """Per-day counter contribution of one task (created day and completed day)."""
+        counters: Dict[date, Dict[str, int]] = {}
+        if not snapshot:
+            return counters
+
+        created_date = snapshot.get('created_date')
+        completed_date = snapshot.get('completed_date')
+        if created_date:
+            counters.setdefault(created_date, {})['total_tasks'] = 1
+        if completed_date:
+            # total_tasks counts the union of created and completed tasks per day
+            day = counters.setdefault(completed_date, {})
+            day['total_tasks'] = 1
+            day['total_tasks_completed'] = 1
+        return counters
+
+    def session_change_deltas(self, before: Optional[Dict[str, Any]],
+                              after: Optional[Dict[str, Any]]) -> List[Tuple[str, date, Dict[str, int]]]:
+        """Statistics deltas between two session snapshots (None = absent) as (user_id, date, delta)."""
+        reference = after or before
+        if not reference:
+            return []
+
+        if before and after and before['date'] != after['date']:
+            return [
+                (before['user_id'], before['date'], self._negate(self._session_counters(before))),
+                (after['user_id'], after['date'], self._session_counters(after))
+            ]
+
+        old_counters = self._session_counters(before)
+        new_counters = self._session_counters(after)
+        delta = {
+            key: new_counters.get(key, 0) - old_counters.get(key, 0)
+            for key in set(old_counters) | set(new_counters)
+        }
+        return [(reference['user_id'], reference['date'], delta)]
+
+    def task_change_deltas(self, user_id: str, before: Optional[Dict[str, Any]],
+                           after: Optional[Dict[str, Any]]) -> List[Tuple[str, date, Dict[str, int]]]:
+        """Statistics deltas between two task snapshots (None = absent) as (user_id, date, delta)."""
+        old_counters = self._task_counters(before)
+        new_counters = self._task_counters(after)
+
+        changes = []
+        for day in sorted(set(old_counters) | set(new_counters)):
+            old_day = old_counters.get(day, {})
+            new_day = new_counters.get(day, {})
+            delta = {
+                key: new_day.get(key, 0) - old_day.get(key, 0)
+                for key in set(old_day) | set(new_day)
+            }
+            changes.append((user_id, day, delta))
+        return changes
+
+    def apply_session_change(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]):
+        """Apply the statistics delta between two session snapshots immediately."""
+        for user_id, day, delta in self.session_change_deltas(before, after):
+            self.apply_statistics_delta(user_id, day, delta)
+
+    def apply_task_change(self, user_id: str, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]):
+        """Apply the statistics delta between two task snapshots immediately."""
+        for change_user_id, day, delta in self.task_change_deltas(user_id, before, after):
+            self.apply_statistics_delta(change_user_id, day, delta)
+
+    def apply_statistics_delta(self, user_id: str, target: date, delta: Dict[str, int]):
+        """
+        Add counter deltas to one pomodoro_statistics row in O(1).
+
+        Counters are incremented atomically in SQL; derived averages are then
+        recomputed from the updated counters. A day without a row is seeded by
+        a one-off full recompute, which already includes the committed change.
+        """
+        from app import db
+        from sqlalchemy import update
+        from app.models.pomodoro_statistics import PomodoroStatisticsModel
+
+        delta = {key: value for key, value in delta.items() if value}
+        if not delta:
+            return None
+
+        try:
+            values = {
+                key: func.coalesce(getattr(PomodoroStatisticsModel, key), 0) + value
+                for key, value in delta.items()
+            }
+            result = db.session.execute(
+                update(PomodoroStatisticsModel)
+                .where(
+                    PomodoroStatisticsModel.user_id == user_id,
+                    PomodoroStatisticsModel.date == target
+                )
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+
+            if result.rowcount == 0:
+                db.session.rollback()
+                return self.recalculate_daily_statistics(user_id, target)
+
+            stats = PomodoroStatisticsModel.query.populate_existing().filter_by(
+                user_id=user_id,
+                date=target
+            ).first()
+
+            completed = stats.total_completed_sessions or 0
+            stats.average_session_duration = (
+                round((stats.total_time_spent or 0) / stats.total_sessions, 2) if stats.total_sessions else 0.0
+            )
+            stats.productivity_score = (
+                round((stats.total_productivity_score or 0) / completed, 2) if completed else 0.0
+            )
+
+            completed_delta = delta.get('total_completed_sessions', 0)
+            self._apply_streak_transition(user_id, target, completed - completed_delta > 0, completed > 0)
+
+            db.session.commit()
+            return stats
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _negate(self, counters: Dict[str, int]) -> Dict[str, int]:
+        return {key: -value for key, value in counters.items()}
+
+    def _update_daily_statistics(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        """Queue a session change for the daily statistics refresh without failing the caller."""
+        from app.workers import statistics_queue
+
         try:
-            self.recalculate_daily_statistics(user_id, target_date)
+            statistics_queue.submit(self.session_change_deltas(before, after))
         except Exception as exc:
             print(f"[PomodoroSessionService] Error updating daily statistics: {exc}")
 # --- Class ที่เพิ่มเข้ามา ---
@@ -1494,102 +2048,81 @@ class PomodoroService:
     def get_stats(self, user_id: str) -> Dict[str, Any]:
         """Return aggregate statistics for dashboard widgets."""
         from app import db
+        from sqlalchemy import case
         from app.models.pomodoro_session import PomodoroSessionModel
         from app.models.pomodoro_statistics import PomodoroStatisticsModel
         from app.models.task import TaskModel
 
-        total_sessions = PomodoroSessionModel.query.filter_by(user_id=user_id).count()
-
-        completed_focus_sessions = PomodoroSessionModel.query.filter(
-            PomodoroSessionModel.user_id == user_id,
-            PomodoroSessionModel.session_type == 'focus',
-            PomodoroSessionModel.is_completed.is_(True)
-        ).count()
-
-        focus_sessions_total = PomodoroSessionModel.query.filter(
-            PomodoroSessionModel.user_id == user_id,
-            PomodoroSessionModel.session_type == 'focus'
-        ).count()
-
-        interrupted_sessions = PomodoroSessionModel.query.filter(
-            PomodoroSessionModel.user_id == user_id,
-            PomodoroSessionModel.is_interrupted.is_(True)
-        ).count()
-
-        focus_minutes = db.session.query(
-            func.coalesce(
-                func.sum(
-                    func.coalesce(
-                        PomodoroSessionModel.actual_duration,
-                        PomodoroSessionModel.duration,
-                        0
-                    )
-                ),
-                0
-            )
-        ).filter(
-            PomodoroSessionModel.user_id == user_id,
-            PomodoroSessionModel.session_type == 'focus'
-        ).scalar() or 0
-
-        total_minutes = db.session.query(
-            func.coalesce(
-                func.sum(
-                    func.coalesce(
-                        PomodoroSessionModel.actual_duration,
-                        PomodoroSessionModel.duration,
-                        0
-                    )
-                ),
-                0
-            )
+        # Constant number of round trips: one grouped aggregate per table
+        # plus the latest daily row, regardless of how much history exists.
+        session_minutes = func.coalesce(
+            PomodoroSessionModel.actual_duration,
+            PomodoroSessionModel.duration,
+            0
+        )
+        is_focus = PomodoroSessionModel.session_type == 'focus'
+
+        session_row = db.session.query(
+            func.count(PomodoroSessionModel.id),
+            func.coalesce(func.sum(case((is_focus, 1), else_=0)), 0),
+            func.coalesce(func.sum(case(
+                (is_focus & PomodoroSessionModel.is_completed.is_(True), 1), else_=0
+            )), 0),
+            func.coalesce(func.sum(case((PomodoroSessionModel.is_interrupted.is_(True), 1), else_=0)), 0),
+            func.coalesce(func.sum(case(
+                (PomodoroSessionModel.session_type.in_(['short_break', 'long_break']), 1), else_=0
+            )), 0),
+            func.coalesce(func.sum(case((is_focus, session_minutes), else_=0)), 0),
+            func.coalesce(func.sum(session_minutes), 0),
+            func.count(func.distinct(func.date(PomodoroSessionModel.created_at))),
+            func.max(PomodoroSessionModel.created_at)
         ).filter(
             PomodoroSessionModel.user_id == user_id
-        ).scalar() or 0
-
-        total_break_sessions = PomodoroSessionModel.query.filter(
-            PomodoroSessionModel.user_id == user_id,
-            PomodoroSessionModel.session_type.in_(['short_break', 'long_break'])
-        ).count()
+        ).one()
 
-        last_session = PomodoroSessionModel.query.filter_by(user_id=user_id).order_by(
-            PomodoroSessionModel.created_at.desc()
-        ).first()
+        (total_sessions, focus_sessions_total, completed_focus_sessions, interrupted_sessions,
+         total_break_sessions, focus_minutes, total_minutes, active_days, last_session_at) = session_row
 
-        active_days = db.session.query(
-            func.count(func.distinct(func.date(PomodoroSessionModel.created_at)))
+        task_row = db.session.query(
+            func.count(TaskModel.id),
+            func.coalesce(func.sum(case((TaskModel.status == 'completed', 1), else_=0)), 0)
         ).filter(
-            PomodoroSessionModel.user_id == user_id
-        ).scalar() or 0
+            TaskModel.user_id == user_id
+        ).one()
+
+        total_tasks_logged_db, tasks_completed_overall = task_row
+
+        stats_row = db.session.query(
+            func.count(PomodoroStatisticsModel.id),
+            func.coalesce(func.sum(PomodoroStatisticsModel.total_sessions), 0),
+            func.coalesce(func.sum(PomodoroStatisticsModel.total_completed_sessions), 0),
+            func.coalesce(func.sum(PomodoroStatisticsModel.total_interrupted_sessions), 0),
+            func.coalesce(func.sum(PomodoroStatisticsModel.total_abandoned_sessions), 0),
+            func.coalesce(func.sum(PomodoroStatisticsModel.total_on_time_sessions), 0),
+            func.coalesce(func.sum(PomodoroStatisticsModel.total_late_sessions), 0),
+            func.coalesce(func.sum(PomodoroStatisticsModel.total_tasks), 0),
+            func.coalesce(func.sum(PomodoroStatisticsModel.total_tasks_completed), 0),
+            func.coalesce(func.sum(PomodoroStatisticsModel.total_effective_time), 0),
+            func.coalesce(func.sum(PomodoroStatisticsModel.total_ineffective_time), 0),
+            func.coalesce(func.avg(PomodoroStatisticsModel.productivity_score), 0.0),
+            func.coalesce(func.avg(PomodoroStatisticsModel.average_session_duration), 0.0)
+        ).filter(
+            PomodoroStatisticsModel.user_id == user_id
+        ).one()
 
-        total_tasks_logged_db = TaskModel.query.filter_by(user_id=user_id).count()
-        tasks_completed_overall = TaskModel.query.filter(
-            TaskModel.user_id == user_id,
-            TaskModel.status == 'completed'
-        ).count()
+        (stats_days, total_sessions_aggregated, completed_sessions_aggregated,
+         interrupted_sessions_aggregated, abandoned_sessions, on_time_sessions, late_sessions,
+         tasks_logged_daily_sum, tasks_completed_daily_sum, total_effective_minutes,
+         total_ineffective_minutes, average_productivity_score, average_session_duration) = stats_row
 
-        all_stats = PomodoroStatisticsModel.query.filter_by(user_id=user_id).all()
         latest_stats = None
-        if all_stats:
-            latest_stats = max(all_stats, key=lambda row: row.date)
-
-        total_sessions_aggregated = sum(row.total_sessions for row in all_stats) if all_stats else 0
-        completed_sessions_aggregated = sum(row.total_completed_sessions for row in all_stats) if all_stats else 0
-        interrupted_sessions_aggregated = sum(row.total_interrupted_sessions for row in all_stats) if all_stats else 0
-        abandoned_sessions = sum(row.total_abandoned_sessions for row in all_stats) if all_stats else 0
-        on_time_sessions = sum(row.total_on_time_sessions for row in all_stats) if all_stats else 0
-        late_sessions = sum(row.total_late_sessions for row in all_stats) if all_stats else 0
-        tasks_logged_daily_sum = sum(row.total_tasks for row in all_stats) if all_stats else 0
-        tasks_completed_daily_sum = sum(row.total_tasks_completed for row in all_stats) if all_stats else 0
-        total_effective_minutes = sum(row.total_effective_time for row in all_stats) if all_stats else 0
-        total_ineffective_minutes = sum(row.total_ineffective_time for row in all_stats) if all_stats else 0
-
-        average_productivity_score = round(
-            sum(row.productivity_score for row in all_stats) / len(all_stats), 2
-        ) if all_stats else 0.0
-        average_session_duration = round(
-            sum(row.average_session_duration for row in all_stats) / len(all_stats), 2
-        ) if all_stats else 0.0
+        if stats_days:
+            latest_stats = PomodoroStatisticsModel.query.filter_by(user_id=user_id).order_by(
+                PomodoroStatisticsModel.date.desc()
+            ).first()
+
+        average_productivity_score = round(float(average_productivity_score), 2)
+        average_session_duration = round(float(average_session_duration), 2)
 
         focus_completion_rate = round(
             (completed_focus_sessions / focus_sessions_total) * 100, 2
@@ -1601,7 +2134,8 @@ class PomodoroService:
             (completed_sessions_aggregated / total_sessions_aggregated) * 100, 2
         ) if total_sessions_aggregated else 0.0
 
-        streak = self._calculate_streak(user_id)
+        streak_summary = self._get_streak_summary(user_id)
+        streak = streak_summary.current_streak if streak_summary.last_active_date == date.today() else 0
 
         return {
             'total_sessions': total_sessions,
@@ -1613,7 +2147,8 @@ class PomodoroService:
             'interrupted_sessions': interrupted_sessions,
             'active_days': active_days,
             'streak': streak,
-            'last_session_at': last_session.created_at.isoformat() if last_session else None,
+            'longest_streak': streak_summary.longest_streak,
+            'last_session_at': last_session_at.isoformat() if last_session_at else None,
             'productivity_score': latest_stats.productivity_score if latest_stats else 0.0,
             'total_completed_sessions_overall': completed_sessions_aggregated,
             'total_interrupted_sessions_overall': interrupted_sessions_aggregated,
@@ -1776,20 +2311,19 @@ class PomodoroService:
         return stats.to_dict() if stats else {}
 
     def _calculate_streak(self, user_id: str) -> int:
-        """Calculate consecutive days with completed sessions."""
-        from app.models.pomodoro_statistics import PomodoroStatisticsModel
-
-        streak = 0
-        cursor = date.today()
+        """Return consecutive days with completed sessions ending today."""
+        streak = self._get_streak_summary(user_id)
+        if streak.last_active_date != date.today():
+            return 0
+        return streak.current_streak
 
-        while True:
-            stats = PomodoroStatisticsModel.query.filter_by(user_id=user_id, date=cursor).first()
-            if stats and stats.total_completed_sessions > 0:
-                streak += 1
-                cursor -= timedelta(days=1)
-            else:
-                break
+    def _get_streak_summary(self, user_id: str):
+        """Load the per-user streak row, building it once for users that predate it."""
+        from app.models.pomodoro_streak import PomodoroStreakModel
 
+        streak = PomodoroStreakModel.query.filter_by(user_id=user_id).first()
+        if not streak:
+            streak = self._session_service.rebuild_streak(user_id)
         return streak
 
     def _ensure_statistics(self, user_id: str, target: date):
@@ -1811,3 +2345,232 @@ class PomodoroService:
             db.func.date(PomodoroSessionModel.created_at) == target
         ).all()
     
+
+class SearchService:
+    """
+    Ranked full-text search over a user's notes, lessons and tasks.
+
+    Uses the search index from app/utils/search_index.py (SQLite FTS5 or
+    PostgreSQL tsvector); when it is unavailable, falls back to LIKE
+    matching on title and body with the same result shape.
+    """
+
+    MAX_PER_PAGE = 100
+
+    def search(self, user_id: str, query: str, types: Optional[List[str]] = None,
+               page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+        from app import db
+        from app.utils import search_index
+
+        if not query or not query.strip():
+            raise ValidationException("Search query is required")
+        types = types or list(search_index.SOURCES)
+        unknown = [kind for kind in types if kind not in search_index.SOURCES]
+        if unknown:
+            raise ValidationException(f"Unknown search type: {', '.join(unknown)}")
+
+        page = max(1, page)
+        per_page = min(max(1, per_page), self.MAX_PER_PAGE)
+        offset = (page - 1) * per_page
+
+        if search_index.is_available():
+            found = search_index.search(db.session.connection(), user_id, query, kinds=types,
+                                        limit=per_page, offset=offset)
+        else:
+            found = self._like_search(user_id, query, types, per_page, offset)
+
+        return {
+            'query': query,
+            'results': found['results'],
+            'total': found['total'],
+            'page': page,
+            'per_page': per_page,
+            'pages': (found['total'] + per_page - 1) // per_page
+        }
+
+    def search_ids(self, user_id: str, query: str, kind: str, limit: Optional[int] = None) -> List[str]:
+        """Entity ids of one type, best match first"""
+        found = self.search(user_id, query, types=[kind], per_page=limit or self.MAX_PER_PAGE)
+        return [result['id'] for result in found['results']]
+
+    def _like_search(self, user_id: str, query: str, types: List[str], limit: int, offset: int):
+        import html
+        from app import db
+        from app.utils.search_index import SOURCES
+
+        like_query = f"%{query.strip()}%"
+        selects = []
+        for kind in types:
+            table, title, body = SOURCES[kind]
+            selects.append(
+                f"SELECT '{kind}' AS kind, id, {title} AS title, {body} AS body, created_at FROM \"{table}\" "
+                f"WHERE user_id = :user_id AND ({title} LIKE :q OR {body} LIKE :q)"
+            )
+        union = ' UNION ALL '.join(selects)
+        params = {'user_id': user_id, 'q': like_query, 'limit': limit, 'offset': offset}
+        total = db.session.execute(text(f"SELECT count(*) FROM ({union}) matches"), params).scalar()
+        rows = db.session.execute(
+            text(f"SELECT * FROM ({union}) matches ORDER BY created_at DESC LIMIT :limit OFFSET :offset"), params
+        ).fetchall()
+        return {
+            'total': total,
+            'results': [
+                {
+                    'type': kind,
+                    'id': entity_id,
+                    'title': title,
+                    'snippet': html.escape((body or '')[:160]),
+                    'rank': 0.0
+                }
+                for kind, entity_id, title, body, _ in rows
+            ]
+        }
+
+
+class TrackDashboardService:
+    """
+    Aggregates for the Track page (today, totals and a daily series).
+
+    Everything comes from a fixed number of grouped queries over the raw
+    session, note and lesson rows, so reading the dashboard never recomputes
+    or writes daily statistics. Results are cached per user for
+    TRACK_DASHBOARD_CACHE_TTL seconds and dropped when the user's sessions,
+    notes or lessons change (see init_track_dashboard_cache).
+    """
+
+    MINUTES_PER_POMODORO = 25
+    GOALS = {'pomodoros': 8, 'study_time': 240, 'lessons': 3, 'notes': 5}
+    ALLOWED_DAYS = (7, 30)
+
+    def get_dashboard(self, user_id: str, days: int = 7, today: Optional[date] = None) -> Dict[str, Any]:
+        if days not in self.ALLOWED_DAYS:
+            raise ValidationException(f"days must be one of {', '.join(map(str, self.ALLOWED_DAYS))}")
+
+        today = today or date.today()
+        cache_key = (user_id, days, today)
+        cached = track_dashboard_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        dashboard = self._build_dashboard(user_id, days, today)
+        track_dashboard_cache.set(cache_key, dashboard)
+        return dashboard
+
+    @staticmethod
+    def _by_day(query) -> Dict[str, int]:
+        # func.date() returns a string on SQLite and a date elsewhere
+        return {str(day): count for day, count in query.all()}
+
+    def _build_dashboard(self, user_id: str, days: int, today: date) -> Dict[str, Any]:
+        from app import db
+        from app.models.lesson import LessonModel
+        from app.models.note import NoteModel
+        from app.models.pomodoro_session import PomodoroSessionModel
+
+        start = today - timedelta(days=days - 1)
+        window_start = datetime.combine(start, datetime.min.time())
+
+        # Totals: one round trip with a scalar subquery per table
+        totals = db.session.query(
+            db.session.query(func.count(PomodoroSessionModel.id)).filter(
+                PomodoroSessionModel.user_id == user_id,
+                PomodoroSessionModel.session_type == 'focus'
+            ).scalar_subquery(),
+            db.session.query(func.count(LessonModel.id)).filter(
+                LessonModel.user_id == user_id
+            ).scalar_subquery(),
+            db.session.query(func.count(NoteModel.id)).filter(
+                NoteModel.user_id == user_id
+            ).scalar_subquery()
+        ).one()
+
+        # Daily series: one grouped query per table over the window
+        session_day = func.date(PomodoroSessionModel.created_at)
+        pomodoros_by_day = self._by_day(db.session.query(session_day, func.count(PomodoroSessionModel.id)).filter(
+            PomodoroSessionModel.user_id == user_id,
+            PomodoroSessionModel.is_completed.is_(True),
+            PomodoroSessionModel.created_at >= window_start
+        ).group_by(session_day))
+
+        note_day = func.date(NoteModel.created_at)
+        notes_by_day = self._by_day(db.session.query(note_day, func.count(NoteModel.id)).filter(
+            NoteModel.user_id == user_id,
+            NoteModel.created_at >= window_start
+        ).group_by(note_day))
+
+        lesson_day = func.date(LessonModel.updated_at)
+        lessons_by_day = self._by_day(db.session.query(lesson_day, func.count(LessonModel.id)).filter(
+            LessonModel.user_id == user_id,
+            LessonModel.status == 'completed',
+            LessonModel.updated_at >= window_start
+        ).group_by(lesson_day))
+
+        series = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            key = day.isoformat()
+            pomodoros = pomodoros_by_day.get(key, 0)
+            series.append({
+                'date': key,
+                'pomodoros': pomodoros,
+                'study_time': pomodoros * self.MINUTES_PER_POMODORO,
+                'lessons': lessons_by_day.get(key, 0),
+                'notes': notes_by_day.get(key, 0)
+            })
+
+        today_row = series[-1]
+        total_pomodoros, total_lessons, total_notes = totals
+        return {
+            'today': {
+                name: {'current': today_row[name], 'goal': goal}
+                for name, goal in self.GOALS.items()
+            },
+            'total': {
+                'pomodoros': total_pomodoros,
+                'study_time': total_pomodoros * self.MINUTES_PER_POMODORO,
+                'lessons': total_lessons,
+                'notes': total_notes
+            },
+            'weekly': series
+        }
+
+
+# Process-level cache of TrackDashboardService results keyed by (user_id, days, date)
+track_dashboard_cache = TTLCache(max_size=1024, ttl=30)
+_track_dashboard_listeners_registered = False
+
+
+def invalidate_track_dashboard(user_id: Optional[str]) -> None:
+    """Drop cached dashboards of a user after their sessions, notes or lessons change."""
+    if user_id:
+        track_dashboard_cache.invalidate_prefix(user_id)
+
+
+def _on_track_source_changed(mapper, connection, target):
+    invalidate_track_dashboard(getattr(target, 'user_id', None))
+
+
+def init_track_dashboard_cache(app) -> None:
+    """
+    Configure the dashboard cache from app config and register invalidation hooks.
+
+    Args:
+        app: Flask application instance
+    """
+    global _track_dashboard_listeners_registered
+
+    track_dashboard_cache.configure(
+        max_size=int(app.config.get('TRACK_DASHBOARD_CACHE_SIZE', 1024)),
+        ttl=float(app.config.get('TRACK_DASHBOARD_CACHE_TTL', 30))
+    )
+
+    if not _track_dashboard_listeners_registered:
+        from sqlalchemy import event
+        from app.models.lesson import LessonModel
+        from app.models.note import NoteModel
+        from app.models.pomodoro_session import PomodoroSessionModel
+
+        for model in (PomodoroSessionModel, NoteModel, LessonModel):
+            for event_name in ('after_insert', 'after_update', 'after_delete'):
+                event.listen(model, event_name, _on_track_source_changed)
+        _track_dashboard_listeners_registered = True
@@ -0,0 +1,78 @@
+"""
+Google API Request Helpers
+Concurrent execution and per-phase timing for Google Classroom API calls
+
+googleapiclient request objects are built on the calling thread and executed
+on a bounded thread pool. Each worker thread gets its own Http object because
+httplib2 connections are not thread-safe.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable
+
+DEFAULT_MAX_WORKERS = int(os.environ.get('GOOGLE_API_MAX_WORKERS', 8))
+
+
+def authorized_http_factory(credentials) -> Callable[[], Any]:
+    """Return a factory creating a fresh authorized Http for one worker thread"""
+    def factory():
+        import httplib2
+        import google_auth_httplib2
+        return google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http(timeout=30))
+    return factory
+
+
+def execute_concurrently(requests: Dict[Hashable, Any], http_factory: Callable[[], Any],
+                         max_workers: int = None) -> Dict[Hashable, Any]:
+    """
+    Execute googleapiclient requests on a bounded thread pool
+
+    Args:
+        requests: {key: HttpRequest}
+        http_factory: Creates the Http used by one worker thread
+        max_workers: Pool size (defaults to GOOGLE_API_MAX_WORKERS)
+
+    Returns:
+        {key: response dict, or the Exception the request raised}
+    """
+    if not requests:
+        return {}
+
+    local = threading.local()
+
+    def run(request):
+        http = getattr(local, 'http', None)
+        if http is None:
+            http = local.http = http_factory()
+        try:
+            return request.execute(http=http, num_retries=2)
+        except Exception as e:
+            return e
+
+    keys = list(requests)
+    workers = max(1, min(max_workers or DEFAULT_MAX_WORKERS, len(keys)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='google-api') as pool:
+        results = pool.map(run, [requests[key] for key in keys])
+        return dict(zip(keys, results))
+
+
+class PhaseTimer:
+    """Collect wall-clock milliseconds per named phase"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def summary(self) -> str:
+        return ' '.join(f"{name}={elapsed}ms" for name, elapsed in self.phases.items())
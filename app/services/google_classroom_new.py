@@ -8,9 +8,13 @@ import json
 from typing import Dict, List, Optional, Any
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import logging
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from classroom_importer import iter_items
+from google_client_cache import build_client
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +47,7 @@ class GoogleClassroomService:
             if credentials.expired:
                 credentials.refresh(Request())
             
-            return build('classroom', 'v1', credentials=credentials)
+            return build_client('classroom', 'v1', credentials=credentials)
         except Exception as e:
             logger.error(f"Error building classroom service: {e}")
             raise
@@ -54,8 +58,7 @@ class GoogleClassroomService:
             service = self.build_classroom_service(credentials)
             
             # ดึง courses ที่ active
-            results = service.courses().list(courseStates=['ACTIVE']).execute()
-            courses = results.get('courses', [])
+            courses = list(iter_items(service.courses().list, 'courses', courseStates=['ACTIVE']))
             
             # จัดรูปแบบข้อมูล courses
             formatted_courses = []
@@ -101,40 +104,37 @@ class GoogleClassroomService:
             # ดึงข้อมูล students
             students = []
             try:
-                students_result = service.courses().students().list(courseId=course_id).execute()
-                students = students_result.get('students', [])
+                students = list(iter_items(service.courses().students().list, 'students', courseId=course_id))
             except HttpError:
                 logger.warning(f"Could not fetch students for course {course_id}")
             
             # ดึงข้อมูล teachers
             teachers = []
             try:
-                teachers_result = service.courses().teachers().list(courseId=course_id).execute()
-                teachers = teachers_result.get('teachers', [])
+                teachers = list(iter_items(service.courses().teachers().list, 'teachers', courseId=course_id))
             except HttpError:
                 logger.warning(f"Could not fetch teachers for course {course_id}")
             
             # ดึงข้อมูล course work
             course_work = []
             try:
-                course_work_result = service.courses().courseWork().list(courseId=course_id).execute()
-                course_work = course_work_result.get('courseWork', [])
+                course_work = list(iter_items(service.courses().courseWork().list, 'courseWork', courseId=course_id))
             except HttpError:
                 logger.warning(f"Could not fetch course work for course {course_id}")
             
             # ดึงข้อมูล course materials
             course_materials = []
             try:
-                materials_result = service.courses().courseWorkMaterials().list(courseId=course_id).execute()
-                course_materials = materials_result.get('courseWorkMaterial', [])
+                course_materials = list(iter_items(
+                    service.courses().courseWorkMaterials().list, 'courseWorkMaterial', courseId=course_id
+                ))
             except HttpError:
                 logger.warning(f"Could not fetch course materials for course {course_id}")
             
             # ดึงข้อมูล announcements
             announcements = []
             try:
-                announcements_result = service.courses().announcements().list(courseId=course_id).execute()
-                announcements = announcements_result.get('announcements', [])
+                announcements = list(iter_items(service.courses().announcements().list, 'announcements', courseId=course_id))
             except HttpError:
                 logger.warning(f"Could not fetch announcements for course {course_id}")
             
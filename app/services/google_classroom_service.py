@@ -5,10 +5,9 @@ Handles Google Classroom API integration
 
 import json
 import os
+from datetime import datetime
 from typing import List, Dict, Optional
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -16,11 +15,33 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from app import db
 from app.models.user import UserModel
 
+sys.path.append(os.path.dirname(__file__))
+from classroom_requests import PhaseTimer, authorized_http_factory, execute_concurrently
+from google_client_cache import build_client, client_cache
+from classroom_importer import SETTING_RESOURCES, ClassroomImporter, find_resumable_lesson, iter_items, iter_pages
+
+# (result field, list() resource, response key) for the per-course detail counts
+COURSE_COUNT_RESOURCES = [
+    ('studentsCount', 'students', 'students'),
+    ('assignmentsCount', 'courseWork', 'courseWork'),
+    ('announcementsCount', 'announcements', 'announcements'),
+    ('materialsCount', 'courseWorkMaterials', 'courseWorkMaterial')
+]
+
 
 class GoogleClassroomService:
     """Service for Google Classroom API operations"""
     
-    def __init__(self):
+    def __init__(self, http_factory=None, max_workers: Optional[int] = None):
+        """
+        Args:
+            http_factory: Optional callable(credentials) -> Http used instead of the
+                real transport (lets fetches run against a local fake)
+            max_workers: Concurrent API requests (defaults to GOOGLE_API_MAX_WORKERS)
+        """
+        self.http_factory = http_factory
+        self.max_workers = max_workers
+        self.last_timings = {}
         self.client_id = os.environ.get('GOOGLE_CLIENT_ID')
         self.client_secret = os.environ.get('GOOGLE_CLIENT_SECRET')
         self.scopes = [
@@ -35,40 +56,49 @@ class GoogleClassroomService:
         ]
     
     def get_credentials(self, user_id: str) -> Optional[Credentials]:
-        """Get stored credentials for user"""
+        """Get stored credentials for user (parsed once per process, refreshed when expired)"""
         try:
-            user = UserModel.query.filter_by(id=user_id).first()
-            if not user or not user.google_credentials:
-                print(f"No Google credentials found for user {user_id}")
-                return None
-            
-            creds_data = json.loads(user.google_credentials)
-            print(f"Found credentials for user {user_id}: {creds_data.get('token', '')[:20]}...")
-            
-            credentials = Credentials(
-                token=creds_data.get('token'),
-                refresh_token=creds_data.get('refresh_token'),
-                token_uri=creds_data.get('token_uri', 'https://oauth2.googleapis.com/token'),
-                client_id=creds_data.get('client_id', self.client_id),
-                client_secret=creds_data.get('client_secret', self.client_secret),
-                scopes=creds_data.get('scopes', self.scopes)
+            credentials = client_cache.get_credentials(user_id)
+            if credentials is None:
+                credentials = self._load_credentials(user_id)
+                if not credentials:
+                    return None
+                credentials = client_cache.put_credentials(user_id, credentials, replace=False)
+            
+            # Refresh token if needed; concurrent requests share one refresh
+            return client_cache.ensure_fresh(
+                user_id, credentials,
+                on_refresh=lambda refreshed: self.save_credentials(user_id, refreshed)
             )
             
-            # Refresh token if needed
-            if credentials.expired and credentials.refresh_token:
-                print(f"Token expired for user {user_id}, refreshing...")
-                credentials.refresh(Request())
-                self.save_credentials(user_id, credentials)
-                print(f"Token refreshed for user {user_id}")
-            
-            return credentials
-            
         except Exception as e:
+            client_cache.invalidate(user_id)
             print(f"Error getting credentials for user {user_id}: {e}")
             import traceback
             traceback.print_exc()
             return None
     
+    def _load_credentials(self, user_id: str) -> Optional[Credentials]:
+        """Parse the credentials stored on the user row"""
+        user = UserModel.query.filter_by(id=user_id).first()
+        if not user or not user.google_credentials:
+            print(f"No Google credentials found for user {user_id}")
+            return None
+        
+        creds_data = json.loads(user.google_credentials)
+        print(f"Found credentials for user {user_id}: {creds_data.get('token', '')[:20]}...")
+        
+        expiry = creds_data.get('expiry')
+        return Credentials(
+            token=creds_data.get('token'),
+            refresh_token=creds_data.get('refresh_token'),
+            token_uri=creds_data.get('token_uri', 'https://oauth2.googleapis.com/token'),
+            client_id=creds_data.get('client_id', self.client_id),
+            client_secret=creds_data.get('client_secret', self.client_secret),
+            scopes=creds_data.get('scopes', self.scopes),
+            expiry=datetime.fromisoformat(expiry) if expiry else None
+        )
+    
     def save_credentials(self, user_id: str, credentials: Credentials) -> bool:
         """Save credentials for user"""
         try:
@@ -82,11 +112,13 @@ class GoogleClassroomService:
                 'token_uri': credentials.token_uri,
                 'client_id': credentials.client_id,
                 'client_secret': credentials.client_secret,
-                'scopes': credentials.scopes
+                'scopes': credentials.scopes,
+                'expiry': credentials.expiry.isoformat() if credentials.expiry else None
             }
             
             user.google_credentials = json.dumps(creds_data)
             db.session.commit()
+            client_cache.put_credentials(user_id, credentials)
             
             return True
             
@@ -94,86 +126,79 @@ class GoogleClassroomService:
             print(f"Error saving credentials for user {user_id}: {e}")
             return False
     
-    def fetch_courses(self, user_id: str) -> List[Dict]:
-        """Fetch Google Classroom courses for user"""
+    def build_service(self, credentials, user_id: Optional[str] = None):
+        """
+        Build the Classroom API client from the on-disk discovery document
+        
+        With a user_id the client comes from the process-level cache.
+        An injected fake transport is never cached.
+        """
+        if self.http_factory:
+            return build_client('classroom', 'v1', http=self.http_factory(credentials))
+        if user_id:
+            return client_cache.client(user_id, credentials)
+        return build_client('classroom', 'v1', credentials=credentials)
+    
+    def _thread_http_factory(self, credentials):
+        if self.http_factory:
+            return lambda: self.http_factory(credentials)
+        return authorized_http_factory(credentials)
+    
+    def fetch_courses(self, user_id: str, credentials: Optional[Credentials] = None) -> List[Dict]:
+        """
+        Fetch Google Classroom courses for user
+        
+        The per-course detail lists (students, coursework, announcements,
+        materials) are issued concurrently on a bounded thread pool.
+        Per-phase timings are kept in self.last_timings.
+        """
+        timer = PhaseTimer()
         try:
             print(f"Fetching courses for user {user_id}")
-            credentials = self.get_credentials(user_id)
+            with timer.phase('credentials'):
+                credentials = credentials or self.get_credentials(user_id)
             if not credentials:
                 raise Exception("No valid credentials found")
             
-            print(f"Building Google Classroom service for user {user_id}")
-            # Build Google Classroom service
-            service = build('classroom', 'v1', credentials=credentials)
+            with timer.phase('build'):
+                service = self.build_service(credentials, user_id)
             
-            print(f"Fetching courses from Google Classroom API...")
             # Fetch courses
-            results = service.courses().list(
-                courseStates=['ACTIVE'],
-                pageSize=100
-            ).execute()
+            with timer.phase('list_courses'):
+                courses = list(iter_items(service.courses().list, 'courses', courseStates=['ACTIVE']))
             
-            courses = results.get('courses', [])
             print(f"Found {len(courses)} courses from Google Classroom")
             
-            # Process each course to get additional details
+            # Build every detail request up front, then execute them concurrently
+            requests = {}
+            for course in courses:
+                course_id = course.get('id')
+                for field, resource, _ in COURSE_COUNT_RESOURCES:
+                    collection = getattr(service.courses(), resource)()
+                    requests[(course_id, field)] = collection.list(courseId=course_id, pageSize=1000)
+            
+            with timer.phase('details'):
+                responses = execute_concurrently(
+                    requests,
+                    self._thread_http_factory(credentials),
+                    self.max_workers
+                )
+            
             processed_courses = []
             for course in courses:
                 course_id = course.get('id')
-                course_name = course.get('name', 'Untitled Course')
-                print(f"Processing course: {course_name} (ID: {course_id})")
+                counts = {}
+                for field, resource, response_key in COURSE_COUNT_RESOURCES:
+                    response = responses.get((course_id, field))
+                    if isinstance(response, Exception):
+                        print(f"  - Error getting {resource} for course {course_id}: {response}")
+                        counts[field] = 0
+                    else:
+                        counts[field] = len((response or {}).get(response_key, []))
                 
-                # Get students count
-                try:
-                    students_result = service.courses().students().list(
-                        courseId=course_id,
-                        pageSize=1000
-                    ).execute()
-                    students_count = len(students_result.get('students', []))
-                    print(f"  - Students: {students_count}")
-                except Exception as e:
-                    print(f"  - Error getting students: {e}")
-                    students_count = 0
-                
-                # Get course work count
-                try:
-                    coursework_result = service.courses().courseWork().list(
-                        courseId=course_id,
-                        pageSize=1000
-                    ).execute()
-                    assignments_count = len(coursework_result.get('courseWork', []))
-                    print(f"  - Assignments: {assignments_count}")
-                except Exception as e:
-                    print(f"  - Error getting assignments: {e}")
-                    assignments_count = 0
-                
-                # Get announcements count
-                try:
-                    announcements_result = service.courses().announcements().list(
-                        courseId=course_id,
-                        pageSize=1000
-                    ).execute()
-                    announcements_count = len(announcements_result.get('announcements', []))
-                    print(f"  - Announcements: {announcements_count}")
-                except Exception as e:
-                    print(f"  - Error getting announcements: {e}")
-                    announcements_count = 0
-                
-                # Get course work materials count
-                try:
-                    materials_result = service.courses().courseWorkMaterials().list(
-                        courseId=course_id,
-                        pageSize=1000
-                    ).execute()
-                    materials_count = len(materials_result.get('courseWorkMaterial', []))
-                    print(f"  - Materials: {materials_count}")
-                except Exception as e:
-                    print(f"  - Error getting materials: {e}")
-                    materials_count = 0
-                
-                processed_course = {
+                processed_courses.append({
                     'id': course_id,
-                    'name': course_name,
+                    'name': course.get('name', 'Untitled Course'),
                     'description': course.get('description', ''),
                     'section': course.get('section', ''),
                     'room': course.get('room', ''),
@@ -182,18 +207,16 @@ class GoogleClassroomService:
                     'updateTime': course.get('updateTime', ''),
                     'enrollmentCode': course.get('enrollmentCode', ''),
                     'courseState': course.get('courseState', ''),
-                    'studentsCount': students_count,
-                    'assignmentsCount': assignments_count,
-                    'materialsCount': materials_count,
-                    'announcementsCount': announcements_count
-                }
-                
-                processed_courses.append(processed_course)
+                    **counts
+                })
             
-            print(f"Successfully processed {len(processed_courses)} courses")
+            self.last_timings = dict(timer.phases, detail_requests=len(requests))
+            print(f"Successfully processed {len(processed_courses)} courses "
+                  f"({len(requests)} detail requests; {timer.summary()})")
             return processed_courses
             
         except Exception as e:
+            self.last_timings = dict(timer.phases)
             print(f"Error fetching courses for user {user_id}: {e}")
             import traceback
             traceback.print_exc()
@@ -210,121 +233,73 @@ class GoogleClassroomService:
                 raise Exception("No valid credentials found")
             
             print(f"Building Google Classroom service...")
-            # Build Google Classroom service
-            service = build('classroom', 'v1', credentials=credentials)
+            service = self.build_service(credentials, user_id)
             
             print(f"Getting course details for: {course_id}")
             # Get course details
             course = service.courses().get(id=course_id).execute()
             print(f"Course found: {course.get('name', 'Unknown')}")
             
-            # Create lesson in our system
-            import sys
-            import os
-            sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-            
-            # Import LessonService from services.py
-            try:
-                from app.services import LessonService
-            except ImportError:
+            # Resume an interrupted import of this course instead of starting over
+            lesson = find_resumable_lesson(user_id, course_id)
+            if lesson:
+                print(f"Resuming import into lesson {lesson.id}")
+            else:
+                # Import LessonService from services.py
                 try:
-                    from services import LessonService
+                    from app.services import LessonService
                 except ImportError:
-                    # Fallback: create lesson directly
-                    print("LessonService not found, creating lesson directly")
-                    return self._create_lesson_directly(user_id, course, course_id, settings)
-            
-            lesson_service = LessonService()
-            
-            lesson_data = {
-                'title': f"Imported: {course.get('name', 'Google Classroom Course')}",
-                'description': course.get('description', '') or f'Imported from Google Classroom - {course_id}',
-                'status': 'in_progress',
-                'color_theme': 1,
-                'difficulty_level': 'intermediate',
-                'author_name': 'Google Classroom Import'
-            }
-            
-            lesson = lesson_service.create_lesson(
-                user_id=user_id,
-                title=lesson_data['title'],
-                description=lesson_data['description'],
-                status=lesson_data['status'],
-                color_theme=lesson_data['color_theme'],
-                difficulty_level=lesson_data['difficulty_level'],
-                author_name=lesson_data['author_name'],
-                source_platform='google_classroom',
-                external_id=course_id
-            )
+                    try:
+                        from services import LessonService
+                    except ImportError:
+                        # Fallback: create lesson directly
+                        print("LessonService not found, creating lesson directly")
+                        return self._create_lesson_directly(user_id, course, course_id, settings)
+                
+                lesson_service = LessonService()
+                
+                lesson = lesson_service.create_lesson(
+                    user_id=user_id,
+                    title=f"Imported: {course.get('name', 'Google Classroom Course')}",
+                    description=course.get('description', '') or f'Imported from Google Classroom - {course_id}',
+                    status='in_progress',
+                    color_theme=1,
+                    difficulty_level='intermediate',
+                    author_name='Google Classroom Import',
+                    source_platform='google_classroom',
+                    external_id=course_id
+                )
             
             if not lesson:
                 raise Exception("Failed to create lesson")
             
-            # Import students if requested
+            # Count students page by page (no local roster to import into)
+            students_count = None
             if settings.get('importStudents', True):
                 try:
-                    students_result = service.courses().students().list(
-                        courseId=course_id,
-                        pageSize=1000
-                    ).execute()
-                    
-                    students = students_result.get('students', [])
-                    print(f"Found {len(students)} students to import")
-                    # TODO: Import students to lesson
-                    
-                except Exception as e:
-                    print(f"Error importing students: {e}")
-            
-            # Import assignments if requested
-            if settings.get('importAssignments', True):
-                try:
-                    coursework_result = service.courses().courseWork().list(
-                        courseId=course_id,
-                        pageSize=1000
-                    ).execute()
-                    
-                    assignments = coursework_result.get('courseWork', [])
-                    print(f"Found {len(assignments)} assignments to import")
-                    # TODO: Import assignments to lesson
-                    
+                    students_count = sum(
+                        len(students) for students, _ in iter_pages(
+                            service.courses().students().list, 'students', courseId=course_id
+                        )
+                    )
+                    print(f"Found {students_count} students")
                 except Exception as e:
-                    print(f"Error importing assignments: {e}")
+                    print(f"Error counting students: {e}")
             
-            # Import materials if requested
-            if settings.get('importMaterials', True):
-                try:
-                    materials_result = service.courses().courseWorkMaterials().list(
-                        courseId=course_id,
-                        pageSize=1000
-                    ).execute()
-                    
-                    materials = materials_result.get('courseWorkMaterial', [])
-                    print(f"Found {len(materials)} materials to import")
-                    # TODO: Import materials to lesson
-                    
-                except Exception as e:
-                    print(f"Error importing materials: {e}")
-            
-            # Import announcements if requested
-            if settings.get('importAnnouncements', True):
-                try:
-                    announcements_result = service.courses().announcements().list(
-                        courseId=course_id,
-                        pageSize=1000
-                    ).execute()
-                    
-                    announcements = announcements_result.get('announcements', [])
-                    print(f"Found {len(announcements)} announcements to import")
-                    # TODO: Import announcements to lesson
-                    
-                except Exception as e:
-                    print(f"Error importing announcements: {e}")
+            # Stream coursework, materials and announcements page by page
+            resources = [resource for flag, resource in SETTING_RESOURCES if settings.get(flag, True)]
+            importer = ClassroomImporter(service, lesson.id, user_id, course_id)
+            imported = importer.run(resources)
+            completed = all(state['status'] == 'completed' for state in imported.values())
             
             return {
-                'success': True,
-                'message': 'Course imported successfully',
+                'success': completed,
+                'message': 'Course imported successfully' if completed else
+                           'Course import incomplete; import again to resume',
                 'lesson_id': lesson.id,
-                'course_name': course.get('name', 'Unknown Course')
+                'course_name': course.get('name', 'Unknown Course'),
+                'students_count': students_count,
+                'imported': imported
             }
             
         except Exception as e:
@@ -334,6 +309,46 @@ class GoogleClassroomService:
                 'error': f'Failed to import course: {str(e)}'
             }
     
+    def sync_lesson(self, lesson) -> Dict:
+        """
+        Delta-sync an imported lesson with its Google Classroom course
+        
+        Only coursework, materials and announcements changed since the last
+        sync are fetched; resources whose import never finished are resumed.
+        """
+        try:
+            from app.models.classroom_sync import ClassroomSyncStateModel
+            
+            credentials = self.get_credentials(lesson.user_id)
+            if not credentials:
+                raise Exception("No valid credentials found")
+            
+            resources = [
+                state.resource for state in
+                ClassroomSyncStateModel.query.filter_by(lesson_id=lesson.id).all()
+            ] or [resource for _, resource in SETTING_RESOURCES]
+            
+            service = self.build_service(credentials, lesson.user_id)
+            importer = ClassroomImporter(service, lesson.id, lesson.user_id, lesson.external_id)
+            synced = importer.sync(resources)
+            succeeded = all(
+                state['status'] == 'completed' and not state['last_error'] for state in synced.values()
+            )
+            
+            return {
+                'success': succeeded,
+                'lesson_id': lesson.id,
+                'synced': synced
+            }
+            
+        except Exception as e:
+            print(f"Error syncing lesson {lesson.id}: {e}")
+            return {
+                'success': False,
+                'lesson_id': lesson.id,
+                'error': f'Failed to sync course: {str(e)}'
+            }
+    
     def _create_lesson_directly(self, user_id: str, course: Dict, course_id: str, settings: Dict) -> Dict:
         """Create lesson directly without LessonService"""
         try:
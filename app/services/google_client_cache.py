@@ -0,0 +1,192 @@
+"""
+Google API Client Cache
+Process-level caches for Google Classroom credentials and API clients
+
+Parsed credentials are kept per user and built API clients per user and
+scope set, so a request does not re-read the stored credentials JSON or
+rebuild the discovery client. Clients are built from the discovery document
+on disk (the copy bundled with google-api-python-client, or GOOGLE_DISCOVERY_DIR),
+so no discovery request goes over the network. Each thread gets its own client
+because the httplib2 connection underneath is not thread-safe.
+Expired tokens are refreshed under a per-user lock: concurrent requests for
+the same user wait for one refresh instead of all refreshing at once.
+
+The cache is per process. invalidate() runs only in the worker that handled
+a reconnect or disconnect; the other workers re-read the stored credentials
+once their entry is older than GOOGLE_CREDENTIALS_CACHE_TTL seconds, so they
+may use revoked or re-scoped credentials for up to that long (0 disables
+credential caching).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Optional
+
+DISCOVERY_DIR = os.environ.get('GOOGLE_DISCOVERY_DIR')
+CLIENT_CACHE_SIZE = int(os.environ.get('GOOGLE_CLIENT_CACHE_SIZE', 256))
+CREDENTIALS_TTL = float(os.environ.get('GOOGLE_CREDENTIALS_CACHE_TTL', 300))  # seconds
+
+
+@lru_cache(maxsize=None)
+def load_discovery_document(api: str, version: str) -> str:
+    """Discovery document for api/version, read from disk once per process"""
+    if DISCOVERY_DIR:
+        path = os.path.join(DISCOVERY_DIR, f"{api}.{version}.json")
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+
+    from googleapiclient.discovery_cache import get_static_doc
+    document = get_static_doc(api, version)
+    if document is None:
+        raise FileNotFoundError(f"No static discovery document for {api} {version}")
+    return document
+
+
+def build_client(api: str, version: str, credentials=None, http=None):
+    """Build an API client from the on-disk discovery document (no network)"""
+    from googleapiclient.discovery import build_from_document
+    return build_from_document(load_discovery_document(api, version), credentials=credentials, http=http)
+
+
+class GoogleClientCache:
+    """Credentials per user (TTL) and API clients per (user, API, scopes), LRU-bounded"""
+
+    def __init__(self, maxsize: int = CLIENT_CACHE_SIZE, ttl: float = CREDENTIALS_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._credentials: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._clients: 'OrderedDict[Hashable, Dict[str, Any]]' = OrderedDict()
+        self._refresh_locks: Dict[str, threading.Lock] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'builds': 0, 'refreshes': 0}
+
+    # Credentials
+
+    def get_credentials(self, user_id: str):
+        """Cached credentials for a user, or None when missing or older than the TTL"""
+        with self._lock:
+            credentials = self._live_credentials(user_id)
+            if credentials is None:
+                self._stats['misses'] += 1
+                return None
+            self._credentials.move_to_end(user_id)
+            self._stats['hits'] += 1
+            return credentials
+
+    def _live_credentials(self, user_id: str):
+        """Credentials entry if not expired; an expired one is dropped with its clients (lock held)"""
+        entry = self._credentials.get(user_id)
+        if entry is None:
+            return None
+        expires_at, credentials = entry
+        if expires_at < time.monotonic():
+            del self._credentials[user_id]
+            self._drop_clients(user_id)
+            return None
+        return credentials
+
+    def put_credentials(self, user_id: str, credentials, replace: bool = True):
+        """
+        Cache credentials for a user; returns the cached object
+
+        With replace=False an object cached meanwhile by another thread wins,
+        so concurrent misses end up sharing one credentials object. Clients
+        built on a replaced credentials object are dropped. Storing restarts
+        the entry's TTL.
+        """
+        with self._lock:
+            cached = self._live_credentials(user_id)
+            if cached is not None and not replace:
+                return cached
+            if cached is not credentials:
+                self._drop_clients(user_id)
+            self._credentials[user_id] = (time.monotonic() + self.ttl, credentials)
+            self._credentials.move_to_end(user_id)
+            while len(self._credentials) > self.maxsize:
+                evicted, _ = self._credentials.popitem(last=False)
+                self._drop_clients(evicted)
+            return credentials
+
+    def ensure_fresh(self, user_id: str, credentials, on_refresh: Optional[Callable] = None):
+        """
+        Refresh expired credentials, single-flighted per user
+
+        Threads waiting on the lock find the token already refreshed by the
+        first one and return without refreshing again.
+        """
+        if not (credentials.expired and credentials.refresh_token):
+            return credentials
+
+        with self._refresh_lock(user_id):
+            if credentials.expired:
+                from google.auth.transport.requests import Request
+                credentials.refresh(Request())
+                with self._lock:
+                    self._stats['refreshes'] += 1
+                if on_refresh:
+                    on_refresh(credentials)
+        return credentials
+
+    def _refresh_lock(self, user_id: str) -> threading.Lock:
+        with self._lock:
+            lock = self._refresh_locks.get(user_id)
+            if lock is None:
+                lock = self._refresh_locks[user_id] = threading.Lock()
+            return lock
+
+    # Clients
+
+    def client(self, user_id: str, credentials, api: str = 'classroom', version: str = 'v1'):
+        """API client for this user and scope set, built once per thread"""
+        key = (user_id, api, version, tuple(sorted(credentials.scopes or ())))
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None or entry['credentials'] is not credentials:
+                entry = self._clients[key] = {'credentials': credentials, 'local': threading.local()}
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.maxsize:
+                self._clients.popitem(last=False)
+
+        client = getattr(entry['local'], 'client', None)
+        if client is None:
+            client = entry['local'].client = build_client(api, version, credentials=credentials)
+            with self._lock:
+                self._stats['builds'] += 1
+        return client
+
+    def _drop_clients(self, user_id: str):
+        for key in [key for key in self._clients if key[0] == user_id]:
+            del self._clients[key]
+
+    # Maintenance
+
+    def invalidate(self, user_id: str):
+        """Forget a user's credentials and clients (after reconnecting or disconnecting)"""
+        with self._lock:
+            self._credentials.pop(user_id, None)
+            self._drop_clients(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._credentials.clear()
+            self._clients.clear()
+            self._refresh_locks.clear()
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, users=len(self._credentials), clients=len(self._clients))
+
+
+client_cache = GoogleClientCache()
+
+# Cached clients hold open connections; a forked worker starts empty
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=client_cache._after_fork)
@@ -84,24 +84,29 @@
             window.weeklyChart.destroy();
         }
 
-        // Mock data
-        const mockPomodoroData = [5, 7, 6, 8, 5, 3, 6];
-        const mockNoteData = [3, 5, 4, 6, 3, 2, 4];
+        // แต่ละวันมาจาก API: { date: 'YYYY-MM-DD', pomodoros, study_time, lessons, notes }
+        const days = weeklyData || [];
+        const dayNames = ['อา', 'จ', 'อ', 'พ', 'พฤ', 'ศ', 'ส'];
+        const labels = days.map(day => {
+            const [year, month, date] = day.date.split('-').map(Number);
+            const weekday = new Date(year, month - 1, date).getDay();
+            return days.length > 7 ? `${date}/${month}` : dayNames[weekday];
+        });
 
         window.weeklyChart = new Chart(ctx, {
             type: 'line',
             data: {
-                labels: ['จ', 'อ', 'พ', 'พฤ', 'ศ', 'ส', 'อา'],
+                labels: labels,
                 datasets: [
                     {
                         label: 'Pomodoros',
-                        data: mockPomodoroData,
+                        data: days.map(day => day.pomodoros),
                         borderColor: 'rgb(75, 192, 192)',
                         tension: 0.1
                     },
                     {
                         label: 'Notes',
-                        data: mockNoteData,
+                        data: days.map(day => day.notes),
                         borderColor: 'rgb(255, 99, 132)',
                         tension: 0.1
                     }
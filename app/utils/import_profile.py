@@ -0,0 +1,83 @@
+"""
+Import-time profile of application startup.
+
+Runs create_app() in a fresh interpreter under `python -X importtime`, so the
+numbers describe a cold start (a new worker or CLI invocation) rather than
+the already warm current process, and summarises the report.
+"""
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# Executed in the child interpreter; argv[1] is the config name
+BOOT_SCRIPT = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "from app import create_app\n"
+    "create_app(sys.argv[1])\n"
+    "print(f'create_app: {(time.perf_counter() - started) * 1e6:.0f} us', file=sys.stderr)\n"
+)
+
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+_BOOT_LINE = re.compile(r'^create_app: (\d+) us$')
+
+
+def parse_importtime(output: str) -> List[Dict]:
+    """
+    Entries of a `-X importtime` report, in the order they were printed.
+
+    Each entry has the module name, its nesting depth (0 for imports made
+    by the profiled script itself) and the self and cumulative import times
+    in microseconds.
+    """
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            entries.append({
+                'module': match.group(4),
+                'depth': (len(match.group(3)) - 3) // 2,  # top-level imports are indented by two
+                'self_us': int(match.group(1)),
+                'cumulative_us': int(match.group(2))
+            })
+    return entries
+
+
+def by_package(entries: List[Dict]) -> Dict[str, int]:
+    """Self time in microseconds summed per top-level package"""
+    totals = defaultdict(int)
+    for entry in entries:
+        totals[entry['module'].split('.')[0]] += entry['self_us']
+    return dict(totals)
+
+
+def profile_startup(config_name: str = 'development', root: Optional[str] = None,
+                    timeout: float = 120) -> Dict:
+    """
+    Boot the application once in a child process and profile its imports.
+
+    Returns the import entries, the create_app() wall time and the total
+    import time (both in microseconds). Raises RuntimeError when the child
+    fails to start the application.
+    """
+    root = root or os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT, config_name],
+        cwd=root, env=env, capture_output=True, text=True, timeout=timeout
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"create_app('{config_name}') failed:\n{result.stderr[-2000:]}")
+
+    entries = parse_importtime(result.stderr)
+    boot = [int(match.group(1)) for match in map(_BOOT_LINE.match, result.stderr.splitlines()) if match]
+    return {
+        'imports': entries,
+        'create_app_us': boot[-1] if boot else None,
+        'import_us': sum(entry['self_us'] for entry in entries)
+    }
@@ -0,0 +1,168 @@
+"""
+SQLite storage backend for Flask-Limiter (the `limits` package).
+
+Rate limit counters live in a local SQLite file, so every worker process on
+the host shares one count per client instead of each process counting on its
+own. Importing this module registers the ``sqlite://`` scheme with `limits`:
+
+    storage_uri = "sqlite:////srv/app/instance/rate_limits.db"   # absolute path
+    storage_uri = "sqlite:///rate_limits.db"                     # relative to the cwd
+
+Supports the fixed-window and sliding-window-counter strategies. A sliding
+window is a pair of fixed-window buckets (previous and current) whose counts
+are weighted by how much of the previous window is still in range; the check
+and the increment run in one write transaction, so concurrent workers cannot
+both take the last slot.
+"""
+import os
+import sqlite3
+import threading
+import time
+from math import floor
+from typing import Iterable, Optional, Tuple
+
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+
+SCHEME_PREFIX = 'sqlite:///'
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """Rate limit counters in a SQLite file shared by the processes of one host."""
+
+    STORAGE_SCHEME = ['sqlite']
+    PURGE_INTERVAL = 60.0  # seconds between deletes of expired counters, per process
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        if not uri or not uri.startswith(SCHEME_PREFIX) or uri == SCHEME_PREFIX:
+            raise ValueError(f"expected {SCHEME_PREFIX}<path to database file>, got {uri!r}")
+        self.path = uri[len(SCHEME_PREFIX):]
+        self.timeout = float(options.get('timeout', 5))
+        self._local = threading.local()
+        self._next_purge = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS rate_limit_counter (
+                key TEXT PRIMARY KEY,
+                count INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # Counters are short-lived; losing the last writes on power loss is acceptable
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    # Counters
+
+    @staticmethod
+    def _increment(conn: sqlite3.Connection, key: str, expiry: float, amount: int, now: float) -> int:
+        # An expired counter restarts from `amount` with a fresh expiry
+        return conn.execute("""
+            INSERT INTO rate_limit_counter (key, count, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END,
+                expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END
+            RETURNING count
+        """, (key, amount, now + expiry, now, now)).fetchone()[0]
+
+    @staticmethod
+    def _counts(conn: sqlite3.Connection, keys: Iterable[str], now: float) -> dict:
+        keys = list(keys)
+        rows = conn.execute(
+            f"SELECT key, count FROM rate_limit_counter WHERE key IN ({', '.join('?' * len(keys))}) "
+            "AND expires_at > ?",
+            (*keys, now)
+        )
+        return dict(rows.fetchall())
+
+    def _purge_expired(self, conn: sqlite3.Connection, now: float) -> None:
+        if now >= self._next_purge:
+            self._next_purge = now + self.PURGE_INTERVAL
+            conn.execute("DELETE FROM rate_limit_counter WHERE expires_at <= ?", (now,))
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        conn = self._connect()
+        self._purge_expired(conn, now)
+        return self._increment(conn, key, expiry, amount, now)
+
+    def get(self, key: str) -> int:
+        return self._counts(self._connect(), [key], time.time()).get(key, 0)
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = self._connect().execute(
+            "SELECT expires_at FROM rate_limit_counter WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def clear(self, key: str) -> None:
+        self._connect().execute("DELETE FROM rate_limit_counter WHERE key = ?", (key,))
+
+    def check(self) -> bool:
+        try:
+            self._connect().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        return self._connect().execute("DELETE FROM rate_limit_counter").rowcount
+
+    # Sliding window counter
+
+    @staticmethod
+    def _window(previous_count: int, current_count: int, expiry: int, now: float) -> Tuple[int, float, int, float]:
+        # Same weighting as limits' MemoryStorage
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        conn = self._connect()
+        self._purge_expired(conn, now)
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            counts = self._counts(conn, (previous_key, current_key), now)
+            previous_count, previous_ttl, current_count, _ = self._window(
+                counts.get(previous_key, 0), counts.get(current_key, 0), expiry, now
+            )
+            acquired = floor(previous_count * previous_ttl / expiry + current_count) + amount <= limit
+            if acquired:
+                # Kept for two windows: it is the previous bucket during the next one
+                self._increment(conn, current_key, 2 * expiry, amount, now)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return acquired
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        counts = self._counts(self._connect(), (previous_key, current_key), now)
+        return self._window(counts.get(previous_key, 0), counts.get(current_key, 0), expiry, now)
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self._connect().execute(
+            "DELETE FROM rate_limit_counter WHERE key IN (?, ?)", (previous_key, current_key)
+        )
@@ -0,0 +1,434 @@
+"""
+Full-text search index over notes, lessons and tasks.
+
+Searchable text is mirrored into ``search_document`` (one row per entity:
+kind, entity id, owner, title, body) by database triggers on ``note``,
+``lesson`` and ``task``, so ORM writes, Core bulk inserts and raw SQL are
+all indexed. On SQLite an FTS5 external-content table ``search_fts`` sits on
+top of search_document (kept current by a second set of triggers); on
+PostgreSQL search_document carries a generated ``tsvector`` column with a
+GIN index.
+
+The owner is indexed as a token (``u`` + user id without dashes) so a query
+only walks the posting lists of one user's documents: latency follows the
+number of matches for that user, not the size of the whole table.
+
+Schema creation is idempotent and runs at startup (init_search_index);
+``flask search rebuild`` repopulates the index from the source tables.
+"""
+import html
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# kind -> (table, title column, body column)
+SOURCES = {
+    'note': ('note', 'title', 'content'),
+    'lesson': ('lesson', 'title', 'description'),
+    'task': ('task', 'title', 'description')
+}
+
+MAX_TERMS = 8
+# Ranking scores only the most recently indexed matches, so very common words cost the same at any size
+RANK_CANDIDATES = 1000
+SNIPPET_TOKENS = 12
+_HIGHLIGHT_START = '\ue000'  # private-use sentinels, replaced after escaping
+_HIGHLIGHT_END = '\ue001'
+# Anything but whitespace and FTS/tsquery syntax characters
+_TERM = re.compile(r"[^\s\"'*():^{}+\-,.;!?&|<>\\]+")
+
+_state = {'dialect': None, 'available': False}
+
+
+def owner_token(user_id: str) -> str:
+    return 'u' + (user_id or '').replace('-', '')
+
+
+def _owner_sql(column: str) -> str:
+    return f"'u' || replace({column}, '-', '')"
+
+
+def query_terms(query: str) -> List[str]:
+    """Words of a user query, with search syntax characters stripped"""
+    return _TERM.findall(query or '')[:MAX_TERMS]
+
+
+# ------------------------------------------------------------------
+# Schema
+# ------------------------------------------------------------------
+
+SQLITE_DOCUMENT_DDL = """
+    CREATE TABLE IF NOT EXISTS search_document (
+        id INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        entity_id TEXT NOT NULL,
+        owner TEXT NOT NULL,
+        title TEXT,
+        body TEXT,
+        UNIQUE (kind, entity_id)
+    )
+"""
+
+SQLITE_FTS_DDL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+        title, body, owner, kind,
+        content='search_document', content_rowid='id',
+        tokenize="{tokenizer}", prefix='2 3'
+    )
+"""
+
+# Combining marks count as token characters so Thai words are not split at vowel signs
+SQLITE_TOKENIZERS = ("unicode61 remove_diacritics 2 categories 'L* N* Co M*'", "unicode61 remove_diacritics 2")
+
+SQLITE_FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS search_document_ai AFTER INSERT ON search_document BEGIN
+        INSERT INTO search_fts (rowid, title, body, owner, kind)
+        VALUES (new.id, new.title, new.body, new.owner, new.kind);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_document_ad AFTER DELETE ON search_document BEGIN
+        INSERT INTO search_fts (search_fts, rowid, title, body, owner, kind)
+        VALUES ('delete', old.id, old.title, old.body, old.owner, old.kind);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_document_au AFTER UPDATE ON search_document BEGIN
+        INSERT INTO search_fts (search_fts, rowid, title, body, owner, kind)
+        VALUES ('delete', old.id, old.title, old.body, old.owner, old.kind);
+        INSERT INTO search_fts (rowid, title, body, owner, kind)
+        VALUES (new.id, new.title, new.body, new.owner, new.kind);
+    END
+    """
+]
+
+
+def _sqlite_source_triggers(kind: str) -> List[str]:
+    table, title, body = SOURCES[kind]
+    owner = _owner_sql('new.user_id')
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS search_{table}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO search_document (kind, entity_id, owner, title, body)
+            VALUES ('{kind}', new.id, {owner}, new.{title}, new.{body});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS search_{table}_au AFTER UPDATE OF {title}, {body}, user_id ON {table} BEGIN
+            UPDATE search_document SET owner = {owner}, title = new.{title}, body = new.{body}
+            WHERE kind = '{kind}' AND entity_id = old.id;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS search_{table}_ad AFTER DELETE ON {table} BEGIN
+            DELETE FROM search_document WHERE kind = '{kind}' AND entity_id = old.id;
+        END
+        """
+    ]
+
+
+POSTGRES_DOCUMENT_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS search_document (
+        id BIGSERIAL PRIMARY KEY,
+        kind VARCHAR(20) NOT NULL,
+        entity_id VARCHAR(36) NOT NULL,
+        owner VARCHAR(40) NOT NULL,
+        title TEXT,
+        body TEXT,
+        document TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+        ) STORED,
+        UNIQUE (kind, entity_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_search_document_fts ON search_document USING GIN (document)",
+    "CREATE INDEX IF NOT EXISTS idx_search_document_owner ON search_document (owner, kind)"
+]
+
+
+def _postgres_source_triggers(kind: str) -> List[str]:
+    table, title, body = SOURCES[kind]
+    function = f"search_sync_{table}"
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM search_document WHERE kind = '{kind}' AND entity_id = OLD.id;
+                RETURN OLD;
+            END IF;
+            INSERT INTO search_document (kind, entity_id, owner, title, body)
+            VALUES ('{kind}', NEW.id, {_owner_sql('NEW.user_id')}, NEW.{title}, NEW.{body})
+            ON CONFLICT (kind, entity_id) DO UPDATE
+                SET owner = EXCLUDED.owner, title = EXCLUDED.title, body = EXCLUDED.body;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        f'DROP TRIGGER IF EXISTS search_{table}_sync ON "{table}"',
+        f"""
+        CREATE TRIGGER search_{table}_sync
+        AFTER INSERT OR DELETE OR UPDATE OF {title}, {body}, user_id ON "{table}"
+        FOR EACH ROW EXECUTE FUNCTION {function}()
+        """
+    ]
+
+
+def _existing_sources(connection) -> List[str]:
+    from sqlalchemy import inspect
+
+    tables = set(inspect(connection).get_table_names())
+    return [kind for kind, (table, _, _) in SOURCES.items() if table in tables]
+
+
+def _has_table(connection, name: str) -> bool:
+    from sqlalchemy import inspect
+
+    return inspect(connection).has_table(name)
+
+
+def create_search_schema(connection) -> bool:
+    """
+    Create the index tables and triggers (idempotent).
+
+    Returns True when search_document did not exist before, i.e. the
+    caller should backfill it.
+    """
+    dialect = connection.dialect.name
+    created = not _has_table(connection, 'search_document')
+    kinds = _existing_sources(connection)
+
+    if dialect == 'sqlite':
+        connection.execute(text(SQLITE_DOCUMENT_DDL))
+        for index, tokenizer in enumerate(SQLITE_TOKENIZERS):
+            try:
+                connection.execute(text(SQLITE_FTS_DDL.format(tokenizer=tokenizer.replace('"', '""'))))
+                break
+            except Exception:
+                # Older SQLite without the unicode61 "categories" option
+                if index == len(SQLITE_TOKENIZERS) - 1:
+                    raise
+        statements = list(SQLITE_FTS_TRIGGERS)
+        for kind in kinds:
+            statements += _sqlite_source_triggers(kind)
+    elif dialect == 'postgresql':
+        statements = list(POSTGRES_DOCUMENT_DDL)
+        for kind in kinds:
+            statements += _postgres_source_triggers(kind)
+    else:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+    for statement in statements:
+        connection.execute(text(statement))
+    return created
+
+
+def rebuild_search_index(connection, kinds: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """Repopulate search_document (and the FTS table) from the source tables"""
+    kinds = [kind for kind in (kinds or SOURCES) if kind in _existing_sources(connection)]
+    counts = {}
+    for kind in kinds:
+        table, title, body = SOURCES[kind]
+        connection.execute(text("DELETE FROM search_document WHERE kind = :kind"), {'kind': kind})
+        result = connection.execute(text(
+            f'INSERT INTO search_document (kind, entity_id, owner, title, body) '
+            f'SELECT :kind, id, {_owner_sql("user_id")}, {title}, {body} FROM "{table}" WHERE user_id IS NOT NULL'
+        ), {'kind': kind})
+        counts[kind] = result.rowcount
+
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text("INSERT INTO search_fts (search_fts) VALUES ('optimize')"))
+    return counts
+
+
+# ------------------------------------------------------------------
+# Queries
+# ------------------------------------------------------------------
+
+def _render_snippet(snippet: Optional[str]) -> str:
+    """HTML-escape a snippet and turn the highlight sentinels into <mark> tags"""
+    escaped = html.escape(snippet or '')
+    return escaped.replace(_HIGHLIGHT_START, '<mark>').replace(_HIGHLIGHT_END, '</mark>')
+
+
+def _fold(word: str) -> str:
+    """Case- and accent-insensitive form, matching the FTS5 tokenizer"""
+    decomposed = unicodedata.normalize('NFKD', word)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def _highlight(source: Optional[str], terms: List[str]) -> str:
+    """SNIPPET_TOKENS words around the first match in ``source``, matches wrapped in sentinels"""
+    words = list(_TERM.finditer(source or ''))
+    if not words:
+        return ''
+    prefixes = tuple(_fold(term) for term in terms)
+    matched = [_fold(word.group()).startswith(prefixes) for word in words]
+
+    first = matched.index(True) if True in matched else 0
+    start = max(0, min(first - SNIPPET_TOKENS // 3, len(words) - SNIPPET_TOKENS))
+    end = min(len(words), start + SNIPPET_TOKENS)
+
+    parts = ['…'] if start > 0 else []
+    position = words[start].start() if start > 0 else 0
+    for index in range(start, end):
+        word = words[index]
+        parts.append(source[position:word.start()])
+        parts.append(f"{_HIGHLIGHT_START}{word.group()}{_HIGHLIGHT_END}" if matched[index] else word.group())
+        position = word.end()
+    if end < len(words):
+        parts.append('…')
+    else:
+        parts.append(source[position:])  # punctuation after the last word
+    return ''.join(parts)
+
+
+def _sqlite_search(connection, owner: str, terms: List[str], kinds: List[str], limit: int, offset: int):
+    from sqlalchemy import bindparam
+
+    quoted = ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+    kind_filter = ' OR '.join(kinds)
+    match = f"owner:{owner} AND kind:({kind_filter}) AND {{title body}}:({quoted})"
+
+    total = connection.execute(
+        text("SELECT count(*) FROM search_fts WHERE search_fts MATCH :match"), {'match': match}
+    ).scalar()
+
+    # FTS5 walks matches in rowid order, so the inner LIMIT stops the scan early
+    ranked = connection.execute(text("""
+        SELECT rowid, rank FROM (
+            SELECT rowid, bm25(search_fts, 10.0, 1.0, 0.0, 0.0) AS rank
+            FROM search_fts
+            WHERE search_fts MATCH :match
+            ORDER BY rowid DESC
+            LIMIT :candidates
+        )
+        ORDER BY rank
+        LIMIT :limit OFFSET :offset
+    """), {'match': match, 'candidates': max(RANK_CANDIDATES, offset + limit),
+           'limit': limit, 'offset': offset}).fetchall()
+    if not ranked:
+        return total, []
+
+    # Snippets for the page only, built from the stored text: a second MATCH
+    # restricted to these rowids would re-read every posting list
+    details = connection.execute(
+        text("SELECT id, kind, entity_id, title, body FROM search_document WHERE id IN :rowids")
+        .bindparams(bindparam('rowids', expanding=True)),
+        {'rowids': [rowid for rowid, _ in ranked]}
+    ).fetchall()
+    by_rowid = {
+        row[0]: (row[1], row[2], row[3], _highlight(row[4] or row[3], terms))
+        for row in details
+    }
+
+    # bm25 is lower-is-better; report higher-is-better like ts_rank
+    return total, [by_rowid[rowid] + (-rank,) for rowid, rank in ranked if rowid in by_rowid]
+
+
+def _postgres_search(connection, owner: str, terms: List[str], kinds: List[str], limit: int, offset: int):
+    from sqlalchemy import bindparam
+
+    tsquery = ' & '.join("'" + term.replace("'", "''").replace('\\', '\\\\') + "':*" for term in terms)
+    params = {'owner': owner, 'kinds': list(kinds), 'tsquery': tsquery, 'limit': limit, 'offset': offset,
+              'candidates': max(RANK_CANDIDATES, offset + limit)}
+    where = "d.owner = :owner AND d.kind IN :kinds AND d.document @@ q"
+
+    total = connection.execute(
+        text(f"SELECT count(*) FROM search_document d, to_tsquery('simple', :tsquery) q WHERE {where}")
+        .bindparams(bindparam('kinds', expanding=True)), params
+    ).scalar()
+    rows = connection.execute(text(f"""
+        SELECT kind, entity_id, title,
+               ts_headline('simple', coalesce(nullif(body, ''), title), q,
+                           'StartSel={_HIGHLIGHT_START}, StopSel={_HIGHLIGHT_END}, MaxWords=24, MinWords=8'),
+               rank
+        FROM (
+            SELECT d.kind, d.entity_id, d.title, d.body, q, ts_rank_cd(d.document, q) AS rank
+            FROM search_document d, to_tsquery('simple', :tsquery) q
+            WHERE {where}
+            ORDER BY d.id DESC
+            LIMIT :candidates
+        ) candidates
+        ORDER BY rank DESC
+        LIMIT :limit OFFSET :offset
+    """).bindparams(bindparam('kinds', expanding=True)), params).fetchall()
+    return total, [tuple(row) for row in rows]
+
+
+def search(connection, user_id: str, query: str, kinds: Optional[Iterable[str]] = None,
+           limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+    """
+    Ranked matches of a user's documents for a free-text query.
+
+    Every word must match (as a prefix) in the title or body. ``total``
+    counts every match; ranking considers the newest RANK_CANDIDATES.
+
+    Returns:
+        {'total': int, 'results': [{'type', 'id', 'title', 'snippet', 'rank'}]}
+        with snippets HTML-escaped and matches wrapped in <mark>.
+    """
+    kinds = [kind for kind in (kinds or SOURCES) if kind in SOURCES]
+    terms = query_terms(query)
+    if not terms or not kinds:
+        return {'total': 0, 'results': []}
+
+    backend = _sqlite_search if connection.dialect.name == 'sqlite' else _postgres_search
+    total, rows = backend(connection, owner_token(user_id), terms, kinds, limit, offset)
+    return {
+        'total': total,
+        'results': [
+            {
+                'type': kind,
+                'id': entity_id,
+                'title': title,
+                'snippet': _render_snippet(snippet),
+                'rank': round(float(rank), 4)
+            }
+            for kind, entity_id, title, snippet, rank in rows
+        ]
+    }
+
+
+def is_available() -> bool:
+    """Whether init_search_index set up the index (services fall back to LIKE otherwise)"""
+    return _state['available']
+
+
+def init_search_index(app) -> None:
+    """
+    Create the search schema on startup and backfill it the first time.
+
+    Disabled with SEARCH_INDEX_ENABLED=false. Failures (e.g. SQLite built
+    without FTS5) are logged and leave search on the LIKE fallback.
+
+    Args:
+        app: Flask application instance
+    """
+    _state['available'] = False
+    if not app.config.get('SEARCH_INDEX_ENABLED', True):
+        return
+
+    from app import db
+
+    try:
+        with app.app_context():
+            with db.engine.begin() as connection:
+                if not _existing_sources(connection):
+                    # Empty database; the schema is created on the next start
+                    return
+                if create_search_schema(connection):
+                    counts = rebuild_search_index(connection)
+                    logger.info(f"Built search index: {counts}")
+                _state['dialect'] = connection.dialect.name
+        _state['available'] = True
+    except Exception as e:
+        logger.warning(f"Full-text search index unavailable, using LIKE search: {e}")
@@ -0,0 +1,209 @@
+"""
+Online SQLite backups.
+
+Copies a live database with SQLite's online backup API instead of copying
+the file, so a snapshot is always consistent and includes transactions that
+still live in the -wal file.
+
+- WAL databases are copied in one step: the copy reads a snapshot and never
+  blocks writers. (Copying in steps would restart whenever another
+  connection writes, which with WAL is what happens every few seconds.)
+- Rollback-journal databases are copied in steps of BACKUP_PAGES_PER_STEP
+  pages with a pause in between, so writers get the lock back between
+  steps. A write through another connection restarts the copy from page 1,
+  so after MAX_RESTARTS restarts the rest is copied in one step, which
+  holds writers off for the length of one full copy. Databases that are
+  written more often than a paced copy takes should use WAL.
+
+Every copy is written under a temporary name and checked with
+`PRAGMA integrity_check` before it gets its final name, so a
+backup_*.db(.gz) file in the backup directory is always one that opened
+cleanly. Snapshots can be gzip-compressed and are rotated by age
+(BACKUP_RETENTION_DAYS), always keeping the newest BACKUP_KEEP_MIN.
+
+Used by `flask backup` (app/cli.py) and DatabaseManager.backup_database.
+"""
+
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATTERN = re.compile(r'^backup_(\d{8}_\d{6})\.db(\.gz)?$')
+TIMESTAMP_FORMAT = '%Y%m%d_%H%M%S'
+MAX_RESTARTS = 3
+
+
+class BackupError(Exception):
+    """A backup could not be written or failed verification"""
+
+
+class _BackupRestarting(Exception):
+    pass
+
+
+def online_backup(source_path, destination_path, pages=256, pause=0.01):
+    """
+    Copy a live SQLite database to destination_path with the backup API.
+
+    Returns a dict with the number of pages, steps, restarts and the
+    journal mode of the source.
+    """
+    source_path = Path(source_path)
+    if not source_path.exists():
+        raise BackupError(f"database not found: {source_path}")
+
+    source = sqlite3.connect(str(source_path), timeout=30)
+    target = sqlite3.connect(str(destination_path))
+    try:
+        journal_mode = source.execute('PRAGMA journal_mode').fetchone()[0].lower()
+        state = {'steps': 0, 'restarts': 0, 'remaining': None, 'total': 0}
+
+        def progress(status, remaining, total):
+            state['steps'] += 1
+            state['total'] = total
+            if state['remaining'] is not None and remaining > state['remaining']:
+                # A write through another connection sent the copy back to page 1
+                state['restarts'] += 1
+                if state['restarts'] > MAX_RESTARTS:
+                    raise _BackupRestarting()
+            state['remaining'] = remaining
+            if remaining and pause:
+                time.sleep(pause)
+
+        if journal_mode == 'wal':
+            source.backup(target)
+        else:
+            try:
+                source.backup(target, pages=pages, progress=progress)
+            except _BackupRestarting:
+                logger.warning(f"Backup of {source_path} restarted {state['restarts']} times "
+                               "under concurrent writes; copying the rest in one step")
+                source.backup(target)
+
+        # A snapshot is a single self-contained file, not a WAL pair
+        target.execute('PRAGMA journal_mode=DELETE')
+        return {
+            'pages': state['total'] or target.execute('PRAGMA page_count').fetchone()[0],
+            'steps': max(state['steps'], 1),
+            'restarts': state['restarts'],
+            'journal_mode': journal_mode
+        }
+    finally:
+        target.close()
+        source.close()
+
+
+def check_integrity(path):
+    """
+    Run `PRAGMA integrity_check` on a backup (.db or .db.gz).
+
+    Returns the problems found; an empty list means the copy is sound.
+    """
+    path = Path(path)
+    if path.suffix != '.gz':
+        return _integrity_problems(path)
+
+    with tempfile.TemporaryDirectory(prefix='verify_backup_') as directory:
+        restored = Path(directory) / path.stem
+        with gzip.open(path, 'rb') as compressed, open(restored, 'wb') as plain:
+            shutil.copyfileobj(compressed, plain)
+        return _integrity_problems(restored)
+
+
+def _integrity_problems(path):
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute('PRAGMA integrity_check').fetchall()
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as e:
+        return [str(e)]
+    return [row[0] for row in rows if row[0] != 'ok']
+
+
+def backup_to(source_path, destination_path, compress=False, verify=True, pages=256, pause=0.01):
+    """
+    Write a verified backup of source_path to destination_path.
+
+    With compress the file is gzipped (a .gz suffix is added if missing).
+    Returns the final path. Raises BackupError and leaves nothing behind
+    when the copy or its integrity check fails.
+    """
+    destination_path = Path(destination_path)
+    if compress and destination_path.suffix != '.gz':
+        destination_path = destination_path.with_name(destination_path.name + '.gz')
+    destination_path.parent.mkdir(parents=True, exist_ok=True)
+
+    partial = destination_path.with_name(destination_path.name + '.partial')
+    copy = partial.with_suffix('.db') if compress else partial
+    try:
+        stats = online_backup(source_path, copy, pages=pages, pause=pause)
+
+        if verify:
+            problems = _integrity_problems(copy)
+            if problems:
+                raise BackupError(f"integrity check failed for {source_path}: {'; '.join(problems[:5])}")
+
+        if compress:
+            with open(copy, 'rb') as plain, gzip.open(partial, 'wb', compresslevel=6) as compressed:
+                shutil.copyfileobj(plain, compressed)
+            copy.unlink()
+
+        os.replace(partial, destination_path)
+    except BaseException:
+        for leftover in {partial, copy}:
+            leftover.unlink(missing_ok=True)
+        raise
+
+    logger.info(f"Database backup created: {destination_path} ({stats['pages']} pages, "
+                f"{stats['steps']} steps, {stats['journal_mode']})")
+    return destination_path
+
+
+def create_snapshot(source_path, backup_dir, compress=False, verify=True, pages=256, pause=0.01, now=None):
+    """Write a verified backup_<timestamp>.db(.gz) snapshot into backup_dir"""
+    timestamp = (now or datetime.now()).strftime(TIMESTAMP_FORMAT)
+    destination = Path(backup_dir) / f"backup_{timestamp}.db"
+    if destination.exists() or destination.with_name(destination.name + '.gz').exists():
+        raise BackupError(f"snapshot already exists: {destination}")
+    return backup_to(source_path, destination, compress=compress, verify=verify, pages=pages, pause=pause)
+
+
+def list_snapshots(backup_dir):
+    """(taken_at, path) of the rotating snapshots in backup_dir, newest first"""
+    backup_dir = Path(backup_dir)
+    if not backup_dir.is_dir():
+        return []
+
+    snapshots = []
+    for path in backup_dir.iterdir():
+        match = SNAPSHOT_PATTERN.match(path.name)
+        if match:
+            snapshots.append((datetime.strptime(match.group(1), TIMESTAMP_FORMAT), path))
+    return sorted(snapshots, reverse=True)
+
+
+def prune_snapshots(backup_dir, retention_days, keep_min=1, now=None, dry_run=False):
+    """
+    Delete snapshots older than retention_days, keeping the newest keep_min.
+
+    Only files named like create_snapshot's output are considered; manual and
+    pre-startup backups are left alone. Returns the paths (to be) removed.
+    """
+    cutoff = (now or datetime.now()) - timedelta(days=retention_days)
+    expired = [path for taken_at, path in list_snapshots(backup_dir)[keep_min:] if taken_at < cutoff]
+    if not dry_run:
+        for path in expired:
+            path.unlink(missing_ok=True)
+            logger.info(f"Removed expired backup: {path}")
+    return expired
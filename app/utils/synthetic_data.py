@@ -0,0 +1,319 @@
+"""
+Synthetic data generator for load testing.
+
+Creates users with lessons, notes (tags and files), tasks, months of pomodoro
+sessions, stream posts and comments, class members and graded grade items.
+Rows are built in memory and written per table with chunked executemany
+inserts, one transaction per batch of users. Output is deterministic for a
+given seed.
+
+Run with `flask seed synthetic --users 100` (see app/cli.py).
+"""
+
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app import db
+
+INSERT_CHUNK_SIZE = 5000
+SYNTHETIC_PASSWORD = 'synthetic-password'
+
+NOTE_TAGS = [
+    'exam', 'homework', 'lecture', 'summary', 'lab', 'project', 'reading',
+    'revision', 'formula', 'vocabulary', 'important', 'question'
+]
+SUBJECTS = ['Mathematics', 'Physics', 'Chemistry', 'Biology', 'History', 'English', 'Computer Science']
+GRADING_SCALE = {
+    'A': {'min': 80, 'max': 100, 'gpa': 4.0},
+    'B': {'min': 70, 'max': 79.99, 'gpa': 3.0},
+    'C': {'min': 60, 'max': 69.99, 'gpa': 2.0},
+    'D': {'min': 50, 'max': 59.99, 'gpa': 1.0},
+    'F': {'min': 0, 'max': 49.99, 'gpa': 0.0}
+}
+GRADE_CATEGORIES = [('Assignments', 40.0), ('Projects', 30.0), ('Exams', 20.0), ('Participation', 10.0)]
+
+# Tables in insert (foreign key) order
+TABLE_ORDER = [
+    'user', 'lesson', 'note', 'note_tag', 'note_file', 'task', 'pomodoro_session',
+    'stream_post', 'stream_comment', 'member',
+    'grade_config', 'grade_category', 'grade_item', 'grade_entry'
+]
+
+
+class SyntheticDataGenerator:
+    """Generate realistic volume across the main tables"""
+
+    def __init__(self, users: int = 10, lessons_per_user: int = 5, notes_per_lesson: int = 10,
+                 tasks_per_user: int = 20, months: int = 6, posts_per_lesson: int = 10,
+                 comments_per_post: int = 3, members_per_lesson: int = 10, items_per_lesson: int = 12,
+                 batch_users: int = 50, prefix: str = 'synthetic', seed: Optional[int] = None):
+        self.users = users
+        self.lessons_per_user = lessons_per_user
+        self.notes_per_lesson = notes_per_lesson
+        self.tasks_per_user = tasks_per_user
+        self.months = months
+        self.posts_per_lesson = posts_per_lesson
+        self.comments_per_post = comments_per_post
+        self.members_per_lesson = members_per_lesson
+        self.items_per_lesson = items_per_lesson
+        self.batch_users = max(1, batch_users)
+        self.prefix = prefix
+        self.random = random.Random(seed)
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.counts = {table: 0 for table in TABLE_ORDER}
+        self.user_ids: List[str] = []
+
+    def run(self) -> Dict[str, int]:
+        """Generate everything; returns rows written per table"""
+        from werkzeug.security import generate_password_hash
+
+        # Hashing is deliberately slow, so every synthetic user shares one hash
+        self.password_hash = generate_password_hash(SYNTHETIC_PASSWORD)
+        run_id = uuid.uuid4().hex[:6]
+
+        for start in range(0, self.users, self.batch_users):
+            rows = {table: [] for table in TABLE_ORDER}
+            batch = [self._user(rows, f"{self.prefix}_{run_id}_{index}")
+                     for index in range(start, min(start + self.batch_users, self.users))]
+            for user_id in batch:
+                self._user_content(rows, user_id, batch)
+            self._write(rows)
+            self.user_ids.extend(batch)
+
+        return dict(self.counts)
+
+    # ------------------------------------------------------------------
+    # Row builders
+    # ------------------------------------------------------------------
+
+    def _past(self, days: int) -> datetime:
+        return self.now - timedelta(days=self.random.uniform(0, days))
+
+    def _user(self, rows, username: str) -> str:
+        user_id = str(uuid.uuid4())
+        rows['user'].append({
+            'id': user_id,
+            'username': username,
+            'email': f"{username}@synthetic.local",
+            'password_hash': self.password_hash,
+            'first_name': username.split('_')[-1],
+            'last_name': 'Synthetic',
+            'role': 'student',
+            'created_at': self._past(self.months * 30)
+        })
+        return user_id
+
+    def _user_content(self, rows, user_id: str, batch: List[str]):
+        classmates = [other for other in batch if other != user_id]
+        lesson_ids = [self._lesson(rows, user_id, classmates) for _ in range(self.lessons_per_user)]
+        self._tasks(rows, user_id, lesson_ids)
+        self._pomodoro_sessions(rows, user_id, lesson_ids)
+
+    def _lesson(self, rows, user_id: str, classmates: List[str]) -> str:
+        lesson_id = str(uuid.uuid4())
+        subject = self.random.choice(SUBJECTS)
+        created_at = self._past(self.months * 30)
+        rows['lesson'].append({
+            'id': lesson_id,
+            'user_id': user_id,
+            'title': f"{subject} {self.random.randint(100, 499)}",
+            'description': f"Synthetic {subject.lower()} course",
+            'status': self.random.choice(['not_started', 'in_progress', 'completed']),
+            'progress_percentage': self.random.randint(0, 100),
+            'subject': subject,
+            'source_platform': 'manual',
+            'created_at': created_at
+        })
+
+        for _ in range(self.notes_per_lesson):
+            self._note(rows, user_id, lesson_id)
+
+        members = self.random.sample(classmates, min(self.members_per_lesson, len(classmates)))
+        for member_id in members:
+            rows['member'].append({
+                'id': str(uuid.uuid4()),
+                'lesson_id': lesson_id,
+                'user_id': member_id,
+                'role': 'viewer',
+                'invited_by': user_id,
+                'joined_at': created_at
+            })
+
+        authors = [user_id] + members
+        for _ in range(self.posts_per_lesson):
+            self._post(rows, lesson_id, authors)
+
+        self._grades(rows, lesson_id, members)
+        return lesson_id
+
+    def _note(self, rows, user_id: str, lesson_id: str):
+        note_id = str(uuid.uuid4())
+        words = self.random.randint(20, 400)
+        tags = self.random.sample(NOTE_TAGS, self.random.randint(0, 4))
+        rows['note'].append({
+            'id': note_id,
+            'user_id': user_id,
+            'lesson_id': lesson_id,
+            'title': f"Note {self.random.randint(1, 9999)}",
+            'content': ' '.join(self.random.choice(NOTE_TAGS) for _ in range(words)),
+            'note_type': 'text',
+            'tags': json.dumps(tags),
+            'status': self.random.choice(['pending', 'in-progress', 'completed']),
+            'word_count': words,
+            'created_at': self._past(self.months * 30)
+        })
+        # Bulk inserts skip the ORM events that maintain the tag index
+        rows['note_tag'].extend({'note_id': note_id, 'tag': tag, 'user_id': user_id} for tag in tags)
+        for index in range(self.random.choice([0, 0, 0, 1, 2])):
+            filename = f"{index}_attachment.pdf"
+            rows['note_file'].append({
+                'id': str(uuid.uuid4()),
+                'note_id': note_id,
+                'file_path': f"uploads/notes/{note_id}/{filename}",
+                'file_type': 'pdf',
+                'filename': filename,
+                'size': self.random.randint(10_000, 2_000_000),
+                'mime_type': 'application/pdf',
+                'created_at': self.now
+            })
+
+    def _tasks(self, rows, user_id: str, lesson_ids: List[str]):
+        for _ in range(self.tasks_per_user):
+            created_at = self._past(self.months * 30)
+            completed = self.random.random() < 0.6
+            rows['task'].append({
+                'id': str(uuid.uuid4()),
+                'user_id': user_id,
+                'lesson_id': self.random.choice(lesson_ids) if lesson_ids else None,
+                'title': f"Task {self.random.randint(1, 9999)}",
+                'description': 'Synthetic task',
+                'task_type': self.random.choice(['assignment', 'exam', 'project', 'other']),
+                'status': 'completed' if completed else self.random.choice(['pending', 'in_progress']),
+                'priority': self.random.choice(['low', 'medium', 'high']),
+                'due_date': created_at + timedelta(days=self.random.randint(1, 30)),
+                'completed_at': created_at + timedelta(days=self.random.uniform(0, 10)) if completed else None,
+                'created_at': created_at
+            })
+
+    def _pomodoro_sessions(self, rows, user_id: str, lesson_ids: List[str]):
+        # Sessions on about 70% of days, a few focus blocks each with breaks in between
+        for day in range(self.months * 30):
+            if self.random.random() > 0.7:
+                continue
+            start = (self.now - timedelta(days=day)).replace(hour=self.random.randint(7, 20), minute=0, second=0)
+            for _ in range(self.random.randint(1, 6)):
+                session_type = self.random.choice(['focus', 'focus', 'focus', 'short_break', 'long_break'])
+                duration = {'focus': 25, 'short_break': 5, 'long_break': 15}[session_type]
+                interrupted = self.random.random() < 0.1
+                actual = self.random.randint(1, duration) if interrupted else duration
+                rows['pomodoro_session'].append({
+                    'id': str(uuid.uuid4()),
+                    'user_id': user_id,
+                    'lesson_id': self.random.choice(lesson_ids) if lesson_ids else None,
+                    'session_type': session_type,
+                    'duration': duration,
+                    'actual_duration': actual,
+                    'start_time': start,
+                    'end_time': start + timedelta(minutes=actual),
+                    'status': 'interrupted' if interrupted else 'completed',
+                    'is_completed': not interrupted,
+                    'is_interrupted': interrupted,
+                    'interruption_count': 1 if interrupted else 0,
+                    'productivity_score': self.random.randint(1, 10),
+                    'created_at': start
+                })
+                start += timedelta(minutes=actual + 1)
+
+    def _post(self, rows, lesson_id: str, authors: List[str]):
+        post_id = str(uuid.uuid4())
+        created_at = self._past(self.months * 30)
+        rows['stream_post'].append({
+            'id': post_id,
+            'lesson_id': lesson_id,
+            'user_id': self.random.choice(authors),
+            'type': self.random.choice(['question', 'announcement', 'activity']),
+            'title': f"Post {self.random.randint(1, 9999)}",
+            'content': 'Synthetic discussion post',
+            'created_at': created_at
+        })
+        for _ in range(self.comments_per_post):
+            rows['stream_comment'].append({
+                'post_id': post_id,
+                'user_id': self.random.choice(authors),
+                'content': 'Synthetic reply',
+                'created_at': created_at + timedelta(hours=self.random.uniform(0, 48))
+            })
+
+    def _grades(self, rows, lesson_id: str, members: List[str]):
+        rows['grade_config'].append({
+            'id': str(uuid.uuid4()),
+            'lesson_id': lesson_id,
+            'grading_scale': json.dumps(GRADING_SCALE),
+            'show_class_average': True
+        })
+        category_ids = []
+        for index, (name, weight) in enumerate(GRADE_CATEGORIES):
+            category_id = str(uuid.uuid4())
+            category_ids.append(category_id)
+            rows['grade_category'].append({
+                'id': category_id,
+                'lesson_id': lesson_id,
+                'name': name,
+                'weight': weight,
+                'order_index': index
+            })
+
+        for index in range(self.items_per_lesson):
+            item_id = str(uuid.uuid4())
+            points = float(self.random.choice([10, 20, 50, 100]))
+            rows['grade_item'].append({
+                'id': item_id,
+                'lesson_id': lesson_id,
+                'category_id': category_ids[index % len(category_ids)],
+                'name': f"Item {index + 1}",
+                'points_possible': points,
+                'due_date': self._past(self.months * 30),
+                'is_published': True
+            })
+            for member_id in members:
+                rows['grade_entry'].append({
+                    'id': str(uuid.uuid4()),
+                    'user_id': member_id,
+                    'lesson_id': lesson_id,
+                    'grade_item_id': item_id,
+                    'score': round(points * self.random.uniform(0.4, 1.0), 2),
+                    'points_possible': points,
+                    'status': 'graded',
+                    'graded_at': self.now
+                })
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _write(self, rows):
+        """Insert one batch in foreign key order, chunked executemany per table, one commit"""
+        for table in TABLE_ORDER:
+            batch = rows[table]
+            statement = self._insert_statement(table, batch[0]) if batch else None
+            for start in range(0, len(batch), INSERT_CHUNK_SIZE):
+                db.session.execute(statement, batch[start:start + INSERT_CHUNK_SIZE])
+            self.counts[table] += len(batch)
+        db.session.commit()
+
+    @staticmethod
+    def _insert_statement(table: str, sample: Dict):
+        # Model tables go through Core so Python-side column defaults are applied
+        model_table = db.metadata.tables.get(table)
+        if model_table is not None:
+            return model_table.insert()
+        columns = list(sample)
+        return text(
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(':' + column for column in columns)})"
+        )
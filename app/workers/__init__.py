@@ -0,0 +1,4 @@
+"""
+Background workers that run off the request path.
+"""
+from .statistics_queue import statistics_queue, StatisticsRefreshQueue
@@ -0,0 +1,451 @@
+"""
+Asynchronous Pomodoro statistics refresh queue.
+
+Task and session writes hand their statistics work to this queue and return
+as soon as the primary row commits. A background thread applies the work
+after a short debounce window, coalescing repeated requests for the same
+(user, date) into one job.
+
+Modes (STATISTICS_QUEUE_MODE):
+    sync    apply inline in the request (used by tests)
+    thread  in-memory queue per process; merged counter deltas are applied in O(1)
+    sqlite  persistent queue in a local SQLite file shared by every worker process
+            on the host; jobs are idempotent full refreshes so they survive restarts
+"""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rows touched within this margin of a job's first enqueue may already contain
+# its changes (e.g. a read-path full recompute), so the job falls back to a
+# full refresh instead of applying its delta twice.
+STALE_ROW_MARGIN = timedelta(seconds=1)
+
+
+class RefreshJob:
+    """Coalesced statistics work for one (user, date)."""
+
+    __slots__ = ('user_id', 'day', 'delta', 'full', 'first_enqueued', 'last_enqueued', 'attempts', 'not_before')
+
+    def __init__(self, user_id: str, day: str, delta: Optional[Dict[str, int]] = None, full: bool = False,
+                 first_enqueued: float = 0.0, last_enqueued: float = 0.0, attempts: int = 0,
+                 not_before: float = 0.0):
+        self.user_id = user_id
+        self.day = day
+        self.delta = Counter(delta or {})
+        self.full = full
+        self.first_enqueued = first_enqueued
+        self.last_enqueued = last_enqueued
+        self.attempts = attempts
+        self.not_before = not_before
+
+    @property
+    def target_date(self) -> date:
+        return date.fromisoformat(self.day)
+
+    def due_at(self, debounce: float, max_delay: float) -> float:
+        return max(self.not_before, min(self.last_enqueued + debounce, self.first_enqueued + max_delay))
+
+
+class MemoryRefreshStore:
+    """Process-local job store."""
+
+    persistent = False
+
+    def __init__(self):
+        self._jobs: Dict[Tuple[str, str], RefreshJob] = {}
+        self._lock = threading.Lock()
+
+    def add(self, user_id: str, day: str, delta: Dict[str, int], full: bool, now: float) -> bool:
+        with self._lock:
+            job = self._jobs.get((user_id, day))
+            if job is None:
+                self._jobs[(user_id, day)] = RefreshJob(user_id, day, delta, full, now, now)
+                return False
+            job.delta.update(delta)
+            job.full = job.full or full
+            job.last_enqueued = now
+            return True
+
+    def claim_due(self, now: float, debounce: float, max_delay: float,
+                  due_by: Optional[float] = None) -> List[RefreshJob]:
+        due_by = now if due_by is None else due_by
+        with self._lock:
+            due = [job for job in self._jobs.values() if job.due_at(debounce, max_delay) <= due_by]
+            for job in due:
+                del self._jobs[(job.user_id, job.day)]
+            return due
+
+    def complete(self, job: RefreshJob) -> None:
+        pass  # Claimed jobs are already removed
+
+    def retry(self, job: RefreshJob, not_before: float) -> None:
+        with self._lock:
+            pending = self._jobs.get((job.user_id, job.day))
+            if pending is not None:
+                pending.full = True
+                pending.first_enqueued = min(pending.first_enqueued, job.first_enqueued)
+                pending.attempts = max(pending.attempts, job.attempts + 1)
+                return
+            job.full = True
+            job.attempts += 1
+            job.not_before = not_before
+            self._jobs[(job.user_id, job.day)] = job
+
+    def next_due(self, debounce: float, max_delay: float) -> Optional[float]:
+        with self._lock:
+            if not self._jobs:
+                return None
+            return min(job.due_at(debounce, max_delay) for job in self._jobs.values())
+
+    def depth(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def oldest_enqueued(self) -> Optional[float]:
+        with self._lock:
+            if not self._jobs:
+                return None
+            return min(job.first_enqueued for job in self._jobs.values())
+
+
+class SQLiteRefreshStore:
+    """Persistent job store in a local SQLite file, shared across processes."""
+
+    persistent = True
+    CLAIM_TIMEOUT = 120.0  # seconds before a crashed worker's claim is released
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS statistics_refresh_queue (
+                user_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                first_enqueued REAL NOT NULL,
+                last_enqueued REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                not_before REAL NOT NULL DEFAULT 0,
+                claimed_by TEXT,
+                claimed_at REAL,
+                PRIMARY KEY (user_id, day)
+            )
+        """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def add(self, user_id: str, day: str, delta: Dict[str, int], full: bool, now: float) -> bool:
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO statistics_refresh_queue (user_id, day, first_enqueued, last_enqueued) "
+                "VALUES (?, ?, ?, ?)",
+                (user_id, day, now, now)
+            ).rowcount
+            if not inserted:
+                conn.execute(
+                    "UPDATE statistics_refresh_queue SET last_enqueued = ? WHERE user_id = ? AND day = ?",
+                    (now, user_id, day)
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return not inserted
+
+    def claim_due(self, now: float, debounce: float, max_delay: float,
+                  due_by: Optional[float] = None) -> List[RefreshJob]:
+        due_by = now if due_by is None else due_by
+        conn = self._connect()
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                "SELECT user_id, day, first_enqueued, last_enqueued, attempts FROM statistics_refresh_queue "
+                "WHERE (claimed_at IS NULL OR claimed_at < ?) "
+                "AND MAX(not_before, MIN(last_enqueued + ?, first_enqueued + ?)) <= ?",
+                (now - self.CLAIM_TIMEOUT, debounce, max_delay, due_by)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE statistics_refresh_queue SET claimed_by = ?, claimed_at = ? WHERE user_id = ? AND day = ?",
+                [(owner, now, user_id, day) for user_id, day, *_ in rows]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [
+            RefreshJob(user_id, day, full=True, first_enqueued=first, last_enqueued=last, attempts=attempts)
+            for user_id, day, first, last, attempts in rows
+        ]
+
+    def complete(self, job: RefreshJob) -> None:
+        conn = self._connect()
+        # Keep the row if it was re-enqueued while this job was running
+        conn.execute(
+            "DELETE FROM statistics_refresh_queue WHERE user_id = ? AND day = ? AND last_enqueued <= ?",
+            (job.user_id, job.day, job.last_enqueued)
+        )
+        conn.execute(
+            "UPDATE statistics_refresh_queue SET claimed_by = NULL, claimed_at = NULL WHERE user_id = ? AND day = ?",
+            (job.user_id, job.day)
+        )
+
+    def retry(self, job: RefreshJob, not_before: float) -> None:
+        self._connect().execute(
+            "UPDATE statistics_refresh_queue SET attempts = attempts + 1, not_before = ?, "
+            "claimed_by = NULL, claimed_at = NULL WHERE user_id = ? AND day = ?",
+            (not_before, job.user_id, job.day)
+        )
+
+    def next_due(self, debounce: float, max_delay: float) -> Optional[float]:
+        return self._connect().execute(
+            "SELECT MIN(MAX(not_before, MIN(last_enqueued + ?, first_enqueued + ?))) "
+            "FROM statistics_refresh_queue WHERE claimed_at IS NULL",
+            (debounce, max_delay)
+        ).fetchone()[0]
+
+    def depth(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM statistics_refresh_queue").fetchone()[0]
+
+    def oldest_enqueued(self) -> Optional[float]:
+        return self._connect().execute(
+            "SELECT MIN(first_enqueued) FROM statistics_refresh_queue"
+        ).fetchone()[0]
+
+
+class StatisticsRefreshQueue:
+    """Debounced, coalescing background queue for daily statistics updates."""
+
+    POLL_INTERVAL = 1.0  # seconds; also picks up jobs enqueued by other processes
+    RETRY_BACKOFF = 5.0  # seconds, multiplied by the attempt number
+
+    def __init__(self):
+        self.app = None
+        self.mode = 'sync'
+        self.debounce = 2.0
+        self.max_delay = 10.0
+        self.max_attempts = 5
+        self._store = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._wakeup = threading.Event()
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._stopping = False
+        self._atexit_registered = False
+        self._counters = Counter()
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+        self._last_error: Optional[str] = None
+
+    def init_app(self, app) -> None:
+        """
+        Configure the queue from app config.
+
+        Args:
+            app: Flask application instance
+        """
+        self.app = app
+        self.mode = app.config.get('STATISTICS_QUEUE_MODE', 'sync')
+        self.debounce = float(app.config.get('STATISTICS_QUEUE_DEBOUNCE', 2.0))
+        self.max_delay = float(app.config.get('STATISTICS_QUEUE_MAX_DELAY', 10.0))
+        self.max_attempts = int(app.config.get('STATISTICS_QUEUE_MAX_ATTEMPTS', 5))
+
+        if self.mode == 'thread':
+            self._store = MemoryRefreshStore()
+        elif self.mode == 'sqlite':
+            path = app.config.get('STATISTICS_QUEUE_PATH') or os.path.join(
+                app.instance_path, 'statistics_queue.db'
+            )
+            self._store = SQLiteRefreshStore(path)
+        else:
+            self._store = None
+
+        if self._store is not None and not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+
+    @property
+    def enabled(self) -> bool:
+        return self._store is not None
+
+    def submit(self, changes: Iterable[Tuple[str, date, Dict[str, int]]]) -> None:
+        """
+        Queue statistics deltas; applies them inline when the queue is disabled.
+
+        Args:
+            changes: (user_id, date, counter delta) tuples
+        """
+        changes = [(user_id, day, delta) for user_id, day, delta in changes if any(delta.values())]
+        if not changes:
+            return
+
+        if not self.enabled:
+            from app.services import PomodoroSessionService
+            service = PomodoroSessionService()
+            for user_id, day, delta in changes:
+                service.apply_statistics_delta(user_id, day, delta)
+            return
+
+        now = time.time()
+        for user_id, day, delta in changes:
+            coalesced = self._store.add(user_id, day.isoformat(), delta, self._store.persistent, now)
+            with self._metrics_lock:
+                self._counters['enqueued'] += 1
+                if coalesced:
+                    self._counters['coalesced'] += 1
+
+        self._ensure_worker()
+        self._wakeup.set()
+
+    def drain_due(self, force: bool = False) -> int:
+        """Process every job that is due (or every job when forced); returns jobs processed."""
+        if not self.enabled:
+            return 0
+
+        debounce = 0.0 if force else self.debounce
+        max_delay = 0.0 if force else self.max_delay
+        now = time.time()
+        # Forced drains also skip retry backoff
+        due_by = float('inf') if force else now
+        jobs = self._store.claim_due(now, debounce, max_delay, due_by)
+        if not jobs:
+            return 0
+
+        with self.app.app_context():
+            for job in jobs:
+                self._process(job)
+        return len(jobs)
+
+    def flush(self) -> None:
+        """Synchronously process everything still queued."""
+        while self.drain_due(force=True):
+            pass
+
+    def shutdown(self) -> None:
+        """Stop the worker thread and flush pending work."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout=5)
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush statistics queue on shutdown")
+
+    def metrics(self) -> Dict[str, object]:
+        """Queue depth, lag and throughput counters for monitoring."""
+        depth = self._store.depth() if self.enabled else 0
+        oldest = self._store.oldest_enqueued() if self.enabled else None
+        with self._metrics_lock:
+            return {
+                'mode': self.mode,
+                'depth': depth,
+                'oldest_lag_seconds': round(time.time() - oldest, 3) if oldest else 0.0,
+                'last_lag_seconds': round(self._last_lag, 3),
+                'max_lag_seconds': round(self._max_lag, 3),
+                'enqueued': self._counters['enqueued'],
+                'coalesced': self._counters['coalesced'],
+                'processed': self._counters['processed'],
+                'retried': self._counters['retried'],
+                'dropped': self._counters['dropped'],
+                'worker_alive': bool(self._thread and self._thread.is_alive() and self._pid == os.getpid()),
+                'last_error': self._last_error
+            }
+
+    # ------------------------------------------------------------------
+    # INTERNAL HELPERS
+    # ------------------------------------------------------------------
+    def _ensure_worker(self) -> None:
+        # Threads do not survive fork, so pre-forked workers start their own
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stopping = False
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='statistics-refresh', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                if self.drain_due():
+                    continue
+                next_due = self._store.next_due(self.debounce, self.max_delay)
+            except Exception:
+                logger.exception("Statistics queue worker iteration failed")
+                next_due = None
+
+            timeout = self.POLL_INTERVAL
+            if next_due is not None:
+                timeout = min(max(next_due - time.time(), 0.05), self.POLL_INTERVAL)
+            self._wakeup.wait(timeout)
+
+    def _process(self, job: RefreshJob) -> None:
+        from app import db
+        from app.models.pomodoro_statistics import PomodoroStatisticsModel
+        from app.services import PomodoroSessionService
+
+        service = PomodoroSessionService()
+        try:
+            full = job.full
+            if not full:
+                stats = PomodoroStatisticsModel.query.filter_by(
+                    user_id=job.user_id,
+                    date=job.target_date
+                ).first()
+                enqueued_at = datetime.utcfromtimestamp(job.first_enqueued) - STALE_ROW_MARGIN
+                full = stats is not None and stats.updated_at is not None and stats.updated_at >= enqueued_at
+
+            if full:
+                service.recalculate_daily_statistics(job.user_id, job.target_date)
+            else:
+                service.apply_statistics_delta(job.user_id, job.target_date, dict(job.delta))
+
+            self._store.complete(job)
+            lag = time.time() - job.first_enqueued
+            with self._metrics_lock:
+                self._counters['processed'] += 1
+                self._last_lag = lag
+                self._max_lag = max(self._max_lag, lag)
+        except Exception as exc:
+            db.session.rollback()
+            logger.exception("Statistics refresh failed for user %s on %s", job.user_id, job.day)
+            with self._metrics_lock:
+                self._last_error = str(exc)
+            if job.attempts + 1 >= self.max_attempts:
+                self._store.complete(job)
+                with self._metrics_lock:
+                    self._counters['dropped'] += 1
+            else:
+                self._store.retry(job, time.time() + self.RETRY_BACKOFF * (job.attempts + 1))
+                with self._metrics_lock:
+                    self._counters['retried'] += 1
+
+
+# Process-level queue configured in create_app
+statistics_queue = StatisticsRefreshQueue()
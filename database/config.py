@@ -23,8 +23,12 @@ class DatabaseConfig:
     POOL_TIMEOUT = 30
     POOL_RECYCLE = 3600
     
-    # Backup settings
-    BACKUP_RETENTION_DAYS = 30
+    # Backup settings (see app/utils/sqlite_backup.py)
+    BACKUP_RETENTION_DAYS = int(os.environ.get('BACKUP_RETENTION_DAYS', 30))
+    BACKUP_KEEP_MIN = int(os.environ.get('BACKUP_KEEP_MIN', 3))  # newest snapshots kept regardless of age
+    BACKUP_COMPRESS = os.environ.get('BACKUP_COMPRESS', 'false').lower() == 'true'
+    BACKUP_PAGES_PER_STEP = 256  # pages per online-backup step (rollback-journal databases)
+    BACKUP_STEP_PAUSE = 0.01  # seconds between steps, when writers can take the lock
     AUTO_BACKUP = True
     
     @classmethod
@@ -3,10 +3,10 @@ from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
 import logging
+import os
 from pathlib import Path
 from .config import DatabaseConfig
 from .models import Base
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +63,11 @@ class DatabaseManager:
                     echo=False
                 )
             
+            # Per-request query counts/timings (see app/middleware/query_instrumentation.py)
+            if os.environ.get('SQL_INSTRUMENTATION', 'false').lower() == 'true':
+                from app.middleware.query_instrumentation import instrument_engine
+                instrument_engine(self.engine, label='manager')
+            
             # Create session factory
             self.session_factory = sessionmaker(bind=self.engine)
             self.Session = scoped_session(self.session_factory)
@@ -156,24 +161,47 @@ class DatabaseManager:
             logger.error(f"Failed to get database info: {e}")
             return {'error': str(e)}
     
-    def backup_database(self, backup_path=None):
-        """Create database backup"""
+    def backup_database(self, backup_path=None, compress=None, verify=True):
+        """
+        Create an online backup, verified with PRAGMA integrity_check.
+
+        Without backup_path a rotating snapshot is written to BACKUP_DIR and
+        snapshots older than BACKUP_RETENTION_DAYS are pruned afterwards.
+        Returns the backup path, or None when the backup failed.
+        """
+        from app.utils import sqlite_backup as backup
+
+        compress = self.config.BACKUP_COMPRESS if compress is None else compress
+        options = dict(compress=compress, verify=verify,
+                       pages=self.config.BACKUP_PAGES_PER_STEP, pause=self.config.BACKUP_STEP_PAUSE)
         try:
-            if not backup_path:
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                backup_path = self.config.BACKUP_DIR / f"backup_{timestamp}.db"
-            
-            # For SQLite, just copy the file
-            import shutil
-            shutil.copy2(self.config.DATABASE_PATH, backup_path)
-            
-            logger.info(f"Database backup created: {backup_path}")
-            return str(backup_path)
+            if backup_path:
+                path = backup.backup_to(self.config.DATABASE_PATH, backup_path, **options)
+            else:
+                path = backup.create_snapshot(self.config.DATABASE_PATH, self.config.BACKUP_DIR, **options)
+                self.prune_backups()
+            return str(path)
             
         except Exception as e:
             logger.error(f"Failed to create database backup: {e}")
             return None
     
+    def prune_backups(self, dry_run=False):
+        """Remove snapshots older than BACKUP_RETENTION_DAYS (keeps the newest BACKUP_KEEP_MIN)"""
+        from app.utils import sqlite_backup as backup
+
+        return backup.prune_snapshots(self.config.BACKUP_DIR, self.config.BACKUP_RETENTION_DAYS,
+                                      keep_min=self.config.BACKUP_KEEP_MIN, dry_run=dry_run)
+    
+    def verify_backup(self, backup_path):
+        """Run PRAGMA integrity_check on a backup; returns True when it is sound"""
+        from app.utils import sqlite_backup as backup
+
+        problems = backup.check_integrity(backup_path)
+        for problem in problems[:10]:
+            logger.error(f"Backup {backup_path}: {problem}")
+        return not problems
+    
     def close(self):
         """Close database connections"""
         try:
@@ -169,14 +169,46 @@ def create_complete_database_schema():
             CREATE TABLE IF NOT EXISTS note_file (
                 id TEXT PRIMARY KEY,
                 note_id TEXT NOT NULL,
-                file_path TEXT NOT NULL,
-                file_type TEXT,
+                file_path TEXT NOT NULL,              -- path ใต้ static/ (uploads/notes/<note_id>/<ชื่อไฟล์>)
+                file_type TEXT,                       -- image, pdf, document
+                filename TEXT,                        -- ชื่อไฟล์บนดิสก์
+                size INTEGER,                         -- ขนาด (bytes)
+                mime_type TEXT,
+                sha256 TEXT,                          -- hash ของเนื้อไฟล์ (ใช้ตรวจ drift)
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (note_id) REFERENCES note(id) ON DELETE CASCADE
             )
         """)
+        
+        # ฐานข้อมูลเก่าที่มี note_file แบบไม่มี metadata
+        for column_sql in [
+            "ALTER TABLE note_file ADD COLUMN filename TEXT",
+            "ALTER TABLE note_file ADD COLUMN size INTEGER",
+            "ALTER TABLE note_file ADD COLUMN mime_type TEXT",
+            "ALTER TABLE note_file ADD COLUMN sha256 TEXT"
+        ]:
+            try:
+                cursor.execute(column_sql)
+            except sqlite3.OperationalError as e:
+                if "duplicate column name" not in str(e):
+                    print(f"   Warning: {e}")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_note_file_note_id ON note_file(note_id)")
         print("✅ Created note_file table")
         
+        # 4.1 Note tag index (หนึ่งแถวต่อ note+tag, sync จาก note.tags ผ่าน ORM events)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS note_tag (
+                note_id TEXT NOT NULL,                -- note ที่ติด tag
+                tag TEXT NOT NULL,                    -- ชื่อ tag
+                user_id TEXT NOT NULL,                -- เจ้าของ note (ค้นหา tag ต่อผู้ใช้)
+                PRIMARY KEY (note_id, tag),
+                FOREIGN KEY (note_id) REFERENCES note(id) ON DELETE CASCADE,
+                FOREIGN KEY (user_id) REFERENCES user(id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_note_tag_user_tag ON note_tag(user_id, tag)")
+        print("✅ Created note_tag table")
+        
         # 5. Create task table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS task (
@@ -422,8 +454,66 @@ def create_complete_database_schema():
             )
         """)
 
+        # ตารางสรุป streak ต่อผู้ใช้ (อัปเดตแบบ incremental จากสถิติรายวัน)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS pomodoro_streak (
+                id TEXT PRIMARY KEY,                  -- UUID ของแถวสรุป
+                user_id TEXT UNIQUE NOT NULL,         -- อ้างอิงผู้ใช้ (หนึ่งแถวต่อผู้ใช้)
+                current_streak INTEGER DEFAULT 0,     -- จำนวนวันติดต่อกันล่าสุด
+                longest_streak INTEGER DEFAULT 0,     -- จำนวนวันติดต่อกันสูงสุด
+                last_active_date DATE,                -- วันล่าสุดที่มี session สำเร็จ
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES user(id) ON DELETE CASCADE
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_pomodoro_statistics_user_date ON pomodoro_statistics(user_id, date)"
+        )
+
         print("✅ Created pomodoro tables")
         
+        # 12.5 Google Classroom import/sync progress
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS classroom_sync_state (
+                id TEXT PRIMARY KEY,                  -- UUID ของแถวสถานะ
+                lesson_id TEXT NOT NULL,              -- บทเรียนที่นำเข้าข้อมูล
+                user_id TEXT NOT NULL,                -- ผู้ใช้ที่นำเข้า
+                course_id TEXT NOT NULL,              -- Google Classroom course ID
+                resource TEXT NOT NULL,               -- courseWork, courseWorkMaterials, announcements
+                status TEXT DEFAULT 'pending',        -- pending, in_progress, completed, failed
+                page_token TEXT,                      -- หน้าถัดไปที่ต้องดึง (สำหรับนำเข้าต่อ)
+                pages_done INTEGER DEFAULT 0,         -- จำนวนหน้าที่นำเข้าแล้ว
+                items_imported INTEGER DEFAULT 0,     -- จำนวนรายการที่นำเข้าแล้ว
+                last_error TEXT,                      -- ข้อผิดพลาดล่าสุด
+                watermark TIMESTAMP,                  -- updateTime ล่าสุดที่ซิงค์แล้ว (สำหรับ delta sync)
+                last_synced_at TIMESTAMP,             -- เวลาที่ซิงค์สำเร็จล่าสุด
+                items_deleted INTEGER DEFAULT 0,      -- จำนวนรายการที่ถูกลบตาม Google Classroom
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (lesson_id) REFERENCES lesson(id) ON DELETE CASCADE,
+                FOREIGN KEY (user_id) REFERENCES user(id),
+                UNIQUE(lesson_id, resource)
+            )
+        """)
+        print("✅ Created classroom_sync_state table")
+        
+        # Add delta sync columns to classroom_sync_state if they don't exist
+        classroom_sync_columns = [
+            "ALTER TABLE classroom_sync_state ADD COLUMN watermark TIMESTAMP",
+            "ALTER TABLE classroom_sync_state ADD COLUMN last_synced_at TIMESTAMP",
+            "ALTER TABLE classroom_sync_state ADD COLUMN items_deleted INTEGER DEFAULT 0"
+        ]
+        
+        for column_sql in classroom_sync_columns:
+            try:
+                cursor.execute(column_sql)
+            except sqlite3.OperationalError as e:
+                if "duplicate column name" in str(e):
+                    print(f"   Classroom sync column already exists, skipping...")
+                else:
+                    print(f"   Warning: {e}")
+        
         # 13. Create classwork tables
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS classwork_task (
@@ -682,6 +772,8 @@ def create_complete_database_schema():
                 is_passing BOOLEAN DEFAULT 1,
                 points_to_pass REAL,
                 points_to_next_grade TEXT,
+                summary_data TEXT,
+                is_stale BOOLEAN DEFAULT 1,
                 last_calculated TIMESTAMP,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -692,6 +784,21 @@ def create_complete_database_schema():
         """)
         print("✅ Created grade_summary table")
         
+        # Add cache columns to grade_summary table if they don't exist
+        grade_summary_columns = [
+            "ALTER TABLE grade_summary ADD COLUMN summary_data TEXT",
+            "ALTER TABLE grade_summary ADD COLUMN is_stale BOOLEAN DEFAULT 1"
+        ]
+        
+        for column_sql in grade_summary_columns:
+            try:
+                cursor.execute(column_sql)
+            except sqlite3.OperationalError as e:
+                if "duplicate column name" in str(e):
+                    print(f"   Grade summary column already exists, skipping...")
+                else:
+                    print(f"   Warning: {e}")
+        
         # 16.6 Create Grade System Indexes
         grade_indexes = [
             "CREATE INDEX IF NOT EXISTS idx_grade_config_lesson ON grade_config(lesson_id)",
@@ -0,0 +1,104 @@
+"""
+Gunicorn configuration for production
+Used by start.py; can also be run directly with `gunicorn -c gunicorn.conf.py wsgi:app`
+
+Workers are threaded (gthread) processes. Each setting can be overridden
+from the environment:
+
+    WEB_CONCURRENCY               worker processes (default: 2 x CPUs + 1, at most GUNICORN_MAX_WORKERS)
+    GUNICORN_MAX_WORKERS          cap for the CPU-based default (default: 8)
+    GUNICORN_THREADS              threads per worker (default: 4)
+    GUNICORN_PRELOAD              create the app once in the master before forking (default: true)
+    GUNICORN_TIMEOUT              seconds before a silent worker is killed (default: 60)
+    GUNICORN_GRACEFUL_TIMEOUT     seconds workers get to finish requests on reload/stop (default: 30)
+    GUNICORN_KEEPALIVE            seconds to keep idle client connections open (default: 5)
+    GUNICORN_MAX_REQUESTS         recycle a worker after this many requests, 0 = never (default: 1000)
+    GUNICORN_MAX_REQUESTS_JITTER  random extra requests so workers do not recycle together (default: 100)
+    GUNICORN_ACCESS_LOG           access log file, '-' for stdout, empty to disable (default: -)
+    HOST, PORT                    bind address (default: 0.0.0.0:8000)
+
+Anything else can be passed through GUNICORN_CMD_ARGS.
+
+Graceful reload: `kill -HUP <master pid>` starts fresh workers and lets the
+old ones finish their requests. With preload the application code lives in
+the master, so deploying new code needs a restart (or `kill -USR2` followed
+by `kill -QUIT` of the old master).
+"""
+
+import multiprocessing
+import os
+import sys
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value in (None, ''):
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def _cpu_count():
+    # CPUs this process may run on, not every CPU of the host
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+def default_workers():
+    return max(1, min(2 * _cpu_count() + 1, _env_int('GUNICORN_MAX_WORKERS', 8)))
+
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{_env_int('PORT', 8000)}"
+
+workers = _env_int('WEB_CONCURRENCY', default_workers())
+threads = _env_int('GUNICORN_THREADS', 4)
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+preload_app = _env_bool('GUNICORN_PRELOAD', True)
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# Heartbeat files on tmpfs; a disk-backed /tmp can stall workers in containers
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None  # empty disables it
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
+
+
+def when_ready(server):
+    server.log.info(f"Serving {bind} with {workers} workers x {threads} threads "
+                    f"({worker_class}, preload={'on' if preload_app else 'off'})")
+
+
+def post_fork(server, worker):
+    """
+    Drop database connections inherited from the master.
+
+    With preload, create_app() ran in the master (startup work such as the
+    search index opens connections); sharing those sockets/file handles
+    across processes corrupts them, so each worker starts with empty pools.
+    """
+    wsgi = sys.modules.get('wsgi')
+    if wsgi is None:
+        return
+
+    from app import db
+
+    with wsgi.app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    database_manager = sys.modules.get('database.manager')
+    if database_manager is not None and database_manager.db_manager is not None:
+        database_manager.db_manager.engine.dispose(close=False)
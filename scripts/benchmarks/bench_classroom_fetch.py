@@ -0,0 +1,112 @@
+"""
+Google Classroom Fetch Benchmark
+Times GoogleClassroomService.fetch_courses against a local fake Classroom API
+
+The fake transport answers courses/students/courseWork/announcements/
+courseWorkMaterials list calls from generated data after a fixed simulated
+round-trip latency, so serial vs concurrent detail fetching can be compared
+without network access or Google credentials. The Classroom discovery
+document comes from the static copy bundled with google-api-python-client.
+
+Usage:
+    python scripts/benchmarks/bench_classroom_fetch.py [--courses 30] [--latency-ms 80] [--workers 8]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app', 'services')))
+
+# Importing the app package loads the configuration, which needs these
+_db_dir = tempfile.mkdtemp(prefix='bench_classroom_fetch_')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'site.db')}")
+os.environ.setdefault('FLASK_SECRET_KEY', 'bench-classroom-fetch-secret-key-0123456789abcdef')
+
+import httplib2
+
+
+class FakeClassroomHttp:
+    """Minimal httplib2.Http stand-in serving generated Classroom list responses."""
+
+    ITEMS_PER_LIST = {
+        'students': 25,
+        'courseWork': 12,
+        'announcements': 8,
+        'courseWorkMaterials': 5
+    }
+    RESPONSE_KEYS = {
+        'students': 'students',
+        'courseWork': 'courseWork',
+        'announcements': 'announcements',
+        'courseWorkMaterials': 'courseWorkMaterial'
+    }
+
+    def __init__(self, courses: int, latency: float):
+        self.courses = courses
+        self.latency = latency
+        self.calls = 0
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
+        self.calls += 1
+        time.sleep(self.latency)
+
+        path = uri.split('?', 1)[0]
+        match = re.search(r'/v1/courses/([^/]+)/(\w+)$', path)
+        if match:
+            course_id, resource = match.groups()
+            items = [{'id': f'{course_id}-{resource}-{index}'} for index in range(self.ITEMS_PER_LIST.get(resource, 0))]
+            payload = {self.RESPONSE_KEYS.get(resource, resource): items}
+        elif path.endswith('/v1/courses'):
+            payload = {'courses': [
+                {'id': f'course-{index}', 'name': f'Course {index}', 'courseState': 'ACTIVE'}
+                for index in range(self.courses)
+            ]}
+        else:
+            return httplib2.Response({'status': '404'}), b'{}'
+
+        return httplib2.Response({'status': '200', 'content-type': 'application/json'}), json.dumps(payload).encode()
+
+
+def run(courses: int, latency: float, workers: int):
+    from google_classroom_service import GoogleClassroomService
+
+    transports = []
+
+    def http_factory(credentials):
+        http = FakeClassroomHttp(courses, latency)
+        transports.append(http)
+        return http
+
+    service = GoogleClassroomService(http_factory=http_factory, max_workers=workers)
+    started = time.perf_counter()
+    result = service.fetch_courses('bench-user', credentials=object())
+    elapsed = (time.perf_counter() - started) * 1000
+    calls = sum(http.calls for http in transports)
+    return result, elapsed, calls, service.last_timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--courses', type=int, default=30)
+    parser.add_argument('--latency-ms', type=float, default=80)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    serial, serial_ms, serial_calls, serial_timings = run(args.courses, latency, 1)
+    concurrent, concurrent_ms, concurrent_calls, concurrent_timings = run(args.courses, latency, args.workers)
+
+    assert serial == concurrent, "concurrent fetch returned different results"
+    print(f"serial      ({serial_calls} calls): {serial_ms:.0f} ms  {serial_timings}")
+    print(f"{args.workers} workers ({concurrent_calls} calls): {concurrent_ms:.0f} ms  {concurrent_timings}")
+    print(f"speedup: {serial_ms / concurrent_ms:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
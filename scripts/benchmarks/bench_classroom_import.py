@@ -0,0 +1,234 @@
+"""
+Google Classroom Import Benchmark
+Times ClassroomImporter imports of one course into two lessons and checks they stay apart
+
+Builds a throwaway SQLite database with database/setup_database.py and a fake
+in-process Classroom service serving --items coursework, materials and
+announcements in pages of --page-size. Two users each import the same course
+into their own lesson, then the second user delta-syncs after one coursework
+item is deleted in Google Classroom. Reports the time and pages of each run.
+
+Exits non-zero when a lesson ends up with another lesson's rows, is missing
+its own, or when one lesson's sync changes the other lesson's rows.
+
+Usage:
+    python scripts/benchmarks/bench_classroom_import.py [--items 250] [--page-size 100]
+"""
+
+import argparse
+import os
+import runpy
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'app', 'services'))
+
+_db_dir = tempfile.mkdtemp(prefix='bench_classroom_import_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'instance', 'site.db')}"
+os.environ.setdefault('FLASK_SECRET_KEY', 'bench-classroom-import-secret-key-0123456789abcd')
+
+from sqlalchemy import text
+
+from app import create_app, db
+
+COURSE_ID = 'course-42'
+TABLES = {
+    'courseWork': 'classwork_task',
+    'courseWorkMaterials': 'classwork_material',
+    'announcements': 'stream_post'
+}
+
+
+class FakeListCall:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class FakeCollection:
+    """One Classroom list collection, paginated like the real API"""
+
+    def __init__(self, course, resource):
+        self.course = course
+        self.resource = resource
+
+    def list(self, courseId, pageSize, pageToken=None, orderBy=None, **states):
+        items = self.course.items(self.resource, include_deleted=any('DELETED' in s for s in states.values()))
+        if orderBy == 'updateTime desc':
+            items.sort(key=lambda item: item['updateTime'], reverse=True)
+        start = int(pageToken or 0)
+        response = {self.course.RESPONSE_KEYS[self.resource]: items[start:start + pageSize]}
+        if start + pageSize < len(items):
+            response['nextPageToken'] = str(start + pageSize)
+        self.course.pages += 1
+        return FakeListCall(response)
+
+
+class FakeCourses:
+    def __init__(self, course):
+        self.course = course
+
+    def courseWork(self):
+        return FakeCollection(self.course, 'courseWork')
+
+    def courseWorkMaterials(self):
+        return FakeCollection(self.course, 'courseWorkMaterials')
+
+    def announcements(self):
+        return FakeCollection(self.course, 'announcements')
+
+
+class FakeClassroomService:
+    """Stand-in for a built Classroom client holding one generated course"""
+
+    RESPONSE_KEYS = {
+        'courseWork': 'courseWork',
+        'courseWorkMaterials': 'courseWorkMaterial',
+        'announcements': 'announcements'
+    }
+
+    def __init__(self, items: int):
+        created = (datetime.utcnow() - timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        self.count = items
+        self.created = created
+        self.deleted = {}
+        self.pages = 0
+
+    def courses(self):
+        return FakeCourses(self)
+
+    def items(self, resource, include_deleted=False):
+        items = []
+        for i in range(self.count):
+            item_id = f"{resource}-{i}"
+            item = {
+                'id': item_id,
+                'title': f"{resource} {i}",
+                'description': 'Imported item',
+                'text': f"Announcement {i}",
+                'alternateLink': f"https://classroom.google.com/c/{COURSE_ID}/{item_id}",
+                'creationTime': self.created,
+                'updateTime': self.created
+            }
+            if item_id in self.deleted:
+                if not include_deleted:
+                    continue
+                item.update(state='DELETED', updateTime=self.deleted[item_id])
+            items.append(item)
+        return items
+
+    def delete(self, item_id):
+        self.deleted[item_id] = (datetime.utcnow() + timedelta(seconds=1)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def create_database():
+    """The application schema, as database/setup_database.py creates it"""
+    setup = runpy.run_path(os.path.join(ROOT, 'database', 'setup_database.py'))
+    cwd = os.getcwd()
+    os.chdir(_db_dir)
+    try:
+        setup['create_complete_database_schema']()
+    finally:
+        os.chdir(cwd)
+
+
+def create_lesson(name):
+    """A user and a lesson of theirs to import into"""
+    user_id, lesson_id = str(uuid.uuid4()), str(uuid.uuid4())
+    db.session.execute(
+        text("INSERT INTO user (id, username, email, password_hash) VALUES (:id, :name, :email, 'x')"),
+        {'id': user_id, 'name': name, 'email': f"{name}@example.com"}
+    )
+    db.session.execute(
+        text("INSERT INTO lesson (id, user_id, title) VALUES (:id, :user_id, :title)"),
+        {'id': lesson_id, 'user_id': user_id, 'title': f"{name}'s {COURSE_ID}"}
+    )
+    db.session.commit()
+    return user_id, lesson_id
+
+
+def lesson_rows(lesson_id):
+    """{resource: {row id: (user_id, title or content)}} for one lesson"""
+    rows = {}
+    for resource, table in TABLES.items():
+        column = 'content' if table == 'stream_post' else 'title'
+        rows[resource] = {
+            row.id: (str(row.user_id), getattr(row, column))
+            for row in db.session.execute(
+                text(f"SELECT id, user_id, {column} FROM {table} WHERE lesson_id = :lesson_id"),
+                {'lesson_id': lesson_id}
+            )
+        }
+    return rows
+
+
+def timed(label, service, call):
+    service.pages = 0
+    started = time.perf_counter()
+    results = call()
+    elapsed = time.perf_counter() - started
+    counts = ', '.join(f"{resource} {state['items_imported']}" for resource, state in results.items())
+    print(f"{label:<14} {elapsed:>7.2f}s {service.pages:>5} pages  ({counts})")
+    return results
+
+
+def check_lesson(name, rows, user_id, expected, failures):
+    for resource, count in expected.items():
+        owned = rows[resource]
+        if len(owned) != count:
+            failures.append(f"{name}'s lesson has {len(owned)} {resource} rows, expected {count}")
+        if any(owner != user_id for owner, _ in owned.values()):
+            failures.append(f"{name}'s lesson has {resource} rows owned by another user")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=250, help='Items per resource in the course')
+    parser.add_argument('--page-size', type=int, default=100)
+    args = parser.parse_args()
+
+    create_database()
+    app = create_app('development')
+
+    with app.app_context():
+        from classroom_importer import ClassroomImporter
+
+        service = FakeClassroomService(args.items)
+        resources = list(TABLES)
+        alice, alice_lesson = create_lesson('alice')
+        bob, bob_lesson = create_lesson('bob')
+        alice_importer = ClassroomImporter(service, alice_lesson, alice, COURSE_ID, args.page_size)
+        bob_importer = ClassroomImporter(service, bob_lesson, bob, COURSE_ID, args.page_size)
+
+        timed('alice import', service, lambda: alice_importer.run(resources))
+        before = lesson_rows(alice_lesson)
+        timed('bob import', service, lambda: bob_importer.run(resources))
+
+        service.delete('courseWork-0')
+        timed('bob sync', service, lambda: bob_importer.sync(resources))
+
+        failures = []
+        full = {resource: args.items for resource in resources}
+        check_lesson('alice', lesson_rows(alice_lesson), alice, full, failures)
+        check_lesson('bob', lesson_rows(bob_lesson), bob, dict(full, courseWork=args.items - 1), failures)
+        if lesson_rows(alice_lesson) != before:
+            failures.append("bob's import or sync changed rows of alice's lesson")
+        if set(before['courseWork']) & set(lesson_rows(bob_lesson)['courseWork']):
+            failures.append('both lessons share coursework row ids')
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print('OK: each lesson keeps its own imported rows')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Google Client Cache Benchmark
+Per-request Classroom client overhead with and without the process-level cache
+
+Times building a Classroom client the old way (googleapiclient build() per
+request) against the cached path (one client per user and thread), then
+fires concurrent requests for one user with an expired token and checks the
+token is refreshed exactly once. Exits non-zero when the refresh is not
+single-flighted, so it can gate CI. No network access is needed.
+
+Usage:
+    python scripts/benchmarks/bench_google_client_cache.py [--requests 200] [--threads 16] [--refresh-ms 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app', 'services')))
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from google_client_cache import GoogleClientCache
+
+SCOPES = ['https://www.googleapis.com/auth/classroom.courses.readonly']
+
+
+class FakeRefreshCredentials(Credentials):
+    """Credentials whose refresh sleeps instead of calling the token endpoint."""
+
+    refresh_latency = 0.2
+    refresh_calls = 0
+    _calls_lock = threading.Lock()
+
+    def refresh(self, request):
+        with self._calls_lock:
+            FakeRefreshCredentials.refresh_calls += 1
+        time.sleep(self.refresh_latency)
+        self.token = f'token-{self.refresh_calls}'
+        self.expiry = datetime.utcnow() + timedelta(hours=1)
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return statistics.median(ordered), ordered[int(len(ordered) * 0.95) - 1]
+
+
+def bench_builds(requests: int):
+    credentials = Credentials(token='token', scopes=SCOPES)
+    cache = GoogleClientCache()
+
+    uncached = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        build('classroom', 'v1', credentials=credentials, cache_discovery=False).courses()
+        uncached.append((time.perf_counter() - started) * 1000)
+
+    cached = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        cache.client('bench-user', credentials).courses()
+        cached.append((time.perf_counter() - started) * 1000)
+
+    return percentiles(uncached), percentiles(cached), cache.metrics()
+
+
+def bench_refresh_storm(threads: int, refresh_latency: float):
+    FakeRefreshCredentials.refresh_latency = refresh_latency
+    FakeRefreshCredentials.refresh_calls = 0
+    credentials = FakeRefreshCredentials(
+        token='expired', refresh_token='refresh', scopes=SCOPES,
+        expiry=datetime.utcnow() - timedelta(minutes=1)
+    )
+    cache = GoogleClientCache()
+    cache.put_credentials('bench-user', credentials)
+
+    barrier = threading.Barrier(threads)
+
+    def request():
+        barrier.wait()
+        cache.ensure_fresh('bench-user', cache.get_credentials('bench-user'))
+
+    workers = [threading.Thread(target=request) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return FakeRefreshCredentials.refresh_calls, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--refresh-ms', type=float, default=200)
+    args = parser.parse_args()
+
+    (uncached_p50, uncached_p95), (cached_p50, cached_p95), metrics = bench_builds(args.requests)
+    print(f"build() per request: p50={uncached_p50:.2f} ms  p95={uncached_p95:.2f} ms")
+    print(f"cached client:       p50={cached_p50:.3f} ms  p95={cached_p95:.3f} ms  {metrics}")
+
+    refreshes, elapsed = bench_refresh_storm(args.threads, args.refresh_ms / 1000)
+    print(f"{args.threads} concurrent requests with an expired token: "
+          f"{refreshes} refresh(es) in {elapsed:.0f} ms")
+
+    if refreshes != 1:
+        print(f"FAIL: expected exactly 1 token refresh, got {refreshes}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
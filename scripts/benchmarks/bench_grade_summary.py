@@ -0,0 +1,188 @@
+"""
+Grade Summary Benchmark
+Query-count regression check and latency of GradeController.calculate_grade_summary
+
+Seeds a throwaway SQLite database with one course (categories x items) and a
+student with graded entries, then counts the statements one summary issues
+and times what-if scenarios evaluated against a loaded GradeSnapshot.
+Exits non-zero when the count exceeds the budget, so it can gate CI.
+
+Usage:
+    python scripts/benchmarks/bench_grade_summary.py [--categories 8] [--items 60] [--runs 50]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+_db_dir = tempfile.mkdtemp(prefix='bench_grades_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from sqlalchemy import event, insert
+
+from app import create_app, db
+
+# Config, categories+items, entries (calculation is read-only)
+MAX_SUMMARY_QUERIES = 3
+# Fresh GradeSummary lookup
+MAX_CACHED_READ_QUERIES = 1
+
+GRADING_SCALE = {
+    'A': {'min': 80, 'max': 100, 'gpa': 4.0},
+    'B': {'min': 70, 'max': 79.99, 'gpa': 3.0},
+    'C': {'min': 60, 'max': 69.99, 'gpa': 2.0},
+    'D': {'min': 50, 'max': 59.99, 'gpa': 1.0},
+    'F': {'min': 0, 'max': 49.99, 'gpa': 0.0}
+}
+
+
+class QueryCounter:
+    """Count statements executed on an engine while the context is active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+def seed_course(categories: int, items: int):
+    """Create a lesson with weighted categories, published items and graded entries."""
+    from app.models.user import UserModel
+    from app.models.lesson import LessonModel
+    from app.models.grade import GradeConfig, GradeCategory, GradeItem, GradeEntry
+
+    user = UserModel(username='bench', email='bench@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+
+    lesson = LessonModel(user_id=user.id, title='Bench Course')
+    db.session.add(lesson)
+    db.session.commit()
+    db.session.add(GradeConfig(lesson_id=lesson.id, grading_scale=json.dumps(GRADING_SCALE)))
+    db.session.commit()
+
+    category_rows = [{
+        'id': str(uuid.uuid4()),
+        'lesson_id': lesson.id,
+        'name': f'Category {index + 1}',
+        'weight': round(100 / categories, 2),
+        'order_index': index
+    } for index in range(categories)]
+
+    now = datetime.utcnow()
+    item_rows = []
+    entry_rows = []
+    for index in range(items):
+        item_id = str(uuid.uuid4())
+        item_rows.append({
+            'id': item_id,
+            'lesson_id': lesson.id,
+            'category_id': category_rows[index % categories]['id'],
+            'name': f'Item {index + 1}',
+            'points_possible': 10,
+            'due_date': now + timedelta(days=index),
+            'is_published': True
+        })
+        # Grade two thirds of the items so goals have remaining work
+        if index % 3:
+            entry_rows.append({
+                'id': str(uuid.uuid4()),
+                'user_id': user.id,
+                'lesson_id': lesson.id,
+                'grade_item_id': item_id,
+                'score': 5 + index % 6,
+                'points_possible': 10,
+                'status': 'graded',
+                'graded_at': now
+            })
+
+    db.session.execute(insert(GradeCategory), category_rows)
+    db.session.execute(insert(GradeItem), item_rows)
+    db.session.execute(insert(GradeEntry), entry_rows)
+    db.session.commit()
+    print(f"Seeded {categories} categories, {items} items and {len(entry_rows)} graded entries")
+    return lesson.id, user.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--categories', type=int, default=8)
+    parser.add_argument('--items', type=int, default=60)
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app('development')
+    with app.app_context():
+        db.create_all()
+        lesson_id, user_id = seed_course(args.categories, args.items)
+
+        from app.controllers.grade_views import GradeController
+
+        with QueryCounter(db.engine) as counter:
+            GradeController.calculate_grade_summary(lesson_id, user_id)
+            db.session.remove()
+        queries_per_call = counter.count
+
+        GradeController.get_grade_summary(lesson_id, user_id)
+        db.session.remove()
+        with QueryCounter(db.engine) as counter:
+            GradeController.get_grade_summary(lesson_id, user_id)
+            db.session.remove()
+        cached_queries = counter.count
+
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            GradeController.calculate_grade_summary(lesson_id, user_id)
+            timings.append((time.perf_counter() - started) * 1000)
+            db.session.remove()
+
+        timings.sort()
+
+        # What-if scenarios over one snapshot must not touch the database
+        from app.controllers.grade_views import GradeSnapshot
+        from app.models.grade import GradeItem
+        snapshot = GradeSnapshot.load(lesson_id, user_id)
+        item_ids = [item.id for item in GradeItem.query.filter_by(lesson_id=lesson_id).all()]
+        scenarios = [{item_id: (run + offset) % 11 for offset, item_id in enumerate(item_ids[:10])}
+                     for run in range(args.runs)]
+        with QueryCounter(db.engine) as counter:
+            started = time.perf_counter()
+            for scores in scenarios:
+                snapshot.what_if(scores)
+            what_if_ms = (time.perf_counter() - started) * 1000 / len(scenarios)
+        what_if_queries = counter.count
+
+        print(f"calculate_grade_summary queries per call: {queries_per_call} (budget {MAX_SUMMARY_QUERIES})")
+        print(f"get_grade_summary (fresh cache) queries per call: {cached_queries} "
+              f"(budget {MAX_CACHED_READ_QUERIES})")
+        print(f"latency ms  p50={statistics.median(timings):.2f}  "
+              f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}  max={timings[-1]:.2f}")
+
+        print(f"what-if per scenario: {what_if_ms:.3f} ms, {what_if_queries} queries")
+
+        if (queries_per_call > MAX_SUMMARY_QUERIES or cached_queries > MAX_CACHED_READ_QUERIES
+                or what_if_queries):
+            print("FAIL: query count regressed")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Pomodoro Stats Benchmark
+Measures query count and latency of PomodoroService.get_stats for a heavy user
+
+Builds a throwaway SQLite database with database/setup_database.py, seeds one
+user holding three years of daily Pomodoro sessions, then times repeated
+get_stats() calls.
+
+Usage:
+    python scripts/benchmarks/bench_pomodoro_stats.py [--years 3] [--per-day 6] [--runs 50]
+"""
+
+import argparse
+import os
+import runpy
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+_db_dir = tempfile.mkdtemp(prefix='bench_pomodoro_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'instance', 'site.db')}"
+os.environ.setdefault('FLASK_SECRET_KEY', 'bench-pomodoro-secret-key-0123456789abcdefghijklm')
+
+from sqlalchemy import event, insert
+
+from app import create_app, db
+
+
+class QueryCounter:
+    """Count statements executed on an engine while the context is active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+def create_database():
+    """The application schema, as database/setup_database.py creates it"""
+    setup = runpy.run_path(os.path.join(ROOT, 'database', 'setup_database.py'))
+    cwd = os.getcwd()
+    os.chdir(_db_dir)
+    try:
+        setup['create_complete_database_schema']()
+    finally:
+        os.chdir(cwd)
+
+
+def seed_user(years: int, per_day: int) -> str:
+    """Create one user with `years` of daily sessions and matching daily statistics."""
+    from app.models.user import UserModel
+    from app.models.pomodoro_session import PomodoroSessionModel
+    from app.models.pomodoro_statistics import PomodoroStatisticsModel
+
+    user = UserModel(username='bench', email='bench@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+
+    today = date.today()
+    days = years * 365
+    sessions = []
+    daily = []
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        completed = 0
+        for slot in range(per_day):
+            start = datetime(day.year, day.month, day.day, 8 + slot)
+            session_type = 'focus' if slot % 2 == 0 else 'short_break'
+            is_completed = slot % 5 != 4
+            completed += int(is_completed)
+            sessions.append({
+                'id': str(uuid.uuid4()),
+                'user_id': user.id,
+                'session_type': session_type,
+                'duration': 25 if session_type == 'focus' else 5,
+                'actual_duration': 25 if session_type == 'focus' else 5,
+                'start_time': start,
+                'end_time': start + timedelta(minutes=25),
+                'status': 'completed' if is_completed else 'interrupted',
+                'is_completed': is_completed,
+                'is_interrupted': not is_completed,
+                'created_at': start,
+                'updated_at': start
+            })
+        daily.append({
+            'id': str(uuid.uuid4()),
+            'user_id': user.id,
+            'date': day,
+            'total_sessions': per_day,
+            'total_completed_sessions': completed,
+            'total_interrupted_sessions': per_day - completed,
+            'productivity_score': 7.5,
+            'average_session_duration': 15.0,
+            'created_at': datetime.utcnow(),
+            'updated_at': datetime.utcnow()
+        })
+
+    db.session.execute(insert(PomodoroSessionModel), sessions)
+    db.session.execute(insert(PomodoroStatisticsModel), daily)
+    db.session.commit()
+    print(f"Seeded {len(sessions)} sessions and {len(daily)} daily rows")
+    return user.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--per-day', type=int, default=6)
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    create_database()
+    app = create_app('development')
+    with app.app_context():
+        user_id = seed_user(args.years, args.per_day)
+
+        from app.services import PomodoroService
+        service = PomodoroService()
+
+        with QueryCounter(db.engine) as counter:
+            service.get_stats(user_id)
+            db.session.remove()
+        queries_per_call = counter.count
+
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            service.get_stats(user_id)
+            timings.append((time.perf_counter() - started) * 1000)
+            db.session.remove()
+
+        timings.sort()
+        print(f"get_stats queries per call: {queries_per_call}")
+        print(f"latency ms  p50={statistics.median(timings):.2f}  "
+              f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}  max={timings[-1]:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Rate Limit Storage Benchmark
+Cost of one rate limit check per storage backend, and whether workers share counts
+
+For each backend (memory://, the SQLite store in a throwaway directory, and
+REDIS_URL when it is set and the redis package is installed) it times
+--checks hits of the `limits` fixed-window and sliding-window-counter
+strategies spread over --keys clients, and reports p50/p95 per check in
+microseconds. It then starts --processes worker processes that all hit one
+client's "N per minute" limit and counts how many hits were admitted: a
+shared backend admits exactly N, per-process memory admits N per process.
+
+Exits non-zero when a shared backend admits more or less than the limit, or
+when its p95 check exceeds --max-p95-us.
+
+Usage:
+    python scripts/benchmarks/bench_rate_limit_storage.py [--checks 5000] [--keys 100] [--processes 4] [--limit 100]
+"""
+
+import argparse
+import importlib.util
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+# Importing the app package loads the configuration, which needs these
+_db_dir = tempfile.mkdtemp(prefix='bench_rate_limit_')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'site.db')}")
+os.environ.setdefault('FLASK_SECRET_KEY', 'bench-rate-limit-secret-key-0123456789abcdefghij')
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+
+import app.utils.rate_limit_storage  # noqa: F401  registers sqlite://
+
+STRATEGIES = {
+    'fixed-window': FixedWindowRateLimiter,
+    'sliding-window-counter': SlidingWindowCounterRateLimiter
+}
+
+
+def backends():
+    uris = {
+        'memory': 'memory://',
+        'sqlite': f"sqlite:///{os.path.join(_db_dir, 'rate_limits.db')}"
+    }
+    if os.environ.get('REDIS_URL') and importlib.util.find_spec('redis') is not None:
+        uris['redis'] = os.environ['REDIS_URL']
+    return uris
+
+
+def time_checks(uri, strategy, checks, keys):
+    storage = storage_from_string(uri)
+    storage.reset()
+    limiter = STRATEGIES[strategy](storage)
+    # Large enough that every hit is admitted and written
+    item = parse(f"{checks * 10} per minute")
+    rng = random.Random(1)
+    clients = [f"10.0.{i // 256}.{i % 256}" for i in range(keys)]
+
+    for client in clients:  # warm up connections and create the rows
+        limiter.hit(item, 'bench', client)
+
+    timings = []
+    for _ in range(checks):
+        client = rng.choice(clients)
+        started = time.perf_counter()
+        limiter.hit(item, 'bench', client)
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return statistics.median(timings), timings[max(0, int(len(timings) * 0.95) - 1)]
+
+
+def contend(args):
+    """One worker process hitting the shared client until the deadline; returns admitted hits"""
+    uri, strategy, limit, deadline = args
+    limiter = STRATEGIES[strategy](storage_from_string(uri))
+    item = parse(f"{limit} per minute")
+    admitted = 0
+    while time.monotonic() < deadline:
+        if limiter.hit(item, 'bench-shared', '203.0.113.7'):
+            admitted += 1
+    return admitted
+
+
+def admitted_across_processes(uri, strategy, processes, limit, duration):
+    storage_from_string(uri).reset()
+    # Stay inside one minute window, or a new window would admit more hits legitimately
+    remaining = 60 - time.time() % 60
+    if remaining < duration + 5:
+        time.sleep(remaining)
+    deadline = time.monotonic() + duration
+    # Fresh interpreters, like gunicorn workers that did not share the master's memory store
+    with multiprocessing.get_context('spawn').Pool(processes) as pool:
+        return sum(pool.map(contend, [(uri, strategy, limit, deadline)] * processes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--checks', type=int, default=5000)
+    parser.add_argument('--keys', type=int, default=100)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=3.0, help='Seconds the worker processes contend')
+    parser.add_argument('--max-p95-us', type=float, default=2000.0, help='Allowed p95 per check of a shared backend')
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'backend':>8} {'strategy':>23} {'p50 us':>8} {'p95 us':>8} "
+          f"{'admitted':>9} {'expected':>9}")
+    for name, uri in backends().items():
+        shared = name != 'memory'
+        for strategy in STRATEGIES:
+            p50, p95 = time_checks(uri, strategy, args.checks, args.keys)
+            admitted = admitted_across_processes(uri, strategy, args.processes, args.limit, args.duration)
+            expected = args.limit if shared else args.limit * args.processes
+            print(f"{name:>8} {strategy:>23} {p50:>8.1f} {p95:>8.1f} {admitted:>9} {expected:>9}")
+
+            if shared and admitted != args.limit:
+                failures.append(f"{name}/{strategy} admitted {admitted} hits across "
+                                f"{args.processes} processes (limit {args.limit})")
+            if shared and p95 > args.max_p95_us:
+                failures.append(f"{name}/{strategy} p95 {p95:.0f}us exceeds {args.max_p95_us:.0f}us")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
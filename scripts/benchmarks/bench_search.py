@@ -0,0 +1,152 @@
+"""
+Full-text Search Benchmark
+Search latency as one user's notes grow, FTS index vs the old LIKE scan
+
+Builds the schema with database/setup_database.py in a throwaway directory,
+then grows one user's notes in steps (default: 1,000 / 5,000 / 10,000, with
+other users' notes alongside) and times SearchService.search against the
+LIKE fallback at each size. Exits non-zero when indexed latency is not flat
+(p95 at the largest size more than MAX_P95_GROWTH times p95 at the smallest)
+or does not beat the LIKE scan at the largest size, so it can gate CI.
+
+Usage:
+    python scripts/benchmarks/bench_search.py [--sizes 1000,5000,10000] [--other-users 5] [--queries 50]
+"""
+
+import argparse
+import os
+import random
+import runpy
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+_db_dir = tempfile.mkdtemp(prefix='bench_search_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'instance', 'site.db')}"
+
+from sqlalchemy import text
+
+# Indexed p95 may at most double from the smallest to the largest size
+MAX_P95_GROWTH = 2.0
+
+VOCABULARY_SIZE = 3000
+
+
+def build_vocabulary(rng):
+    """Pseudo-words with Zipf-like frequencies, so queries are as selective as in real notes"""
+    words = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(4, 10))) for _ in range(VOCABULARY_SIZE)]
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+    # Queries: mid-frequency words, two-word queries and 4-letter prefixes
+    queries = [words[rank] for rank in (20, 80, 300, 1000)]
+    queries += [f"{words[40]} {words[200]}", words[150][:4], words[600][:4]]
+    return words, weights, queries
+
+
+def create_schema():
+    setup = runpy.run_path(os.path.join(ROOT, 'database', 'setup_database.py'))
+    cwd = os.getcwd()
+    os.chdir(_db_dir)
+    try:
+        setup['create_complete_database_schema']()
+    finally:
+        os.chdir(cwd)
+
+
+def seed_user(db):
+    user_id = str(uuid.uuid4())
+    db.session.execute(
+        text("INSERT INTO user (id, username, email, password_hash) VALUES (:id, :username, :email, 'x')"),
+        {'id': user_id, 'username': f'bench-{user_id[:8]}', 'email': f'{user_id[:8]}@bench.local'}
+    )
+    return user_id
+
+
+def add_notes(db, rng, vocabulary, user_id, count):
+    words, weights, _ = vocabulary
+    rows = [{
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'title': ' '.join(rng.choices(words, weights, k=3)),
+        'content': ' '.join(rng.choices(words, weights, k=rng.randint(50, 300)))
+    } for _ in range(count)]
+    db.session.execute(text("INSERT INTO note (id, user_id, title, content) VALUES (:id, :user_id, :title, :content)"), rows)
+    db.session.commit()
+
+
+def time_queries(service, user_id, queries, count, rng):
+    # Warm up after the bulk insert before timing
+    for query in queries:
+        service.search(user_id, query, types=['note'], per_page=20)
+
+    timings = []
+    for _ in range(count):
+        query = rng.choice(queries)
+        started = time.perf_counter()
+        service.search(user_id, query, types=['note'], per_page=20)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[max(0, int(len(timings) * 0.95) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1000,5000,10000')
+    parser.add_argument('--other-users', type=int, default=5)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    create_schema()
+    from app import create_app, db
+    from app.services import SearchService
+    from app.utils import search_index
+
+    app = create_app('development')
+    rng = random.Random(1)
+    vocabulary = build_vocabulary(rng)
+    queries = vocabulary[2]
+    service = SearchService()
+
+    with app.app_context():
+        if not search_index.is_available():
+            print("FAIL: search index unavailable (SQLite built without FTS5?)")
+            sys.exit(1)
+
+        user_id = seed_user(db)
+        others = [seed_user(db) for _ in range(args.other_users)]
+        db.session.commit()
+
+        rows, current = [], 0
+        for size in sizes:
+            add_notes(db, rng, vocabulary, user_id, size - current)
+            for other in others:
+                add_notes(db, rng, vocabulary, other, (size - current) // 2)
+            current = size
+
+            search_index._state['available'] = True
+            fts = time_queries(service, user_id, queries, args.queries, rng)
+            search_index._state['available'] = False
+            like = time_queries(service, user_id, queries, args.queries, rng)
+            search_index._state['available'] = True
+            rows.append((size, fts, like))
+
+    print(f"{'notes':>7} {'fts p50':>9} {'fts p95':>9} {'like p50':>9} {'like p95':>9}")
+    for size, (fts_p50, fts_p95), (like_p50, like_p95) in rows:
+        print(f"{size:>7} {fts_p50:>7.2f}ms {fts_p95:>7.2f}ms {like_p50:>7.2f}ms {like_p95:>7.2f}ms")
+
+    smallest_p95, (largest_p95, like_p95) = rows[0][1][1], (rows[-1][1][1], rows[-1][2][1])
+    if largest_p95 > smallest_p95 * MAX_P95_GROWTH:
+        print(f"FAIL: indexed search p95 grew from {smallest_p95:.1f} ms to {largest_p95:.1f} ms "
+              f"(more than {MAX_P95_GROWTH:.0f}x)")
+        sys.exit(1)
+    if largest_p95 >= like_p95:
+        print(f"FAIL: indexed search p95 {largest_p95:.1f} ms is not faster than LIKE ({like_p95:.1f} ms)")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+SQLite Backup Benchmark
+How long writers stall while an online backup runs, per journal mode and copy strategy
+
+Builds a throwaway database of about --size-mb MiB, then for each journal mode
+(WAL and the rollback-journal default) copies it while a writer thread keeps
+committing small inserts --write-interval seconds apart: once with a plain
+one-step `source.backup(target)` and once with online_backup() from
+app/utils/sqlite_backup.py (one step for WAL, --pages pages per step
+--pause seconds apart otherwise). Reports the copy time, steps and restarts,
+the writer's commits that started during the copy and their p50/max latency,
+then checks the copy with `PRAGMA integrity_check`.
+
+Exits non-zero when a copy fails the integrity check, or when online_backup()
+stalls the writer longer than --max-stall-ms.
+
+Usage:
+    python scripts/benchmarks/bench_sqlite_backup.py [--size-mb 64] [--pages 256] [--pause 0.01] [--write-interval 0.02]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+# Importing the app package loads the configuration, which needs these
+_db_dir = tempfile.mkdtemp(prefix='bench_sqlite_backup_')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'site.db')}")
+os.environ.setdefault('FLASK_SECRET_KEY', 'bench-sqlite-backup-secret-key-0123456789abcdefgh')
+
+from app.utils.sqlite_backup import check_integrity, online_backup  # noqa: E402
+
+
+def create_database(path, journal_mode, size_mb):
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.execute("CREATE TABLE note (id INTEGER PRIMARY KEY, title TEXT, content TEXT)")
+    payload = 'x' * 1000
+    rows = size_mb * 1024
+    conn.execute('BEGIN')
+    conn.executemany("INSERT INTO note (title, content) VALUES (?, ?)",
+                     ((f"note {i}", payload) for i in range(rows)))
+    conn.execute('COMMIT')
+    if journal_mode == 'wal':
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    conn.close()
+
+
+def writer(path, interval, stop, latencies, windows):
+    """Commit one insert at a time until stopped, recording latencies in ms while a copy runs"""
+    conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+    while not stop.is_set():
+        during_copy = windows['active']  # a commit blocked by the copy finishes after it
+        started = time.perf_counter()
+        conn.execute("INSERT INTO note (title, content) VALUES ('written during backup', 'y')")
+        if during_copy:
+            latencies.append((time.perf_counter() - started) * 1000)
+        time.sleep(interval)
+    conn.close()
+
+
+def one_step_backup(path, copy_path, pages, pause):
+    source, target = sqlite3.connect(path, timeout=60), sqlite3.connect(copy_path)
+    try:
+        source.backup(target)
+        return {'steps': 1, 'restarts': 0}
+    finally:
+        target.close()
+        source.close()
+
+
+def measure(copy, path, copy_path, pages, pause, interval):
+    stop = threading.Event()
+    latencies = []
+    windows = {'active': False}
+    thread = threading.Thread(target=writer, args=(path, interval, stop, latencies, windows))
+    thread.start()
+    time.sleep(0.2)  # let the writer settle
+
+    windows['active'] = True
+    started = time.perf_counter()
+    try:
+        stats = copy(path, copy_path, pages, pause)
+    finally:
+        elapsed = time.perf_counter() - started
+        windows['active'] = False
+        stop.set()
+        thread.join()
+
+    return {
+        'seconds': elapsed,
+        'commits': len(latencies),
+        'p50': statistics.median(latencies) if latencies else 0.0,
+        'max': max(latencies, default=0.0),
+        'steps': stats['steps'],
+        'restarts': stats['restarts'],
+        'problems': check_integrity(copy_path)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=64)
+    parser.add_argument('--pages', type=int, default=256, help='Pages per step of the paced copy')
+    parser.add_argument('--pause', type=float, default=0.01, help='Seconds between steps of the paced copy')
+    parser.add_argument('--write-interval', type=float, default=0.02,
+                        help='Seconds the writer sleeps between commits')
+    parser.add_argument('--max-stall-ms', type=float, default=250.0,
+                        help='Allowed longest writer commit during online_backup()')
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'journal':>8} {'copy':>10} {'seconds':>8} {'steps':>6} {'restarts':>8} "
+          f"{'commits':>8} {'p50 ms':>8} {'max ms':>8} {'integrity':>9}")
+
+    for journal_mode in ('wal', 'delete'):
+        path = os.path.join(_db_dir, f"{journal_mode}.db")
+        create_database(path, journal_mode, args.size_mb)
+        for name, copy in (('one step', one_step_backup), ('online', online_backup)):
+            copy_path = os.path.join(_db_dir, f"{journal_mode}_copy.db")
+            result = measure(copy, path, copy_path, args.pages, args.pause, args.write_interval)
+            print(f"{journal_mode:>8} {name:>10} {result['seconds']:>8.2f} {result['steps']:>6} "
+                  f"{result['restarts']:>8} {result['commits']:>8} {result['p50']:>8.2f} "
+                  f"{result['max']:>8.1f} {'ok' if not result['problems'] else 'FAILED':>9}")
+
+            if result['problems']:
+                failures.append(f"{journal_mode}/{name} copy failed the integrity check: {result['problems'][:3]}")
+            if copy is online_backup and result['max'] > args.max_stall_ms:
+                failures.append(f"{journal_mode}/{name} stalled the writer for {result['max']:.0f}ms "
+                                f"(allowed {args.max_stall_ms:.0f}ms)")
+            os.remove(copy_path)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
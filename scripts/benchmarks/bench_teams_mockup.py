@@ -0,0 +1,149 @@
+"""
+Microsoft Teams Mockup Import Benchmark
+Time and statement count of create_mockup_data_for_imported_team for a large class
+
+Builds the schema with database/setup_database.py in a throwaway directory,
+imports a sample team with a synthetic size (default: 1,000 stream posts)
+and checks that every generator wrote its rows in a batch. Exits non-zero
+when the import exceeds the time budget or rows are missing, so it can gate CI.
+
+Usage:
+    python scripts/benchmarks/bench_teams_mockup.py [--posts 1000] [--assignments 0] [--grade-items 0] [--runs 5]
+"""
+
+import argparse
+import os
+import runpy
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+_db_dir = tempfile.mkdtemp(prefix='bench_teams_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'instance', 'site.db')}"
+
+from sqlalchemy import event, text
+
+from app import create_app, db
+
+MAX_IMPORT_SECONDS = 1.0
+# Stream, classwork, people, grade categories, grade items (+ stale-summary updates)
+MAX_IMPORT_STATEMENTS = 12
+
+
+class QueryCounter:
+    """Count statements executed on an engine while the context is active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+def create_schema():
+    # Loaded by path: setup_database.py is a standalone script, not part of the database package
+    setup = runpy.run_path(os.path.join(ROOT, 'database', 'setup_database.py'))
+
+    cwd = os.getcwd()
+    os.chdir(_db_dir)
+    try:
+        setup['create_complete_database_schema']()
+    finally:
+        os.chdir(cwd)
+
+
+def seed_user():
+    user_id = str(uuid.uuid4())
+    db.session.execute(
+        text("INSERT INTO user (id, username, email, password_hash) VALUES (:id, :username, :email, 'x')"),
+        {'id': user_id, 'username': f'bench-{user_id[:8]}', 'email': f'{user_id[:8]}@bench.local'}
+    )
+    db.session.commit()
+    return user_id
+
+
+def seed_lesson(user_id):
+    lesson_id = str(uuid.uuid4())
+    db.session.execute(
+        text("INSERT INTO lesson (id, user_id, title, source_platform) "
+             "VALUES (:id, :user_id, 'Bench team', 'microsoft_teams')"),
+        {'id': lesson_id, 'user_id': user_id}
+    )
+    db.session.commit()
+    return lesson_id
+
+
+def count_rows(table, column, value):
+    return db.session.execute(
+        text(f"SELECT COUNT(*) FROM {table} WHERE {column} = :value"), {'value': value}
+    ).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--assignments', type=int, default=0)
+    parser.add_argument('--grade-items', type=int, default=0)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    create_schema()
+    app = create_app('development')
+
+    with app.app_context():
+        from app.routes.integrations.routes_microsoft_teams import MOCK_TEAMS, create_mockup_data_for_imported_team
+
+        team = MOCK_TEAMS[0]
+        settings = {'importChannels': True, 'importAssignments': True, 'importMembers': True, 'importFiles': True}
+        size = {'posts': args.posts, 'assignments': args.assignments, 'gradeItems': args.grade_items}
+        user_id = seed_user()
+
+        timings, statements = [], 0
+        for _ in range(args.runs):
+            lesson_id = seed_lesson(user_id)
+            with QueryCounter(db.engine) as counter:
+                started = time.perf_counter()
+                create_mockup_data_for_imported_team(lesson_id, team, settings, user_id, size=size)
+                timings.append(time.perf_counter() - started)
+            statements = max(statements, counter.count)
+
+        posts = count_rows('stream_post', 'lesson_id', lesson_id)
+        items = count_rows('grade_item', 'lesson_id', lesson_id)
+        notes = count_rows('note', 'lesson_id', lesson_id)
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(f"import ({args.posts} posts, {args.assignments} assignments, {args.grade_items} grade items): "
+          f"p50={p50 * 1000:.0f} ms  p95={p95 * 1000:.0f} ms  statements={statements}")
+    print(f"rows: stream_post={posts} note={notes} grade_item={items}")
+
+    failures = []
+    if posts != args.posts + 2:
+        failures.append(f"expected {args.posts + 2} stream posts, found {posts}")
+    if items != args.grade_items + 5 or notes != 2:
+        failures.append("grade items or people notes missing")
+    if p95 > MAX_IMPORT_SECONDS:
+        failures.append(f"p95 {p95:.2f}s exceeds the {MAX_IMPORT_SECONDS:.1f}s budget")
+    if statements > MAX_IMPORT_STATEMENTS:
+        failures.append(f"{statements} statements exceed the budget of {MAX_IMPORT_STATEMENTS}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+WSGI Server Benchmark
+Requests/sec of the gunicorn launcher vs the app.run() development server
+
+Builds a throwaway SQLite database (database/setup_database.py plus
+SyntheticDataGenerator), then serves wsgi:app twice on a local port: once
+with app.run() as start.py did before (single process, Werkzeug threads) and
+once with gunicorn.conf.py (worker processes x threads). For each it runs
+--clients concurrent keep-alive clients, each in its own process, for
+--duration seconds over a mix of signed-in routes, and reports requests/sec,
+p50/p95 latency and errors. Exits non-zero on request errors or when
+gunicorn reaches less than --min-speedup times the development server's
+requests/sec. The default expects 1.5x with two or more CPUs; on a single
+CPU extra processes cannot add throughput, so it only reports.
+
+Usage:
+    python scripts/benchmarks/bench_wsgi_server.py [--clients 16] [--duration 10] [--workers N] [--threads 4]
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import random
+import runpy
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+_db_dir = tempfile.mkdtemp(prefix='bench_wsgi_')
+DATABASE_URL = f"sqlite:///{os.path.join(_db_dir, 'instance', 'site.db')}"
+os.environ['DATABASE_URL'] = DATABASE_URL
+
+SECRET_KEY = os.environ.get('FLASK_SECRET_KEY') or 'bench-wsgi-secret-key-0123456789abcdefghijklmnop'
+os.environ['FLASK_SECRET_KEY'] = SECRET_KEY
+
+PATHS = [
+    '/dashboard',
+    '/partial/dashboard',
+    '/api/tasks',
+    '/api/tasks/statistics',
+    '/api/track/statistics',
+    '/api/notes/tags',
+    '/api/search?q=exam'
+]
+
+# app.run() exactly as start.py called it before the gunicorn launcher
+WERKZEUG_COMMAND = [
+    sys.executable, '-c',
+    "import os, wsgi; wsgi.app.run(host='127.0.0.1', port=int(os.environ['PORT']), debug=False)"
+]
+
+
+def create_database(users):
+    setup = runpy.run_path(os.path.join(ROOT, 'database', 'setup_database.py'))
+    cwd = os.getcwd()
+    os.chdir(_db_dir)
+    try:
+        setup['create_complete_database_schema']()
+    finally:
+        os.chdir(cwd)
+
+    from app import create_app
+    from app.utils.synthetic_data import SyntheticDataGenerator
+
+    app = create_app('development')
+    with app.app_context():
+        generator = SyntheticDataGenerator(users=users, seed=1)
+        generator.run()
+    # Same secret as the servers, so these cookies are accepted as signed-in sessions
+    serializer = app.session_interface.get_signing_serializer(app)
+    return [serializer.dumps({'user_id': user_id}) for user_id in generator.user_ids]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not listen on port {port} within {timeout}s")
+
+
+def fetch(connection, path, cookie):
+    """GET one path; like browsers, retry once when a reused keep-alive connection was closed"""
+    for attempt in range(2):
+        try:
+            connection.request('GET', path, headers={'Cookie': cookie})
+            response = connection.getresponse()
+            response.read()
+        except ConnectionResetError:
+            # Includes RemoteDisconnected, e.g. a worker recycled after max_requests
+            connection.close()
+            if attempt:
+                raise
+            continue
+        if response.getheader('Connection', '').lower() == 'close':
+            connection.close()
+        return response.status
+
+
+def client_worker(args):
+    """One keep-alive connection issuing requests until the deadline"""
+    port, cookies, deadline, seed = args
+    rng = random.Random(seed)
+    cookie = f"session={rng.choice(cookies)}"
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    latencies, errors = [], 0
+
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            status = fetch(connection, rng.choice(PATHS), cookie)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            continue
+        if status >= 400:
+            errors += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    connection.close()
+    return latencies, errors
+
+
+def run_load(port, cookies, clients, duration):
+    # Warm up every worker process and template cache before measuring
+    client_worker((port, cookies, time.monotonic() + 2, 0))
+
+    deadline = time.monotonic() + duration
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(client_worker, [(port, cookies, deadline, seed) for seed in range(1, clients + 1)])
+
+    latencies = sorted(latency for result, _ in results for latency in result)
+    errors = sum(errors for _, errors in results)
+    if not latencies:
+        return {'rps': 0.0, 'p50': 0.0, 'p95': 0.0, 'requests': 0, 'errors': errors}
+    return {
+        'rps': len(latencies) / duration,
+        'p50': statistics.median(latencies),
+        'p95': latencies[max(0, int(len(latencies) * 0.95) - 1)],
+        'requests': len(latencies),
+        'errors': errors
+    }
+
+
+def serve_and_measure(command, env, cookies, clients, duration):
+    port = free_port()
+    # A file, not a pipe: nobody drains a pipe during the run and a full one blocks the server
+    with tempfile.TemporaryFile() as log:
+        process = subprocess.Popen(command, cwd=ROOT, env=dict(env, PORT=str(port)),
+                                   stdout=log, stderr=subprocess.STDOUT)
+        try:
+            wait_until_ready(port, process)
+            return run_load(port, cookies, clients, duration)
+        except RuntimeError:
+            log.seek(0)
+            print(log.read().decode(errors='replace')[-2000:], file=sys.stderr)
+            raise
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=None, help='WEB_CONCURRENCY (default: gunicorn.conf.py sizing)')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--min-speedup', type=float, default=None,
+                        help='Required gunicorn/app.run req/s ratio (default: 1.5 with 2+ CPUs, none on 1 CPU)')
+    args = parser.parse_args()
+
+    cookies = create_database(args.users)
+
+    # A few users issuing thousands of requests is exactly what the rate limits reject;
+    # this measures the servers, so the limiter is off
+    env = dict(os.environ, DATABASE_URL=DATABASE_URL, FLASK_SECRET_KEY=SECRET_KEY, FLASK_ENV='production',
+               RATE_LIMITING_ENABLED='false', GUNICORN_THREADS=str(args.threads), GUNICORN_ACCESS_LOG='',
+               LOG_LEVEL='warning')
+    if args.workers:
+        env['WEB_CONCURRENCY'] = str(args.workers)
+
+    # The sizing gunicorn will use, read from the same config file
+    os.environ.update({key: env[key] for key in ('GUNICORN_THREADS', 'WEB_CONCURRENCY') if key in env})
+    gunicorn_conf = runpy.run_path(os.path.join(ROOT, 'gunicorn.conf.py'))
+    if args.min_speedup is None:
+        args.min_speedup = 1.5 if gunicorn_conf['_cpu_count']() > 1 else 0.0
+
+    gunicorn_command = [sys.executable, '-m', 'gunicorn', '--config', os.path.join(ROOT, 'gunicorn.conf.py'), 'wsgi:app']
+    results = {
+        'app.run': serve_and_measure(WERKZEUG_COMMAND, env, cookies, args.clients, args.duration),
+        'gunicorn': serve_and_measure(gunicorn_command, env, cookies, args.clients, args.duration)
+    }
+
+    print(f"{args.clients} clients for {args.duration:.0f}s, gunicorn: "
+          f"{gunicorn_conf['workers']} workers x {gunicorn_conf['threads']} threads ({gunicorn_conf['worker_class']})")
+    print(f"{'server':>10} {'req/s':>9} {'p50':>9} {'p95':>9} {'requests':>9} {'errors':>7}")
+    for name, result in results.items():
+        print(f"{name:>10} {result['rps']:>9.1f} {result['p50']:>7.1f}ms {result['p95']:>7.1f}ms "
+              f"{result['requests']:>9} {result['errors']:>7}")
+
+    baseline = results['app.run']['rps']
+    speedup = results['gunicorn']['rps'] / baseline if baseline else float('inf')
+    print(f"speedup: {speedup:.2f}x")
+
+    if any(result['errors'] for result in results.values()):
+        print("FAIL: requests failed")
+        sys.exit(1)
+    if speedup < args.min_speedup:
+        print(f"FAIL: gunicorn is {speedup:.2f}x the development server (expected at least {args.min_speedup:.2f}x)")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""
+Load Test Harness
+Replays a weighted mix of routes and reports latency and queries per endpoint
+
+By default it builds a throwaway SQLite database with database/setup_database.py
+and fills it with SyntheticDataGenerator (the same generator behind
+`flask seed synthetic`). With --database-url it runs against an existing
+database instead, using users whose username starts with --prefix.
+Requests go through Flask's test client, signed in as a random synthetic
+user for --requests-per-user consecutive requests at a time. The report
+lists p50/p95/p99 latency, mean/max statements and errors per endpoint.
+
+The route mix is a JSON list of {"path": ..., "weight": ...}; paths may use
+{lesson_id} (a lesson owned by the signed-in user) and {user_id}.
+
+Usage:
+    python scripts/benchmarks/loadtest.py [--users 20] [--requests 2000] [--mix mix.json] [--json report.json]
+    python scripts/benchmarks/loadtest.py --database-url sqlite:////path/to/site.db --prefix synthetic
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import runpy
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+DEFAULT_MIX = [
+    {'path': '/dashboard', 'weight': 5},
+    {'path': '/partial/class', 'weight': 10},
+    {'path': '/partial/class/{lesson_id}/classwork', 'weight': 5},
+    {'path': '/partial/note', 'weight': 8},
+    {'path': '/api/notes/search?q=exam', 'weight': 4},
+    {'path': '/api/notes/tags', 'weight': 3},
+    {'path': '/api/tasks', 'weight': 8},
+    {'path': '/api/tasks/statistics', 'weight': 3},
+    {'path': '/api/pomodoro/statistics/daily-progress', 'weight': 5},
+    {'path': '/api/pomodoro/statistics/history', 'weight': 3},
+    {'path': '/api/track/statistics', 'weight': 4},
+    {'path': '/api/class/{lesson_id}/stream/posts', 'weight': 6},
+    {'path': '/api/class/{lesson_id}/members', 'weight': 3},
+    {'path': '/classwork/lessons/{lesson_id}/dashboard', 'weight': 3},
+    {'path': '/grades/lessons/{lesson_id}/summary', 'weight': 5},
+    {'path': '/grades/lessons/{lesson_id}/analytics', 'weight': 2}
+]
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+class QueryCounter:
+    """Count statements executed on an engine while the context is active."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.event = event
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        self.event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        self.event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+def create_database():
+    """Fresh schema plus synthetic data; returns the database URL"""
+    db_dir = tempfile.mkdtemp(prefix='loadtest_')
+    setup = runpy.run_path(os.path.join(ROOT, 'database', 'setup_database.py'))
+    cwd = os.getcwd()
+    os.chdir(db_dir)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            setup['create_complete_database_schema']()
+    finally:
+        os.chdir(cwd)
+    return f"sqlite:///{os.path.join(db_dir, 'instance', 'site.db')}"
+
+
+def load_users(db, prefix):
+    """{user_id: [owned lesson ids]} for users with the synthetic prefix"""
+    from sqlalchemy import text
+
+    rows = db.session.execute(
+        text("SELECT u.id, l.id FROM user u LEFT JOIN lesson l ON l.user_id = u.id WHERE u.username LIKE :prefix"),
+        {'prefix': f"{prefix}_%"}
+    ).fetchall()
+    users = defaultdict(list)
+    for user_id, lesson_id in rows:
+        if lesson_id:
+            users[user_id].append(lesson_id)
+    return dict(users)
+
+
+def run_workload(app, engine, users, mix, requests, requests_per_user, warmup, rng):
+    """
+    Replay the mix through the test client
+
+    Must run outside an app context: each request then pushes its own and
+    gets a fresh session that is removed at teardown, as it would in a
+    server, instead of sharing one session (and its identity map) with
+    every other request.
+    """
+    client = app.test_client()
+    user_ids = sorted(users)
+    paths = [entry['path'] for entry in mix]
+    weights = [entry['weight'] for entry in mix]
+    results = defaultdict(lambda: {'latency': [], 'queries': [], 'errors': 0, 'statuses': defaultdict(int)})
+
+    user_id = None
+    for index in range(warmup + requests):
+        if index % requests_per_user == 0:
+            user_id = rng.choice(user_ids)
+            with client.session_transaction() as session:
+                session['user_id'] = user_id
+
+        template = rng.choices(paths, weights)[0]
+        url = template.format(lesson_id=rng.choice(users[user_id]), user_id=user_id)
+
+        with QueryCounter(engine) as counter:
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = (time.perf_counter() - started) * 1000
+        response.close()
+
+        if index < warmup:
+            continue
+        result = results[template]
+        result['latency'].append(elapsed)
+        result['queries'].append(counter.count)
+        result['statuses'][response.status_code] += 1
+        if response.status_code >= 400:
+            result['errors'] += 1
+
+    return results
+
+
+def summarize(results):
+    report = []
+    for template, result in sorted(results.items()):
+        latency = sorted(result['latency'])
+        queries = result['queries']
+        report.append({
+            'endpoint': template,
+            'requests': len(latency),
+            'errors': result['errors'],
+            'statuses': dict(result['statuses']),
+            'p50_ms': round(percentile(latency, 0.50), 2),
+            'p95_ms': round(percentile(latency, 0.95), 2),
+            'p99_ms': round(percentile(latency, 0.99), 2),
+            'queries_mean': round(sum(queries) / len(queries), 1),
+            'queries_max': max(queries)
+        })
+    return report
+
+
+def print_report(report, elapsed):
+    header = f"{'endpoint':<45} {'reqs':>6} {'err':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'q mean':>7} {'q max':>6}"
+    print(header)
+    print('-' * len(header))
+    for row in report:
+        print(f"{row['endpoint']:<45} {row['requests']:>6} {row['errors']:>5} {row['p50_ms']:>8.1f} "
+              f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['queries_mean']:>7.1f} {row['queries_max']:>6}")
+    total = sum(row['requests'] for row in report)
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.0f} req/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', default=None, help='Run against this database instead of a fresh one')
+    parser.add_argument('--prefix', default='synthetic', help='Username prefix of the users to sign in as')
+    parser.add_argument('--users', type=int, default=20, help='Synthetic users to generate (fresh database)')
+    parser.add_argument('--months', type=int, default=3, help='Months of pomodoro history (fresh database)')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--requests-per-user', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--mix', default=None, help='JSON file with the weighted route mix')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', dest='json_path', default=None, help='Also write the report to this file')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or create_database()
+
+    from app import create_app, db
+
+    app = create_app('development')
+    mix = DEFAULT_MIX
+    if args.mix:
+        with open(args.mix, encoding='utf-8') as f:
+            mix = json.load(f)
+
+    with app.app_context():
+        if not args.database_url:
+            from app.utils.synthetic_data import SyntheticDataGenerator
+
+            started = time.perf_counter()
+            counts = SyntheticDataGenerator(users=args.users, months=args.months, prefix=args.prefix,
+                                            seed=args.seed).run()
+            print(f"Generated {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+
+        users = load_users(db, args.prefix)
+        if not users:
+            print(f"No users with lessons found for prefix '{args.prefix}'")
+            sys.exit(1)
+        engine = db.engine
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run_workload(app, engine, users, mix, args.requests, args.requests_per_user,
+                               args.warmup, random.Random(args.seed))
+    elapsed = time.perf_counter() - started
+
+    report = summarize(results)
+    print_report(report, elapsed)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'requests': args.requests, 'elapsed_s': round(elapsed, 2), 'endpoints': report}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Note File Metadata
+Adds filename, size, mime type and hash columns to note_file
+
+Safe to re-run: existing columns are skipped. Afterwards record the files
+already on disk with `flask notes reconcile-files`; new uploads are recorded
+by NoteAttachmentService.
+
+Usage:
+    python scripts/migrations/add_note_file_metadata.py [path/to/site.db]
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+COLUMNS = [
+    ('filename', 'TEXT'),
+    ('size', 'INTEGER'),
+    ('mime_type', 'TEXT'),
+    ('sha256', 'TEXT')
+]
+
+
+def add_note_file_metadata(db_path):
+    """Create or extend note_file and index it by note"""
+    if not db_path.exists():
+        print("❌ Database not found. Please run the application first.")
+        return False
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        cursor = conn.cursor()
+
+        print("🔧 Creating note_file table...")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS note_file (
+                id TEXT PRIMARY KEY,
+                note_id TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                file_type TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (note_id) REFERENCES note(id) ON DELETE CASCADE
+            )
+        """)
+
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(note_file)")}
+        for name, column_type in COLUMNS:
+            if name in existing:
+                print(f"   {name} column already exists, skipping...")
+                continue
+            cursor.execute(f"ALTER TABLE note_file ADD COLUMN {name} {column_type}")
+            print(f"✅ Added {name} column")
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_note_file_note_id ON note_file(note_id)")
+
+        conn.commit()
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error adding note file metadata: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    """Main migration function"""
+    print("🚀 Note File Metadata Migration")
+    print("=" * 50)
+
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else project_root / 'instance' / 'site.db'
+    success = add_note_file_metadata(db_path)
+
+    if success:
+        print("\n🎉 Migration completed successfully!")
+        print("Run `flask notes reconcile-files` to record files already uploaded.")
+    else:
+        print("\n❌ Migration failed!")
+        print("Please check the error messages above.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Note Tag Index
+Creates the note_tag table and backfills it from the JSON tags of existing notes
+
+Safe to re-run: the index is rebuilt from note.tags in one transaction.
+New and edited notes are indexed by the NoteModel ORM events afterwards.
+
+Usage:
+    python scripts/migrations/add_note_tag_index.py [path/to/site.db]
+"""
+
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+BATCH_SIZE = 1000
+
+
+def parse_tags(value):
+    """Same rules as app.models.note.parse_tags: JSON list, stripped, de-duplicated"""
+    if not value:
+        return []
+    try:
+        tags = json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    if not isinstance(tags, list):
+        return []
+
+    result = []
+    for tag in tags:
+        tag = str(tag).strip()
+        if tag and tag not in result:
+            result.append(tag)
+    return result
+
+
+def add_note_tag_index(db_path):
+    """Create note_tag and index every existing note"""
+    if not db_path.exists():
+        print("❌ Database not found. Please run the application first.")
+        return False
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        cursor = conn.cursor()
+
+        print("🔧 Creating note_tag table...")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS note_tag (
+                note_id TEXT NOT NULL,
+                tag TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                PRIMARY KEY (note_id, tag),
+                FOREIGN KEY (note_id) REFERENCES note(id) ON DELETE CASCADE,
+                FOREIGN KEY (user_id) REFERENCES user(id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_note_tag_user_tag ON note_tag(user_id, tag)")
+
+        print("🔧 Backfilling tags from existing notes...")
+        cursor.execute("DELETE FROM note_tag")
+        notes = tags_written = 0
+        rows = conn.execute("SELECT id, user_id, tags FROM note WHERE tags IS NOT NULL AND tags != ''")
+        while True:
+            batch = rows.fetchmany(BATCH_SIZE)
+            if not batch:
+                break
+            tag_rows = [
+                (note_id, tag, user_id)
+                for note_id, user_id, tags in batch
+                for tag in parse_tags(tags)
+            ]
+            cursor.executemany("INSERT INTO note_tag (note_id, tag, user_id) VALUES (?, ?, ?)", tag_rows)
+            notes += len(batch)
+            tags_written += len(tag_rows)
+
+        conn.commit()
+        print(f"✅ Indexed {tags_written} tags on {notes} notes")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error creating note tag index: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    """Main migration function"""
+    print("🚀 Note Tag Index Migration")
+    print("=" * 50)
+
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else project_root / 'instance' / 'site.db'
+    success = add_note_tag_index(db_path)
+
+    if success:
+        print("\n🎉 Migration completed successfully!")
+    else:
+        print("\n❌ Migration failed!")
+        print("Please check the error messages above.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
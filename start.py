@@ -2,13 +2,47 @@
 """
 SQLite start script for Render deployment
 This script uses SQLite instead of PostgreSQL to avoid psycopg2 issues
+
+Serves with gunicorn (multi-process, see gunicorn.conf.py) in production
+and with the Werkzeug development server otherwise:
+
+    python start.py                     # gunicorn if FLASK_ENV=production, else Werkzeug
+    python start.py --server gunicorn   # always gunicorn (Procfile / render.yaml)
+    python start.py --server werkzeug   # single-process development server
 """
 
+import argparse
 import os
 import sys
 
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args():
+    default_server = 'gunicorn' if os.environ.get('FLASK_ENV') == 'production' else 'werkzeug'
+    parser = argparse.ArgumentParser(description='Start Smart Learning Hub')
+    parser.add_argument('--server', choices=['gunicorn', 'werkzeug'],
+                        default=os.environ.get('SERVER', default_server),
+                        help=f'WSGI server to run (default: {default_server})')
+    return parser.parse_args()
+
+
+def run_gunicorn():
+    """Replace this process with a gunicorn master serving wsgi:app"""
+    config_path = os.path.join(PROJECT_ROOT, 'gunicorn.conf.py')
+    print(f"🦄 Starting gunicorn with {config_path}", flush=True)
+    # exec so the platform's SIGTERM/SIGHUP reach the gunicorn master directly
+    os.execvp(sys.executable, [
+        sys.executable, '-m', 'gunicorn',
+        '--config', config_path,
+        '--chdir', PROJECT_ROOT,
+        'wsgi:app'
+    ])
+
+
 def main():
     """Main function"""
+    args = parse_args()
     print("🚀 Starting Smart Learning Hub with SQLite...")
     
     # Debug Python environment
@@ -16,12 +50,13 @@ def main():
     print(f"🐍 Python executable: {sys.executable}")
     print(f"🐍 Current working directory: {os.getcwd()}")
     
-    # Check if Flask is available
+    # Check if Flask is installed; reading its metadata avoids importing it
+    # in this process, which gunicorn replaces right away
     try:
-        import flask
-        print(f"✅ Flask version: {flask.__version__}")
-    except ImportError as e:
-        print(f"❌ Flask import failed: {e}")
+        from importlib.metadata import PackageNotFoundError, version
+        print(f"✅ Flask version: {version('flask')}")
+    except PackageNotFoundError as e:
+        print(f"❌ Flask is not installed: {e}")
         print("📦 Available packages:")
         import subprocess
         try:
@@ -34,6 +69,9 @@ def main():
     # Set SQLite database URL
     os.environ['DATABASE_URL'] = 'sqlite:///site.db'
     
+    if args.server == 'gunicorn':
+        run_gunicorn()
+    
     try:
         print("📦 Importing application...")
         from app import create_app
@@ -46,7 +84,7 @@ def main():
         port = int(os.environ.get('PORT', 8000))
         host = os.environ.get('HOST', '0.0.0.0')
         
-        print(f"🌐 Starting server on {host}:{port}")
+        print(f"🌐 Starting development server on {host}:{port} (single process)")
         print("💾 Using SQLite database")
         app.run(host=host, port=port, debug=False)
         